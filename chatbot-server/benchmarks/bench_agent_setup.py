@@ -0,0 +1,94 @@
+"""
+Benchmark of the per-request SearchAgent setup cost.
+
+Compares building a fresh AsyncSqliteSaver and recompiling the SearchAgent
+graph for every message against reusing one compiled graph and a shared
+checkpointer with a per-request thread. External services are stubbed so
+only the setup overhead is measured.
+
+Usage:
+    python -m benchmarks.bench_agent_setup [--requests N]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from src.services.search_agent import SearchAgent
+
+
+class _StubClient:
+    """Stand-in for the LLM, search and source adapters."""
+
+    def generate(self, prompt: str, model: str) -> str:
+        return ""
+
+    async def agenerate(self, prompt: str, model: str) -> str:
+        return ""
+
+    async def astream(self, prompt: str, model: str):
+        yield ""
+
+    def search_products(self, query: str, max_local: int = 3, max_foreign: int = 2):
+        return []
+
+    def find_sources(self, titles):
+        return []
+
+    async def afind_sources(self, titles):
+        return []
+
+
+def _build_agent(checkpointer) -> SearchAgent:
+    stub = _StubClient()
+    return SearchAgent(
+        llm_model="bench",
+        llm_client=stub,
+        hybrid_search=stub,
+        source_search=stub,
+        checkpointer=checkpointer,
+    )
+
+
+async def per_request_setup(requests: int) -> float:
+    """Previous behaviour: new saver and recompiled graph for each message."""
+    start = time.perf_counter()
+    for _ in range(requests):
+        async with AsyncSqliteSaver.from_conn_string(":memory:") as memory:
+            agent = _build_agent(memory)
+            thread = {"configurable": {"thread_id": str(uuid.uuid4())}}
+            await agent.graph.aget_state(thread)
+    return (time.perf_counter() - start) / requests
+
+
+async def shared_setup(requests: int) -> float:
+    """Current behaviour: one compiled graph and checkpointer per process."""
+    checkpointer = MemorySaver()
+    agent = _build_agent(checkpointer)
+    start = time.perf_counter()
+    for _ in range(requests):
+        thread_id = str(uuid.uuid4())
+        thread = {"configurable": {"thread_id": thread_id}}
+        await agent.graph.aget_state(thread)
+        await checkpointer.adelete_thread(thread_id)
+    return (time.perf_counter() - start) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    before = asyncio.run(per_request_setup(args.requests))
+    after = asyncio.run(shared_setup(args.requests))
+
+    print(f"per-request setup (before): {before * 1000:8.3f} ms")
+    print(f"shared compiled graph (after): {after * 1000:8.3f} ms")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,17 @@ Adapters layer - External service implementations.
 
 Contains concrete implementations of interfaces for specific providers.
 """
-from .llm import GroqProvider
-from .search import TavilyHybridSearchProvider, TavilySourceSearchProvider
+from .llm import GroqProvider, CachedLLMClient
+from .search import TavilyHybridSearchProvider, TavilySourceSearchProvider, CachedSourceSearchProvider
 from .vector import MongoDBVectorProvider
 from .model_provider import CustomModelProvider
 
 __all__ = [
     "GroqProvider",
+    "CachedLLMClient",
     "TavilyHybridSearchProvider",
     "TavilySourceSearchProvider",
+    "CachedSourceSearchProvider",
     "MongoDBVectorProvider",
     "CustomModelProvider",
 ]
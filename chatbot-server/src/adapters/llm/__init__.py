@@ -4,5 +4,6 @@ LLM adapter implementations.
 Contains concrete implementations of LLM providers.
 """
 from .groq_provider import GroqProvider
+from .cached_provider import CachedLLMClient
 
-__all__ = ["GroqProvider"]
+__all__ = ["GroqProvider", "CachedLLMClient"]
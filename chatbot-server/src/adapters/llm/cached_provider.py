@@ -0,0 +1,214 @@
+"""
+Caching decorator for LLM providers.
+
+Memoizes completions of any LLMClientInterface so identical prompts
+are answered without calling the model again.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from src.interfaces import LLMClientInterface
+from src.utils import LRUCache, SQLiteKeyValueStore, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CachedLLMClient(LLMClientInterface):
+    """
+    LLM client decorator with a two-tier completion cache.
+
+    Completions are keyed on a hash of the model, prompt and generation
+    parameters. Lookups hit an in-memory LRU first and then an optional
+    SQLite store, which survives restarts and is shared by all workers
+    using the same file. Misses are delegated to the wrapped client.
+    """
+
+    def __init__(self,
+                 client: LLMClientInterface,
+                 cache_path: Optional[str] = None,
+                 maxsize: int = 1024,
+                 ttl: Optional[float] = None,
+                 params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Initialize caching decorator.
+
+        Args:
+            client: LLM client to wrap
+            cache_path: SQLite file for the persistent tier, None for memory only
+            maxsize: Maximum number of completions kept in memory
+            ttl: Seconds before a cached completion expires, None to never expire
+            params: Generation parameters included in the cache key, defaults
+                to the wrapped client's generation_params
+        """
+        self._client = client
+        self._ttl = ttl
+        self._params = params if params is not None else getattr(client, "generation_params", {})
+        self._memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._store = SQLiteKeyValueStore(cache_path, table="llm_completions") if cache_path else None
+
+    def cache_key(self, prompt: str, model: str) -> str:
+        """
+        Build the cache key of a completion.
+
+        Args:
+            prompt: Prompt text
+            model: Model identifier
+
+        Returns:
+            SHA-256 hex digest of model, prompt and generation parameters
+        """
+        payload = json.dumps({"model": model, "prompt": prompt, "params": self._params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def generate(self, prompt: str, model: str) -> str:
+        """
+        Generate a response, served from cache when possible.
+
+        Args:
+            prompt: The prompt text to send to the model
+            model: The model identifier to use for generation
+
+        Returns:
+            The text response from the model or the cache
+
+        Raises:
+            ValueError: If prompt is not a string
+        """
+        self._validate(prompt)
+        key = self.cache_key(prompt, model)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = self._client.generate(prompt=prompt, model=model)
+        self._save(key, response)
+        return response
+
+    async def agenerate(self, prompt: str, model: str) -> str:
+        """
+        Asynchronously generate a response, served from cache when possible.
+
+        Args:
+            prompt: The prompt text to send to the model
+            model: The model identifier to use for generation
+
+        Returns:
+            The text response from the model or the cache
+
+        Raises:
+            ValueError: If prompt is not a string
+        """
+        self._validate(prompt)
+        key = self.cache_key(prompt, model)
+        cached = await self._alookup(key)
+        if cached is not None:
+            return cached
+
+        response = await self._client.agenerate(prompt=prompt, model=model)
+        await asyncio.to_thread(self._save, key, response)
+        return response
+
+    async def astream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        """
+        Stream a response, replaying a cached completion as a single chunk.
+
+        A streamed completion is cached only once it has finished.
+
+        Args:
+            prompt: The prompt text to send to the model
+            model: The model identifier to use for generation
+
+        Yields:
+            Text fragments of the response
+
+        Raises:
+            ValueError: If prompt is not a string
+        """
+        self._validate(prompt)
+        key = self.cache_key(prompt, model)
+        cached = await self._alookup(key)
+        if cached is not None:
+            yield cached
+            return
+
+        tokens = []
+        async for token in self._client.astream(prompt=prompt, model=model):
+            tokens.append(token)
+            yield token
+        await asyncio.to_thread(self._save, key, "".join(tokens))
+
+    @staticmethod
+    def _validate(prompt: str) -> None:
+        """
+        Reject non-string prompts before touching the cache.
+
+        Args:
+            prompt: Prompt to validate
+
+        Raises:
+            ValueError: If prompt is not a string
+        """
+        if not isinstance(prompt, str):
+            raise ValueError(f"Prompt must be a string, but got {type(prompt)}")
+
+    def _lookup(self, key: str) -> Optional[str]:
+        """
+        Look up a completion in memory, then on disk.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached completion, or None on a miss
+        """
+        cached = self._memory.get(key)
+        if cached is not None:
+            metrics.increment("llm_cache.memory_hits")
+            return cached
+
+        if self._store is not None:
+            try:
+                stored = self._store.get(key)
+            except Exception as e:
+                logger.warning(f"LLM cache read failed: {e}")
+                stored = None
+            if stored is not None:
+                cached = stored.decode("utf-8") if isinstance(stored, bytes) else stored
+                self._memory.set(key, cached)
+                metrics.increment("llm_cache.disk_hits")
+                return cached
+
+        metrics.increment("llm_cache.misses")
+        return None
+
+    async def _alookup(self, key: str) -> Optional[str]:
+        """
+        Look up a completion without blocking the event loop on disk reads.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached completion, or None on a miss
+        """
+        if self._store is None or key in self._memory:
+            return self._lookup(key)
+        return await asyncio.to_thread(self._lookup, key)
+
+    def _save(self, key: str, response: str) -> None:
+        """
+        Store a completion in memory and on disk.
+
+        Args:
+            key: Cache key
+            response: Completion text
+        """
+        self._memory.set(key, response)
+        if self._store is not None:
+            try:
+                self._store.set(key, response.encode("utf-8"), ttl=self._ttl)
+            except Exception as e:
+                logger.warning(f"LLM cache write failed: {e}")
@@ -4,8 +4,10 @@ Groq LLM provider implementation.
 Provides integration with Groq API for fast language model inference.
 """
 import logging
+from typing import AsyncIterator
+
 import requests.exceptions
-from groq import Groq
+from groq import AsyncGroq, Groq
 
 from src.interfaces import LLMClientInterface
 
@@ -20,14 +22,18 @@ class GroqProvider(LLMClientInterface):
     text completions with high performance.
     """
     
-    def __init__(self, api_key: str) -> None:
+    def __init__(self, api_key: str, temperature: float = 0.5, max_tokens: int = 1024) -> None:
         """
         Initialize Groq provider with API credentials.
         
         Args:
             api_key: Groq API key for authentication
+            temperature: Sampling temperature for completions
+            max_tokens: Maximum number of tokens per completion
         """
+        self.generation_params = {"temperature": temperature, "max_tokens": max_tokens}
         self._client = Groq(api_key=api_key)
+        self._async_client = AsyncGroq(api_key=api_key)
 
     def generate(self, prompt: str, model: str) -> str:
         """
@@ -51,8 +57,40 @@ class GroqProvider(LLMClientInterface):
             response = self._client.chat.completions.create(
                 messages=[{"role": "user", "content": prompt}],
                 model=model,
-                temperature=0.5,
-                max_tokens=1024,
+                **self.generation_params,
+                stop=None,
+                stream=False,
+            )
+            return response.choices[0].message.content
+        except requests.exceptions.HTTPError as e:
+            logger.error("HTTP Error occurred: %s - %s", e.response.status_code, e.response.text)
+            raise
+
+    async def agenerate(self, prompt: str, model: str) -> str:
+        """
+        Asynchronously generate a response from a prompt using Groq API.
+        
+        Uses the AsyncGroq client so the request does not block the event loop.
+        
+        Args:
+            prompt: The prompt text to send to the model
+            model: The model identifier to use for generation
+            
+        Returns:
+            The text response from the model
+            
+        Raises:
+            ValueError: If prompt is not a string
+            requests.exceptions.HTTPError: If API request fails
+        """
+        if not isinstance(prompt, str):
+            raise ValueError(f"Prompt must be a string, but got {type(prompt)}")
+
+        try:
+            response = await self._async_client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=model,
+                **self.generation_params,
                 stop=None,
                 stream=False,
             )
@@ -60,3 +98,39 @@ class GroqProvider(LLMClientInterface):
         except requests.exceptions.HTTPError as e:
             logger.error("HTTP Error occurred: %s - %s", e.response.status_code, e.response.text)
             raise
+
+    async def astream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        """
+        Stream a response from a prompt using Groq API.
+        
+        Args:
+            prompt: The prompt text to send to the model
+            model: The model identifier to use for generation
+            
+        Yields:
+            Text deltas of the response as they are generated
+            
+        Raises:
+            ValueError: If prompt is not a string
+            requests.exceptions.HTTPError: If API request fails
+        """
+        if not isinstance(prompt, str):
+            raise ValueError(f"Prompt must be a string, but got {type(prompt)}")
+
+        try:
+            stream = await self._async_client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=model,
+                **self.generation_params,
+                stop=None,
+                stream=True,
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except requests.exceptions.HTTPError as e:
+            logger.error("HTTP Error occurred: %s - %s", e.response.status_code, e.response.text)
+            raise
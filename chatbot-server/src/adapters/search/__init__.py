@@ -4,8 +4,10 @@ Search adapter implementations.
 Contains concrete implementations of search providers.
 """
 from .tavily_provider import TavilyHybridSearchProvider, TavilySourceSearchProvider
+from .cached_source_provider import CachedSourceSearchProvider
 
 __all__ = [
     "TavilyHybridSearchProvider",
     "TavilySourceSearchProvider",
+    "CachedSourceSearchProvider",
 ]
@@ -0,0 +1,243 @@
+"""
+Caching decorator for product source search providers.
+
+Remembers the purchase URL and image of product titles so popular
+products resolve without repeated web searches.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+
+from src.interfaces import ProductSourceSearchInterface
+from src.utils import LRUCache, metrics, normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+class CachedSourceSearchProvider(ProductSourceSearchInterface):
+    """
+    Product source search decorator with TTL caching.
+
+    Titles are normalized before lookup. Resolved sources are kept for
+    ttl seconds; titles without any image or url are cached negatively for
+    the shorter negative_ttl. Lookups the provider reports as failed (None)
+    are answered with an empty source but not cached, so the next request
+    retries them. An optional MongoDB collection acts as a persistent tier
+    shared by all replicas, expired by a TTL index.
+    """
+
+    EMPTY_SOURCE = {"image": "", "url": ""}
+
+    def __init__(self,
+                 provider: ProductSourceSearchInterface,
+                 ttl: float = 86400.0,
+                 negative_ttl: float = 600.0,
+                 maxsize: int = 4096,
+                 collection: Optional[Collection] = None) -> None:
+        """
+        Initialize caching decorator.
+
+        Args:
+            provider: Source search provider to wrap
+            ttl: Seconds a resolved source stays cached
+            negative_ttl: Seconds a title without sources stays cached
+            maxsize: Maximum number of titles kept in memory
+            collection: Optional MongoDB collection for the persistent tier
+        """
+        self._provider = provider
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._collection = collection
+        if collection is not None:
+            collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def find_sources(self, titles: List[str]) -> List[Dict[str, str]]:
+        """
+        Find product sources, resolving only uncached titles.
+
+        Args:
+            titles: List of product titles to find sources for
+
+        Returns:
+            List of dictionaries with image and url for each product
+        """
+        keys = [normalize_query(title) for title in titles]
+        found = self._lookup_memory(keys)
+        found.update(self._lookup_persistent([key for key in keys if key not in found]))
+
+        missing = self._missing_titles(titles, keys, found)
+        if missing:
+            resolved = self._provider.find_sources(list(missing.values()))
+            fresh = self._successful(missing.keys(), resolved)
+            self._save_persistent(fresh)
+            found.update(self._remember(fresh))
+
+        return [dict(found.get(key, self.EMPTY_SOURCE)) for key in keys]
+
+    async def afind_sources(self, titles: List[str]) -> List[Dict[str, str]]:
+        """
+        Asynchronously find product sources, resolving only uncached titles.
+
+        Args:
+            titles: List of product titles to find sources for
+
+        Returns:
+            List of dictionaries with image and url, in the order of titles
+        """
+        keys = [normalize_query(title) for title in titles]
+        found = self._lookup_memory(keys)
+        pending = [key for key in keys if key not in found]
+        if pending and self._collection is not None:
+            found.update(await asyncio.to_thread(self._lookup_persistent, pending))
+
+        missing = self._missing_titles(titles, keys, found)
+        if missing:
+            resolved = await self._provider.afind_sources(list(missing.values()))
+            fresh = self._successful(missing.keys(), resolved)
+            if self._collection is not None:
+                await asyncio.to_thread(self._save_persistent, fresh)
+            found.update(self._remember(fresh))
+
+        return [dict(found.get(key, self.EMPTY_SOURCE)) for key in keys]
+
+    @staticmethod
+    def _successful(keys: Iterable[str], sources: List[Optional[Dict[str, str]]]) -> Dict[str, Dict[str, str]]:
+        """
+        Pair resolved sources with their titles, dropping failed lookups.
+
+        Args:
+            keys: Normalized titles that were resolved
+            sources: Provider results aligned with keys, None where the lookup failed
+
+        Returns:
+            Sources by normalized title, for the lookups that succeeded
+        """
+        fresh = {}
+        for key, source in zip(keys, sources):
+            if source is None:
+                metrics.increment("source_cache.provider_failures")
+            else:
+                fresh[key] = source
+        return fresh
+
+    @staticmethod
+    def _is_negative(source: Dict[str, str]) -> bool:
+        """Whether a source result carries neither image nor url."""
+        return not source.get("image") and not source.get("url")
+
+    @staticmethod
+    def _missing_titles(titles: List[str], keys: List[str], found: Dict[str, Dict[str, str]]) -> Dict[str, str]:
+        """
+        Collect uncached titles, one per normalized key.
+
+        Args:
+            titles: Original titles
+            keys: Normalized titles
+            found: Sources already resolved from the cache
+
+        Returns:
+            Mapping of normalized key to the first original title with that key
+        """
+        missing: Dict[str, str] = {}
+        for title, key in zip(titles, keys):
+            if key not in found and key not in missing:
+                missing[key] = title
+        return missing
+
+    def _lookup_memory(self, keys: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Look up titles in the in-memory tier.
+
+        Args:
+            keys: Normalized titles
+
+        Returns:
+            Cached sources by normalized title
+        """
+        found = {}
+        for key in keys:
+            source = self._memory.get(key)
+            if source is not None:
+                found[key] = source
+                metrics.increment("source_cache.memory_hits")
+        return found
+
+    def _lookup_persistent(self, keys: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Look up titles in the MongoDB tier and promote hits to memory.
+
+        Args:
+            keys: Normalized titles
+
+        Returns:
+            Cached sources by normalized title
+        """
+        if self._collection is None or not keys:
+            return {}
+
+        now = datetime.now(timezone.utc)
+        found = {}
+        try:
+            for doc in self._collection.find({"_id": {"$in": list(set(keys))}, "expires_at": {"$gt": now}}):
+                source = {"image": doc.get("image", ""), "url": doc.get("url", "")}
+                found[doc["_id"]] = source
+                expires_at = doc["expires_at"]
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                self._memory.set(doc["_id"], source, ttl=(expires_at - now).total_seconds())
+                metrics.increment("source_cache.persistent_hits")
+        except Exception as e:
+            logger.warning(f"Source cache read failed: {e}")
+        return found
+
+    def _remember(self, fresh: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+        """
+        Store newly resolved sources in memory.
+
+        Args:
+            fresh: Resolved sources by normalized title
+
+        Returns:
+            The stored sources, normalized to image and url keys
+        """
+        stored = {}
+        for key, source in fresh.items():
+            entry = {"image": source.get("image", ""), "url": source.get("url", "")}
+            negative = self._is_negative(entry)
+            self._memory.set(key, entry, ttl=self._negative_ttl if negative else self._ttl)
+            metrics.increment("source_cache.negative_misses" if negative else "source_cache.misses")
+            stored[key] = entry
+        return stored
+
+    def _save_persistent(self, fresh: Dict[str, Dict[str, str]]) -> None:
+        """
+        Upsert newly resolved sources into the MongoDB tier.
+
+        Args:
+            fresh: Resolved sources by normalized title
+        """
+        if self._collection is None or not fresh:
+            return
+
+        now = datetime.now(timezone.utc)
+        operations = []
+        for key, source in fresh.items():
+            ttl = self._negative_ttl if self._is_negative(source) else self._ttl
+            operations.append(UpdateOne(
+                {"_id": key},
+                {"$set": {
+                    "image": source.get("image", ""),
+                    "url": source.get("url", ""),
+                    "expires_at": now + timedelta(seconds=ttl),
+                }},
+                upsert=True,
+            ))
+        try:
+            self._collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.warning(f"Source cache write failed: {e}")
@@ -3,13 +3,19 @@ Tavily search provider implementations.
 
 Provides integration with Tavily API for hybrid product search and web search.
 """
-from typing import Dict, List
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import cohere
 from pymongo.database import Database
-from tavily import TavilyClient, TavilyHybridClient
+from tavily import AsyncTavilyClient, TavilyClient, TavilyHybridClient
 
 from src.interfaces import HybridSearchInterface, ProductSourceSearchInterface
+from src.utils import EmbeddingCache, MicroBatcher
+
+logger = logging.getLogger(__name__)
 
 
 class TavilyHybridSearchProvider(HybridSearchInterface):
@@ -18,9 +24,21 @@ class TavilyHybridSearchProvider(HybridSearchInterface):
     
     Implements hybrid search capabilities using both local MongoDB
     vector search and Tavily's web search for comprehensive results.
+    Foreign results saved to the collection are embedded into the same
+    field the local search reads.
     """
+
+    EMBEDDING_MODEL = "embed-english-v3.0"
     
-    def __init__(self, api_key: str, mongo_db: Database, cohere_api_key: str) -> None:
+    def __init__(self,
+                 api_key: str,
+                 mongo_db: Database,
+                 cohere_api_key: str,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 embedding_batch_wait_ms: float = 5.0,
+                 index_name: str = "pick_smart_vector_index",
+                 embedding_field: str = "product_title_embedding",
+                 active_index: Optional[Callable[[], Tuple[str, str]]] = None) -> None:
         """
         Initialize Tavily hybrid search provider.
         
@@ -28,16 +46,35 @@ class TavilyHybridSearchProvider(HybridSearchInterface):
             api_key: Tavily API key for authentication
             mongo_db: MongoDB database instance for local search
             cohere_api_key: Cohere API key for embeddings and reranking
+            embedding_cache: Cache of Cohere embeddings, defaults to an in-memory cache
+            embedding_batch_wait_ms: Milliseconds uncached texts wait to be
+                batched with concurrent searches into one Cohere request
+            index_name: Vector search index of the local collection
+            embedding_field: Field the index covers and saved results are embedded into
+            active_index: Returns the current index name and embedding field
+                before each search, to follow index switches at runtime
         """
+        self._active_index = active_index
         self._cohere = cohere.Client(api_key=cohere_api_key)
+        self._embedding_cache = embedding_cache if embedding_cache is not None else EmbeddingCache()
+        self._embedding_batcher = MicroBatcher(
+            lambda texts, input_type: self._cohere.embed(
+                model=self.EMBEDDING_MODEL,
+                texts=texts,
+                input_type=input_type,
+            ).embeddings,
+            max_wait_ms=embedding_batch_wait_ms,
+            name="hybrid_search.embedding_batcher",
+        )
 
         def embedding_function(texts, input_type):
-            """Generate embeddings using Cohere API."""
-            return self._cohere.embed(
-                model="embed-english-v3.0",
-                texts=texts,
+            """Generate embeddings using Cohere API, reusing cached vectors."""
+            return self._embedding_cache.embed(
+                texts,
+                model=self.EMBEDDING_MODEL,
                 input_type=input_type,
-            ).embeddings
+                embed_fn=lambda missing: self._embedding_batcher.embed(missing, input_type),
+            )
 
         def ranking_function(query, documents, top_n):
             """Rerank documents using Cohere's rerank model."""
@@ -52,16 +89,38 @@ class TavilyHybridSearchProvider(HybridSearchInterface):
                 for result in response.results
             ]
 
-        self._client = TavilyHybridClient(
-            api_key=api_key,
-            db_provider="mongodb",
-            collection=mongo_db.get_collection("embedded_picksmart"),
-            index="pick_smart_vector_index",
-            embeddings_field="product_title_embedding",
-            content_field="product_title",
-            embedding_function=embedding_function,
-            ranking_function=ranking_function,
-        )
+        self._client_options = {
+            "api_key": api_key,
+            "db_provider": "mongodb",
+            "collection": mongo_db.get_collection("embedded_picksmart"),
+            "content_field": "product_title",
+            "embedding_function": embedding_function,
+            "ranking_function": ranking_function,
+        }
+        self._client = TavilyHybridClient(index=index_name, embeddings_field=embedding_field, **self._client_options)
+        # One client per index, as TavilyHybridClient.search reads both from the client
+        self._clients: Dict[Tuple[str, str], TavilyHybridClient] = {(index_name, embedding_field): self._client}
+        self._clients_lock = threading.Lock()
+
+    def _client_for(self, index_name: str, embedding_field: str) -> TavilyHybridClient:
+        """
+        Get the hybrid client searching an index, creating it on first use.
+
+        Args:
+            index_name: Vector search index of the local collection
+            embedding_field: Field the index covers
+
+        Returns:
+            Client bound to the index and field
+        """
+        key = (index_name, embedding_field)
+        with self._clients_lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = TavilyHybridClient(
+                    index=index_name, embeddings_field=embedding_field, **self._client_options
+                )
+        return client
 
     def search_products(self, query: str, max_local: int = 3, max_foreign: int = 2) -> List[str]:
         """
@@ -75,7 +134,8 @@ class TavilyHybridSearchProvider(HybridSearchInterface):
         Returns:
             List of product information strings
         """
-        response = self._client.search(
+        client = self._client if self._active_index is None else self._client_for(*self._active_index())
+        response = client.search(
             query=query,
             max_local=max_local,
             max_foreign=max_foreign,
@@ -91,15 +151,25 @@ class TavilySourceSearchProvider(ProductSourceSearchInterface):
     Uses Tavily web search to find product sources, URLs, and images
     from e-commerce websites.
     """
+
+    QUERY_TEMPLATE = (
+        "find the url source from e-commerce website for purchasing products "
+        "only based on this product title {}"
+    )
     
-    def __init__(self, api_key: str) -> None:
+    def __init__(self, api_key: str, concurrency: int = 5, timeout: float = 10.0) -> None:
         """
         Initialize Tavily source search provider.
         
         Args:
             api_key: Tavily API key for authentication
+            concurrency: Maximum number of titles resolved at once
+            timeout: Seconds to wait for a single title before giving up
         """
         self._client = TavilyClient(api_key=api_key)
+        self._async_client = AsyncTavilyClient(api_key=api_key)
+        self._concurrency = concurrency
+        self._timeout = timeout
 
     def find_sources(self, titles: List[str]) -> List[Dict[str, str]]:
         """
@@ -111,30 +181,76 @@ class TavilySourceSearchProvider(ProductSourceSearchInterface):
         Returns:
             List of dictionaries with image and url for each product
         """
-        query_template = (
-            "find the url source from e-commerce website for purchasing products "
-            "only based on this product title {}"
-        )
-
         results: List[Dict[str, str]] = []
         for title in titles:
             search = self._client.search(
-                query=query_template.format(title),
+                query=self.QUERY_TEMPLATE.format(title),
                 max_results=1,
                 include_images=True,
             )
+            results.append(self._parse_source(search))
 
-            image = ""
-            url = ""
+        return results
 
-            images = search.get("images") or []
-            if images:
-                image = images[0] or ""
+    async def afind_sources(self, titles: List[str]) -> List[Optional[Dict[str, str]]]:
+        """
+        Find product sources and images for product titles concurrently.
+        
+        Titles are resolved with the async Tavily client, at most
+        `concurrency` at a time. A title that fails or exceeds the timeout
+        gets None instead of delaying the response, so callers can tell a
+        failed lookup from a title without sources.
+        
+        Args:
+            titles: List of product titles to find sources for
+            
+        Returns:
+            List of dictionaries with image and url, None for failed
+            lookups, in the order of titles
+        """
+        semaphore = asyncio.Semaphore(self._concurrency)
 
-            search_results = search.get("results") or []
-            if search_results:
-                url = search_results[0].get("url", "") or ""
+        async def resolve(title: str) -> Optional[Dict[str, str]]:
+            async with semaphore:
+                try:
+                    search = await asyncio.wait_for(
+                        self._async_client.search(
+                            query=self.QUERY_TEMPLATE.format(title),
+                            max_results=1,
+                            include_images=True,
+                        ),
+                        timeout=self._timeout,
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Source search timed out after {self._timeout}s for title: {title}")
+                    return None
+                except Exception as e:
+                    logger.warning(f"Source search failed for title '{title}': {e}")
+                    return None
+            return self._parse_source(search)
 
-            results.append({"image": image, "url": url})
+        return list(await asyncio.gather(*(resolve(title) for title in titles)))
 
-        return results
+    @staticmethod
+    def _parse_source(search: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Extract the first image and url from a Tavily search response.
+        
+        Args:
+            search: Raw Tavily search response
+            
+        Returns:
+            Dictionary with image and url, empty strings when missing
+        """
+        image = ""
+        url = ""
+
+        images = search.get("images") or []
+        if images:
+            image = images[0] or ""
+
+        search_results = search.get("results") or []
+        if search_results:
+            url = search_results[0].get("url", "") or ""
+
+        return {"image": image, "url": url}
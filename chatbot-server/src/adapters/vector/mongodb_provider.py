@@ -6,7 +6,8 @@ Provides integration with MongoDB Atlas for vector search on product embeddings.
 import os
 
 import certifi
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.database import Database
 from urllib.parse import quote_plus
 
@@ -37,6 +38,25 @@ class MongoDBVectorProvider:
             f"{database}?appName=picksmart-cluster&retryWrites=true&w=majority"
         )
 
+    def _client_options(self) -> dict:
+        """
+        Build the TLS/SSL and timeout options shared by all clients.
+        
+        Returns:
+            Keyword arguments for MongoClient and AsyncMongoClient
+        """
+        tls_ca_file = os.getenv("MONGO_TLS_CA_FILE", certifi.where())
+        os.environ.setdefault("SSL_CERT_FILE", tls_ca_file)
+
+        return {
+            "tls": True,
+            "tlsCAFile": tls_ca_file,
+            "serverSelectionTimeoutMS": 30000,
+            "connectTimeoutMS": 20000,
+            "socketTimeoutMS": 20000,
+            "retryWrites": True,
+        }
+
     def _create_client(self) -> MongoClient:
         """
         Create a MongoDB client with proper TLS/SSL configuration.
@@ -44,18 +64,16 @@ class MongoDBVectorProvider:
         Returns:
             Configured MongoClient instance
         """
-        tls_ca_file = os.getenv("MONGO_TLS_CA_FILE", certifi.where())
-        os.environ.setdefault("SSL_CERT_FILE", tls_ca_file)
+        return MongoClient(self._uri, **self._client_options())
 
-        return MongoClient(
-            self._uri,
-            tls=True,
-            tlsCAFile=tls_ca_file,
-            serverSelectionTimeoutMS=30000,
-            connectTimeoutMS=20000,
-            socketTimeoutMS=20000,
-            retryWrites=True,
-        )
+    def _create_async_client(self) -> AsyncMongoClient:
+        """
+        Create an asyncio MongoDB client with proper TLS/SSL configuration.
+        
+        Returns:
+            Configured AsyncMongoClient instance
+        """
+        return AsyncMongoClient(self._uri, **self._client_options())
 
     def get_database(self) -> Database:
         """
@@ -67,3 +85,15 @@ class MongoDBVectorProvider:
         client = self._create_client()
         client.admin.command("ping")
         return client[self._database]
+
+    def get_async_database(self) -> AsyncDatabase:
+        """
+        Get asyncio MongoDB database instance.
+        
+        The client connects lazily on first use from the event loop.
+        
+        Returns:
+            AsyncDatabase instance
+        """
+        client = self._create_async_client()
+        return client[self._database]
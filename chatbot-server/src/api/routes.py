@@ -11,6 +11,7 @@ from fastapi.responses import StreamingResponse
 
 from src.models.schemas import ChatMessage
 from src.interfaces import IChatService
+from src.utils import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -88,3 +89,14 @@ async def health_check():
         Status response
     """
     return {"status": "healthy"}
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Metrics endpoint.
+    
+    Returns:
+        Snapshot of in-process counters and gauges
+    """
+    return metrics.snapshot()
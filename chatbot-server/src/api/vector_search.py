@@ -4,12 +4,14 @@ Vector search API endpoints.
 Provides endpoints for semantic search and vector database operations.
 """
 import logging
-from typing import Optional
+from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Depends, Request, Query
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.interfaces import IVectorStoreService
+from src.services.ingestion import CatalogIngestionService
+from src.utils.catalog_stream import iter_csv, iter_ndjson
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,22 @@ class SearchQuery(BaseModel):
     region: Optional[str] = None
 
 
+class BatchSearchItem(BaseModel):
+    """Single query of a batch search; unset fields use the batch defaults."""
+    query: str
+    top_k: Optional[int] = None
+    department: Optional[str] = None
+    region: Optional[str] = None
+
+
+class BatchSearchQuery(BaseModel):
+    """Batch vector search request model."""
+    queries: List[BatchSearchItem] = Field(..., min_length=1, max_length=1000)
+    top_k: int = 5
+    department: Optional[str] = None
+    region: Optional[str] = None
+
+
 class SearchResult(BaseModel):
     """Search result model."""
     similarityScore: float
@@ -43,6 +61,19 @@ def get_vector_store(request: Request) -> IVectorStoreService:
     return request.app.state.vector_store
 
 
+def get_ingestion_service(request: Request) -> CatalogIngestionService:
+    """
+    Dependency provider for CatalogIngestionService.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        CatalogIngestionService instance from app state
+    """
+    return request.app.state.ingestion_service
+
+
 @router.post("/search")
 async def semantic_search(
     search_query: SearchQuery,
@@ -59,7 +90,7 @@ async def semantic_search(
         List of matching documents with similarity scores
     """
     try:
-        results = vector_store.search_similar(
+        results = await vector_store.asearch_similar(
             query=search_query.query,
             top_k=search_query.top_k,
             department=search_query.department,
@@ -71,6 +102,44 @@ async def semantic_search(
         return {"error": str(e), "results": []}
 
 
+@router.post("/search/batch")
+async def batch_search(
+    batch: BatchSearchQuery,
+    vector_store: IVectorStoreService = Depends(get_vector_store),
+):
+    """
+    Perform many semantic searches in one request.
+    
+    Args:
+        batch: Queries with shared defaults and per-query overrides
+        vector_store: Injected IVectorStoreService
+        
+    Returns:
+        Results per query, in the order of the queries
+    """
+    searches = [
+        {
+            "query": item.query,
+            "top_k": item.top_k if item.top_k is not None else batch.top_k,
+            "department": item.department if item.department is not None else batch.department,
+            "region": item.region if item.region is not None else batch.region,
+        }
+        for item in batch.queries
+    ]
+    try:
+        results = await vector_store.asearch_batch(searches)
+    except Exception as e:
+        logger.error(f"Error during batch search: {e}")
+        return {"error": str(e), "results": []}
+    return {
+        "results": [
+            {"query": search["query"], "results": result, "count": len(result)}
+            for search, result in zip(searches, results)
+        ],
+        "count": len(results),
+    }
+
+
 @router.get("/search/simple")
 async def simple_search(
     query: str = Query(..., description="Search query"),
@@ -88,10 +157,34 @@ async def simple_search(
     Returns:
         Search results
     """
-    results = vector_store.search_similar(query=query, top_k=top_k)
+    results = await vector_store.asearch_similar(query=query, top_k=top_k)
     return {"results": results, "count": len(results)}
 
 
+@router.post("/ingest")
+async def ingest_catalog(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Format of the request body"),
+    ingestion: CatalogIngestionService = Depends(get_ingestion_service),
+):
+    """
+    Stream a product catalog into the vector database.
+    
+    The body is parsed while it is uploaded; new and changed products
+    are embedded and upserted in batches, unchanged ones are skipped.
+    
+    Args:
+        request: FastAPI request object carrying the catalog body
+        format: Catalog format, NDJSON or CSV with a header row
+        ingestion: Injected CatalogIngestionService
+        
+    Returns:
+        Ingestion counts per outcome
+    """
+    parse = iter_csv if format == "csv" else iter_ndjson
+    return await ingestion.ingest(parse(request.stream()))
+
+
 @router.get("/status")
 async def vector_db_status(
     vector_store: IVectorStoreService = Depends(get_vector_store),
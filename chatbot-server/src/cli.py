@@ -0,0 +1,233 @@
+"""
+Command line maintenance tasks.
+
+Run with `python -m src.cli <command>` from the chatbot-server directory.
+"""
+import argparse
+import asyncio
+import logging
+from typing import List, Optional
+
+from src.adapters.vector import MongoDBVectorProvider
+from src.config import Config
+from src.repositories import VectorDBRepository, VectorSnapshotStore
+from src.services.backfill import EmbeddingBackfillJob
+from src.services.embeddings import EmbeddingsService
+from src.services.ingestion import CatalogIngestionService
+from src.services.vector_store import VectorStoreService
+from src.services.vector_tuning import NumCandidatesTuner
+from src.utils.catalog_stream import iter_csv, iter_ndjson, read_file_chunks
+
+logger = logging.getLogger(__name__)
+
+
+def _vector_db_repo(config: Config) -> VectorDBRepository:
+    """
+    Connect to the product database.
+
+    Args:
+        config: Application configuration
+
+    Returns:
+        Vector database repository
+    """
+    provider = MongoDBVectorProvider(
+        username=config.mongo_username,
+        password=config.mongo_password,
+        cluster=config.mongo_cluster,
+        database=config.mongo_database,
+    )
+    repo = VectorDBRepository(provider.get_database())
+    repo.load_active_index()
+    return repo
+
+
+def _embeddings(provider: str, config: Config, dimensions: int) -> EmbeddingsService:
+    """
+    Create the embeddings service selected on the command line.
+
+    Args:
+        provider: Embeddings provider, mock or cohere
+        config: Application configuration
+        dimensions: Dimensions of mock embeddings
+
+    Returns:
+        Embeddings service
+    """
+    if provider == "cohere":
+        return EmbeddingsService(provider_type="cohere", api_key=config.cohere_api_key)
+    return EmbeddingsService(provider_type="mock", dimensions=dimensions)
+
+
+def snapshot(args: argparse.Namespace, config: Config) -> None:
+    """
+    Build a vector index snapshot from the product collection.
+
+    Args:
+        args: Parsed command line arguments
+        config: Application configuration
+    """
+    directory = args.dir or config.vector_snapshot_dir
+    if not directory:
+        raise SystemExit("Snapshot directory required: pass --dir or set VECTOR_SNAPSHOT_DIR")
+    repo = _vector_db_repo(config)
+    collection = repo.get_collection()
+    name = VectorSnapshotStore(directory, keep=args.keep).build(
+        collection.find({}),
+        count=collection.count_documents({}),
+        dimensions=args.dimensions or repo.num_dimensions,
+        embedding_field=repo.embedding_field,
+    )
+    print(f"Published snapshot {name} in {directory}")
+
+
+def ingest(args: argparse.Namespace, config: Config) -> None:
+    """
+    Load a product catalog file into the product collection.
+
+    Args:
+        args: Parsed command line arguments
+        config: Application configuration
+    """
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    parse = iter_csv if fmt == "csv" else iter_ndjson
+    repo = _vector_db_repo(config)
+    embeddings = _embeddings(args.provider, config, repo.num_dimensions)
+    service = CatalogIngestionService(
+        repo, embeddings, batch_size=args.batch_size, prune_min_ratio=args.prune_min_ratio
+    )
+    stats = asyncio.run(service.ingest(parse(read_file_chunks(args.path)), prune=args.prune))
+    print(
+        f"Received {stats['received']} products: {stats['inserted']} inserted, "
+        f"{stats['updated']} updated, {stats['unchanged']} unchanged, {stats['deleted']} deleted, "
+        f"{stats['skipped']} skipped, {stats['failed']} failed"
+    )
+
+
+def backfill(args: argparse.Namespace, config: Config) -> None:
+    """
+    Re-embed the product collection into a new field and switch to it.
+
+    Args:
+        args: Parsed command line arguments
+        config: Application configuration
+    """
+    job = EmbeddingBackfillJob(
+        _vector_db_repo(config),
+        _embeddings(args.provider, config, args.dimensions),
+        target_field=args.field,
+        num_dimensions=args.dimensions,
+        index_name=args.index_name,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+    )
+    state = job.run(restart=args.restart, index_timeout=args.index_timeout)
+    print(f"Backfill of {args.field} is {state['status']} after {state['processed']} products")
+
+
+def tune(args: argparse.Namespace, config: Config) -> None:
+    """
+    Find the smallest numCandidates meeting a recall target and latency budget.
+
+    Args:
+        args: Parsed command line arguments
+        config: Application configuration
+    """
+    repo = _vector_db_repo(config)
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        sample = repo.get_collection().aggregate([
+            {"$match": {"product_title": {"$type": "string"}}},
+            {"$sample": {"size": args.sample}},
+            {"$project": {"product_title": 1}},
+        ])
+        queries = [document["product_title"] for document in sample]
+    if not queries:
+        raise SystemExit("No sample queries: pass --queries or load products first")
+
+    vector_store = VectorStoreService(repo, _embeddings(args.provider, config, repo.num_dimensions))
+    result = NumCandidatesTuner(
+        vector_store,
+        top_k=args.top_k,
+        target_recall=args.target_recall,
+        p95_budget_ms=args.p95_ms,
+    ).tune(queries)
+    for trial in result["trials"]:
+        print(f"numCandidates={trial['num_candidates']}: recall {trial['recall']:.3f}, p95 {trial['p95_ms']:.1f} ms")
+    if result["met"]:
+        print(f"VECTOR_NUM_CANDIDATES_MULTIPLIER={result['num_candidates_multiplier']}")
+    else:
+        print("No numCandidates setting met the recall target within the latency budget")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line parser.
+
+    Returns:
+        Parser with one subcommand per task
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="PickSmart maintenance tasks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snapshot_parser = commands.add_parser("snapshot", help="Build a memory-mapped vector index snapshot")
+    snapshot_parser.add_argument("--dir", help="Snapshot directory, defaults to VECTOR_SNAPSHOT_DIR")
+    snapshot_parser.add_argument(
+        "--dimensions", type=int, help="Vector dimensions, defaults to those of the active index"
+    )
+    snapshot_parser.add_argument("--keep", type=int, default=2, help="Number of snapshots to keep")
+    snapshot_parser.set_defaults(handler=snapshot)
+
+    ingest_parser = commands.add_parser("ingest", help="Load an NDJSON or CSV product catalog")
+    ingest_parser.add_argument("path", help="Catalog file")
+    ingest_parser.add_argument("--format", choices=["ndjson", "csv"], help="Defaults to the file extension")
+    ingest_parser.add_argument("--provider", choices=["mock", "cohere"], default="cohere")
+    ingest_parser.add_argument("--batch-size", type=int, default=512, help="Products per embedding call")
+    ingest_parser.add_argument("--prune", action="store_true", help="Delete products missing from the file")
+    ingest_parser.add_argument(
+        "--prune-min-ratio", type=float, default=0.9,
+        help="Fraction of the stored products the file must contain before pruning",
+    )
+    ingest_parser.set_defaults(handler=ingest)
+
+    backfill_parser = commands.add_parser("backfill", help="Re-embed products into a new field and index")
+    backfill_parser.add_argument("--field", required=True, help="Shadow field receiving the new embeddings")
+    backfill_parser.add_argument("--dimensions", type=int, required=True, help="Dimensions of the new model")
+    backfill_parser.add_argument("--index-name", help="Search index name, defaults to <field>_index")
+    backfill_parser.add_argument("--provider", choices=["mock", "cohere"], default="cohere")
+    backfill_parser.add_argument("--batch-size", type=int, default=256, help="Products per embedding call")
+    backfill_parser.add_argument("--concurrency", type=int, default=4, help="Embedding batches in flight")
+    backfill_parser.add_argument("--index-timeout", type=int, default=600, help="Seconds to wait for the index")
+    backfill_parser.add_argument(
+        "--restart", action="store_true", help="Ignore the checkpoint unless the index was already activated"
+    )
+    backfill_parser.set_defaults(handler=backfill)
+
+    tune_parser = commands.add_parser("tune", help="Tune numCandidates for a recall target and latency budget")
+    tune_parser.add_argument("--queries", help="File with one sample query per line")
+    tune_parser.add_argument("--sample", type=int, default=100, help="Product titles sampled when no file is given")
+    tune_parser.add_argument("--top-k", type=int, default=10)
+    tune_parser.add_argument("--target-recall", type=float, default=0.95)
+    tune_parser.add_argument("--p95-ms", type=float, default=100.0, help="p95 latency budget in milliseconds")
+    tune_parser.add_argument("--provider", choices=["mock", "cohere"], default="cohere")
+    tune_parser.set_defaults(handler=tune)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Run a maintenance task.
+
+    Args:
+        argv: Command line arguments, defaults to sys.argv
+    """
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    args.handler(args, Config())
+
+
+if __name__ == "__main__":
+    main()
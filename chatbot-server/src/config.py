@@ -19,13 +19,21 @@ from src.interfaces import (
     IVectorStoreService,
     IChatService,
 )
-from src.adapters.llm import GroqProvider
-from src.adapters.search import TavilyHybridSearchProvider, TavilySourceSearchProvider
+from src.adapters.llm import CachedLLMClient, GroqProvider
+from src.adapters.search import (
+    CachedSourceSearchProvider,
+    TavilyHybridSearchProvider,
+    TavilySourceSearchProvider,
+)
 from src.adapters.vector import MongoDBVectorProvider
 from src.adapters.model_provider import CustomModelProvider, default_model_path
-from src.repositories import VectorDBRepository
+from src.repositories import LocalVectorIndex, VectorDBRepository, VectorSnapshotStore
 from src.services import ChatService, PromptMessage
+from src.services.semantic_cache import SemanticCache
 from src.services.vector_store import VectorStoreService
+from src.services.local_vector_store import LocalVectorStoreService
+from src.services.ingestion import CatalogIngestionService
+from src.utils import EmbeddingCache
 
 logger = logging.getLogger(__name__)
 
@@ -77,6 +85,87 @@ class Config:
         """Get MongoDB database name from environment."""
         return os.getenv("MONGO_DB_NAME", "picksmart")
 
+    @property
+    def response_cache_size(self) -> int:
+        """Get maximum number of cached chat results from environment."""
+        return int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+
+    @property
+    def response_cache_ttl(self) -> float:
+        """Get lifetime in seconds of cached chat results from environment."""
+        return float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+
+    @property
+    def llm_cache_path(self) -> str:
+        """Get SQLite file of the persistent LLM completion cache, empty if disabled."""
+        return os.getenv("LLM_CACHE_PATH", "")
+
+    @property
+    def semantic_cache_threshold(self) -> Optional[float]:
+        """Get semantic cache similarity threshold from environment, None if disabled."""
+        value = os.getenv("SEMANTIC_CACHE_THRESHOLD", "")
+        return float(value) if value else None
+
+    @property
+    def vector_backend(self) -> str:
+        """Get vector search backend from environment: mongodb or local."""
+        return os.getenv("VECTOR_BACKEND", "mongodb").lower()
+
+    @property
+    def vector_snapshot_dir(self) -> str:
+        """Get directory of local vector index snapshots, empty if disabled."""
+        return os.getenv("VECTOR_SNAPSHOT_DIR", "")
+
+    @property
+    def vector_num_candidates_multiplier(self) -> int:
+        """Get nearest-neighbour candidates considered per requested result from environment."""
+        return int(os.getenv("VECTOR_NUM_CANDIDATES_MULTIPLIER", "10"))
+
+    @property
+    def vector_exact_search(self) -> bool:
+        """Whether vector searches score every document instead of using the index graph."""
+        return os.getenv("VECTOR_EXACT_SEARCH", "false").lower() in ("1", "true", "yes")
+
+    @property
+    def embedding_cache_size(self) -> int:
+        """Get maximum number of embeddings cached in memory from environment."""
+        return int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+
+    @property
+    def embedding_cache_path(self) -> str:
+        """Get directory of the memory-mapped embedding cache, empty if disabled."""
+        return os.getenv("EMBEDDING_CACHE_PATH", "")
+
+    @property
+    def embedding_batch_wait_ms(self) -> float:
+        """Get milliseconds embedding requests wait to be batched from environment."""
+        return float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+
+    @property
+    def search_concurrency(self) -> int:
+        """Get maximum number of revised queries searched at once from environment."""
+        return int(os.getenv("SEARCH_CONCURRENCY", "3"))
+
+    @property
+    def search_timeout(self) -> float:
+        """Get seconds to wait for a single revised query search from environment."""
+        return float(os.getenv("SEARCH_TIMEOUT", "20"))
+
+    @property
+    def source_cache_ttl(self) -> float:
+        """Get lifetime in seconds of cached product sources from environment."""
+        return float(os.getenv("SOURCE_CACHE_TTL", "86400"))
+
+    @property
+    def source_cache_negative_ttl(self) -> float:
+        """Get lifetime in seconds of cached "not found" product sources from environment."""
+        return float(os.getenv("SOURCE_CACHE_NEGATIVE_TTL", "600"))
+
+    @property
+    def source_cache_persistent(self) -> bool:
+        """Whether product sources are also cached in MongoDB."""
+        return os.getenv("SOURCE_CACHE_PERSISTENT", "false").lower() in ("1", "true", "yes")
+
 
 class DependencyContainer:
     """
@@ -99,8 +188,10 @@ class DependencyContainer:
         # Model provider
         self._model_provider = CustomModelProvider(default_model_path())
         
-        # LLM adapter
+        # LLM adapter, optionally behind the persistent completion cache
         self._llm_client = GroqProvider(api_key=self.config.groq_api_key)
+        if self.config.llm_cache_path:
+            self._llm_client = CachedLLMClient(self._llm_client, cache_path=self.config.llm_cache_path)
         
         # Vector database adapter
         mongo_provider = MongoDBVectorProvider(
@@ -111,30 +202,81 @@ class DependencyContainer:
         )
         self._mongo_db = mongo_provider.get_database()
         
-        # Vector DB repository
-        self._vector_db_repo = VectorDBRepository(self._mongo_db)
+        # Vector DB repository, with an async database for the search endpoints
+        self._vector_db_repo = VectorDBRepository(self._mongo_db, async_db=mongo_provider.get_async_database())
         
         # Embeddings service (mock for now)
         from src.services.embeddings import EmbeddingsService
         self._embeddings_service = EmbeddingsService(provider_type="mock")
         
         # Vector store service
-        self._vector_store_service = VectorStoreService(
-            vector_db_repo=self._vector_db_repo,
-            embeddings_service=self._embeddings_service,
-        )
+        if self.config.vector_backend == "local":
+            snapshots = VectorSnapshotStore(self.config.vector_snapshot_dir) if self.config.vector_snapshot_dir else None
+            self._vector_store_service = LocalVectorStoreService(
+                index=self._load_local_index(snapshots),
+                embeddings_service=self._embeddings_service,
+                snapshots=snapshots,
+            )
+        else:
+            self._vector_store_service = VectorStoreService(
+                vector_db_repo=self._vector_db_repo,
+                embeddings_service=self._embeddings_service,
+                num_candidates_multiplier=self.config.vector_num_candidates_multiplier,
+                exact=self.config.vector_exact_search,
+            )
         
         # Search adapters
         self._hybrid_search = TavilyHybridSearchProvider(
             api_key=self.config.tavily_api_key,
             mongo_db=self._mongo_db,
             cohere_api_key=self.config.cohere_api_key,
+            embedding_cache=EmbeddingCache(
+                maxsize=self.config.embedding_cache_size,
+                path=self.config.embedding_cache_path or None,
+            ),
+            embedding_batch_wait_ms=self.config.embedding_batch_wait_ms,
+            index_name=self._vector_db_repo.index_name,
+            embedding_field=self._vector_db_repo.embedding_field,
+            active_index=self._vector_db_repo.refresh_active_index,
         )
         
-        self._source_search = TavilySourceSearchProvider(
-            api_key=self.config.tavily_api_key,
+        # Source search adapter behind the title cache
+        self._source_search = CachedSourceSearchProvider(
+            TavilySourceSearchProvider(api_key=self.config.tavily_api_key),
+            ttl=self.config.source_cache_ttl,
+            negative_ttl=self.config.source_cache_negative_ttl,
+            collection=self._mongo_db["product_sources_cache"] if self.config.source_cache_persistent else None,
         )
     
+    def _load_local_index(self, snapshots: Optional[VectorSnapshotStore] = None) -> LocalVectorIndex:
+        """
+        Open the in-process vector index.
+        
+        Maps the active snapshot when there is one, otherwise builds the
+        index from the product collection.
+        
+        Args:
+            snapshots: Snapshot store to open, if configured
+            
+        Returns:
+            Populated index, or an empty one if no source is reachable
+        """
+        if snapshots is not None:
+            try:
+                index = snapshots.load()
+                if index is not None:
+                    logger.info(f"Mapped {len(index)} documents from snapshot '{snapshots.current()}'")
+                    return index
+            except Exception as e:
+                logger.warning(f"Could not open vector snapshot: {e}")
+        try:
+            index = LocalVectorIndex.from_documents(self._vector_db_repo.get_collection().find({}))
+            logger.info(f"Loaded {len(index)} documents into the local vector index")
+            return index
+        except Exception as e:
+            logger.warning(f"Could not load product embeddings, starting with an empty local index: {e}")
+            return LocalVectorIndex()
+
     @property
     def llm_client(self) -> LLMClientInterface:
         """Get LLM client adapter."""
@@ -160,6 +302,26 @@ class DependencyContainer:
         """Get vector store service."""
         return self._vector_store_service
     
+    @property
+    def ingestion_service(self) -> CatalogIngestionService:
+        """
+        Get catalog ingestion service.
+        
+        Products are embedded with Cohere, the model chat searches query
+        the product index with, never with the mock embedder.
+        """
+        if "ingestion" not in self._services:
+            from src.services.embeddings import EmbeddingsService
+            self._services["ingestion"] = CatalogIngestionService(
+                vector_db_repo=self._vector_db_repo,
+                embeddings_service=EmbeddingsService(
+                    provider_type="cohere",
+                    api_key=self.config.cohere_api_key,
+                    batch_wait_ms=self.config.embedding_batch_wait_ms,
+                ),
+            )
+        return self._services["ingestion"]
+    
     @property
     def vector_db_repo(self) -> VectorDBRepository:
         """Get vector database repository."""
@@ -177,6 +339,21 @@ class DependencyContainer:
             ("human", PromptMessage.Human_Message),
             ("ai", PromptMessage.AI_Message),
         ])
+
+        # The semantic cache needs semantic query embeddings; the mock
+        # embedder hashes words and would match different budgets
+        semantic_cache = None
+        if self.config.semantic_cache_threshold is not None:
+            from src.services.embeddings import EmbeddingsService
+            semantic_cache = SemanticCache(
+                embeddings_service=EmbeddingsService(
+                    provider_type="cohere",
+                    api_key=self.config.cohere_api_key,
+                    batch_wait_ms=self.config.embedding_batch_wait_ms,
+                ),
+                threshold=self.config.semantic_cache_threshold,
+                ttl=self.config.response_cache_ttl,
+            )
         
         return ChatService(
             template=template,
@@ -184,6 +361,11 @@ class DependencyContainer:
             llm_model=self.model_provider.get_model_name(),
             hybrid_search=self.hybrid_search,
             source_search=self.source_search,
+            response_cache_size=self.config.response_cache_size,
+            response_cache_ttl=self.config.response_cache_ttl,
+            semantic_cache=semantic_cache,
+            search_concurrency=self.config.search_concurrency,
+            search_timeout=self.config.search_timeout,
         )
 
 
@@ -5,7 +5,7 @@ Defines abstract interfaces that all service implementations must follow,
 enabling loose coupling and easy testing with mock implementations.
 """
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 
 class LLMClientInterface(ABC):
@@ -33,6 +33,42 @@ class LLMClientInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    async def agenerate(self, prompt: str, model: str) -> str:
+        """
+        Asynchronously generate a response from a prompt using a specific model.
+        
+        Non-blocking counterpart of generate, safe to await from the event loop.
+        
+        Args:
+            prompt: The prompt text to send to the model
+            model: The model identifier to use for generation
+            
+        Returns:
+            The text response from the model
+            
+        Raises:
+            ValueError: If prompt is not a string
+        """
+        pass
+
+    @abstractmethod
+    def astream(self, prompt: str, model: str) -> AsyncIterator[str]:
+        """
+        Stream a response from a prompt as it is being generated.
+        
+        Args:
+            prompt: The prompt text to send to the model
+            model: The model identifier to use for generation
+            
+        Yields:
+            Text fragments of the response in generation order
+            
+        Raises:
+            ValueError: If prompt is not a string
+        """
+        pass
+
 
 class HybridSearchInterface(ABC):
     """
@@ -77,6 +113,20 @@ class ProductSourceSearchInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    async def afind_sources(self, titles: List[str]) -> List[Optional[Dict[str, str]]]:
+        """
+        Asynchronously resolve product sources and images for product titles.
+        
+        Args:
+            titles: List of product titles to find sources for
+            
+        Returns:
+            List of dictionaries containing source information, aligned with
+            titles, None where the lookup failed
+        """
+        pass
+
 
 class ModelProviderInterface(ABC):
     """
@@ -28,7 +28,21 @@ class IChatService(ABC):
         pass
     
     @abstractmethod
-    def is_query_relevant(self, query: str) -> bool:
+    async def aquery_llm(self, prompt: str, model: str) -> str:
+        """
+        Query the LLM asynchronously.
+        
+        Args:
+            prompt: Prompt text
+            model: Model identifier
+            
+        Returns:
+            LLM response
+        """
+        pass
+    
+    @abstractmethod
+    async def is_query_relevant(self, query: str) -> bool:
         """
         Check if query is relevant to the service's domain.
         
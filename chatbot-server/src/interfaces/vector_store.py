@@ -56,6 +56,39 @@ class IVectorStoreService(ABC):
         """
         pass
     
+    @abstractmethod
+    async def asearch_similar(self,
+                              query: str,
+                              top_k: int = 5,
+                              department: Optional[str] = None,
+                              region: Optional[str] = None) -> List[Dict]:
+        """
+        Search for semantically similar products without blocking the event loop.
+        
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            department: Filter by department
+            region: Filter by region
+            
+        Returns:
+            List of similar products with scores
+        """
+        pass
+    
+    @abstractmethod
+    async def asearch_batch(self, searches: List[Dict]) -> List[List[Dict]]:
+        """
+        Run many semantic searches with one batched embedding call.
+        
+        Args:
+            searches: Searches with query and optional top_k, department and region
+            
+        Returns:
+            Results of each search, in the order of searches
+        """
+        pass
+    
     @abstractmethod
     def insert_vector(self, doc_id: str, text: str, metadata: Dict) -> str:
         """
@@ -64,6 +64,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         
         app.state.chat_service = chat_service
         app.state.vector_store = vector_store
+        app.state.ingestion_service = container.ingestion_service
         
         logger.info("Application initialized successfully")
         
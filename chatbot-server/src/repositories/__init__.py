@@ -5,8 +5,12 @@ Contains repositories for database operations and data persistence.
 """
 from .vector_db_repository import VectorDBRepository
 from .in_memory import InMemoryConversationStore
+from .local_vector_index import LocalVectorIndex
+from .vector_snapshot import VectorSnapshotStore
 
 __all__ = [
     "VectorDBRepository",
     "InMemoryConversationStore",
+    "LocalVectorIndex",
+    "VectorSnapshotStore",
 ]
@@ -0,0 +1,562 @@
+"""
+In-process vector index.
+
+Holds product embeddings in memory and answers cosine similarity
+searches without a network round-trip.
+"""
+import heapq
+import logging
+import math
+import random
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.interfaces import VectorStoreInterface
+
+logger = logging.getLogger(__name__)
+
+
+class _HNSWGraph:
+    """
+    Hierarchical navigable small world graph over rows of a vector matrix.
+
+    Nodes are row numbers of the owning index; vectors are passed in on
+    every call because the index reallocates its matrix as it grows.
+    Scores are inner products of unit vectors, i.e. cosine similarities.
+
+    Searches may run while a node is inserted. They only visit rows below
+    the row count they were given, so rows inserted after the caller read
+    its matrix are never scored against it.
+    """
+
+    def __init__(self, m: int = 16, ef_construction: int = 100, seed: int = 42) -> None:
+        """
+        Initialize an empty graph.
+
+        Args:
+            m: Maximum neighbors per node on upper layers, doubled on layer 0
+            ef_construction: Candidate list size while inserting
+            seed: Seed of the level generator
+        """
+        self.m = m
+        self.ef_construction = ef_construction
+        self._level_mult = 1 / math.log(m)
+        self._rng = random.Random(seed)
+        self._links: Dict[int, List[List[int]]] = {}
+        # (node, level) of every entry point so far, the current one last
+        self._entries: List[Tuple[int, int]] = []
+
+    def add(self, node: int, vectors: np.ndarray) -> None:
+        """
+        Insert a row into the graph.
+
+        Args:
+            node: Row number of the vector
+            vectors: Matrix holding the row
+        """
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        self._links[node] = [[] for _ in range(level + 1)]
+        if not self._entries:
+            self._entries.append((node, level))
+            return
+
+        query = vectors[node]
+        entry, max_level = self._entries[-1]
+        size = len(vectors)
+        entry_points = [entry]
+        for layer in range(max_level, level, -1):
+            entry_points = [self._search_layer(query, entry_points, 1, layer, vectors, size)[0][1]]
+
+        for layer in range(min(level, max_level), -1, -1):
+            found = self._search_layer(query, entry_points, self.ef_construction, layer, vectors, size)
+            limit = self.m * 2 if layer == 0 else self.m
+            neighbors = self._select_neighbors(found, limit, vectors)
+            self._links[node][layer] = neighbors
+            for neighbor in neighbors:
+                links = self._links[neighbor][layer] + [node]
+                if len(links) > limit:
+                    scores = (vectors[links] @ vectors[neighbor]).tolist()
+                    links = self._select_neighbors(sorted(zip(scores, links), reverse=True), limit, vectors)
+                self._links[neighbor][layer] = links
+            entry_points = [candidate for _, candidate in found]
+
+        if level > max_level:
+            self._entries.append((node, level))
+
+    @staticmethod
+    def _select_neighbors(candidates: List[Tuple[float, int]], limit: int, vectors: np.ndarray) -> List[int]:
+        """
+        Pick diverse neighbors by the HNSW heuristic.
+
+        A candidate is linked only if it is closer to the node than to every
+        neighbor picked so far, so links spread across clusters instead of
+        all pointing into the nearest one. Remaining slots are filled with
+        the closest skipped candidates.
+
+        Args:
+            candidates: (score, row) pairs, best first
+            limit: Maximum number of neighbors
+            vectors: Matrix holding the rows
+
+        Returns:
+            Rows of the chosen neighbors
+        """
+        rows = [candidate for _, candidate in candidates]
+        scores = np.asarray([score for score, _ in candidates], dtype=np.float32)
+        matrix = vectors[rows]
+        # blocked[j]: candidate j is closer to an already chosen neighbor than to the node
+        blocked = np.zeros(len(rows), dtype=bool)
+        chosen: List[int] = []
+        for i in range(len(rows)):
+            if blocked[i]:
+                continue
+            chosen.append(i)
+            if len(chosen) >= limit:
+                break
+            blocked |= matrix @ matrix[i] > scores
+        blocked[chosen] = False
+        skipped = np.flatnonzero(blocked)[:limit - len(chosen)].tolist()
+        return [rows[i] for i in chosen + skipped]
+
+    def search(self,
+               query: np.ndarray,
+               k: int,
+               ef: int,
+               vectors: np.ndarray,
+               size: int) -> List[Tuple[float, int]]:
+        """
+        Approximate nearest neighbors of a query.
+
+        Args:
+            query: Unit query vector
+            k: Minimum number of candidates to return
+            ef: Candidate list size on layer 0
+            vectors: Matrix holding the graph's rows
+            size: Number of rows of vectors the graph may visit
+
+        Returns:
+            List of (score, row) pairs, best first, all below size
+        """
+        # The newest entry point may have been inserted after vectors was read
+        entry = next(((node, level) for node, level in reversed(self._entries) if node < size), None)
+        if entry is None:
+            return []
+        entry_points = [entry[0]]
+        for layer in range(entry[1], 0, -1):
+            entry_points = [self._search_layer(query, entry_points, 1, layer, vectors, size)[0][1]]
+        return self._search_layer(query, entry_points, max(ef, k), 0, vectors, size)
+
+    def _search_layer(self,
+                      query: np.ndarray,
+                      entry_points: List[int],
+                      ef: int,
+                      layer: int,
+                      vectors: np.ndarray,
+                      size: int) -> List[Tuple[float, int]]:
+        """
+        Best-first search of one layer.
+
+        Args:
+            query: Unit query vector
+            entry_points: Rows to start from
+            ef: Number of best candidates to keep
+            layer: Graph layer
+            vectors: Matrix holding the graph's rows
+            size: Rows at or above this are skipped
+
+        Returns:
+            Up to ef (score, row) pairs, best first
+        """
+        visited = set(entry_points)
+        scores = (vectors[entry_points] @ query).tolist()
+        candidates = [(-score, node) for score, node in zip(scores, entry_points)]
+        results = [(score, node) for score, node in zip(scores, entry_points)]
+        heapq.heapify(candidates)
+        heapq.heapify(results)
+
+        while candidates:
+            negative, node = heapq.heappop(candidates)
+            if len(results) >= ef and -negative < results[0][0]:
+                break
+            neighbors = [n for n in self._links[node][layer] if n < size and n not in visited]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+            for score, neighbor in zip((vectors[neighbors] @ query).tolist(), neighbors):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbor))
+                    heapq.heappush(results, (score, neighbor))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+
+class LocalVectorIndex(VectorStoreInterface):
+    """
+    In-memory cosine similarity index with attribute filters.
+
+    Vectors are kept unit-normalized in one float32 matrix. Small catalogs
+    are searched exactly with a single matrix-vector product. Once the
+    catalog reaches hnsw_threshold documents, an HNSW graph is built in the
+    background and unfiltered searches become approximate once it is
+    ready. Filtered searches stay exact while the filtered subset is small
+    enough to scan.
+
+    The default threshold comes from benchmarks/bench_local_vector_index.py:
+    up to 50k 1024-dimensional vectors an exact scan answers within about
+    30 ms at p95, while the graph takes minutes to build.
+
+    Removed documents are tombstoned and skipped by searches.
+    """
+
+    FILTER_FIELDS = ("department", "region")
+
+    def __init__(self,
+                 dimensions: int = 1024,
+                 hnsw_threshold: int = 50000,
+                 m: int = 16,
+                 ef_construction: int = 100,
+                 ef_search: int = 64) -> None:
+        """
+        Initialize an empty index.
+
+        Args:
+            dimensions: Vector dimensions
+            hnsw_threshold: Document count from which an HNSW graph is used
+            m: HNSW neighbors per node
+            ef_construction: HNSW candidate list size while inserting
+            ef_search: HNSW candidate list size while searching
+        """
+        self.dimensions = dimensions
+        self.hnsw_threshold = hnsw_threshold
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._attributes = {field: np.empty(0, dtype=object) for field in self.FILTER_FIELDS}
+        self._ids: Sequence[str] = []
+        self._documents: Sequence[Optional[Dict]] = []
+        # None while ids and documents are snapshot-backed, see _materialize
+        self._positions: Optional[Dict[str, int]] = {}
+        self._size = 0
+        self._graph: Optional[_HNSWGraph] = None
+        self._builder: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size if self._positions is None else len(self._positions)
+
+    def create_vector_index(self, wait: bool = False) -> None:
+        """
+        Start building the HNSW graph once the catalog is large enough.
+
+        The graph is built on a background thread without holding the
+        index lock, and swapped in once it covers every row, so searches
+        and additions continue exactly meanwhile. Smaller catalogs keep
+        using exact search, so this is a no-op for them.
+
+        Args:
+            wait: Block until the graph is in use
+        """
+        with self._lock:
+            if self._graph is not None or len(self) < self.hnsw_threshold:
+                return
+            builder = self._builder
+            if builder is None:
+                builder = self._builder = threading.Thread(target=self._build_graph, name="hnsw-build", daemon=True)
+                builder.start()
+        if wait:
+            builder.join()
+
+    def _build_graph(self) -> None:
+        """Build the HNSW graph, catching up on rows added meanwhile, then swap it in."""
+        graph = _HNSWGraph(m=self.m, ef_construction=self.ef_construction)
+        built = 0
+        started = time.perf_counter()
+        try:
+            while True:
+                with self._lock:
+                    size, vectors = self._size, self._vectors
+                    if built == size:
+                        self._graph = graph
+                        break
+                logger.info(f"Building HNSW graph over vectors {built} to {size}...")
+                for row in range(built, size):
+                    graph.add(row, vectors)
+                built = size
+            logger.info(f"HNSW graph over {built} vectors ready after {time.perf_counter() - started:.1f}s.")
+        except Exception as e:
+            logger.error(f"Building HNSW graph failed, searches stay exact: {e}")
+        finally:
+            with self._lock:
+                self._builder = None
+
+    def add(self, doc_id: str, vector: Sequence[float], document: Dict) -> None:
+        """
+        Add or replace one document.
+
+        Args:
+            doc_id: Document identifier
+            vector: Document embedding
+            document: Document returned by searches
+        """
+        self.add_many([doc_id], np.asarray([vector], dtype=np.float32), [document])
+
+    def add_many(self, doc_ids: List[str], vectors: np.ndarray, documents: List[Dict]) -> None:
+        """
+        Add or replace documents in one append.
+
+        Args:
+            doc_ids: Document identifiers
+            vectors: Matrix of document embeddings, one row per document
+            documents: Documents returned by searches
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimensions:
+            raise ValueError(f"Expected vectors of {self.dimensions} dimensions, but got shape {matrix.shape}")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+        with self._lock:
+            self._materialize()
+            start = self._size
+            self._reserve(start + len(doc_ids))
+            self._vectors[start:start + len(doc_ids)] = matrix
+            for offset, (doc_id, document) in enumerate(zip(doc_ids, documents)):
+                row = start + offset
+                previous = self._positions.get(doc_id)
+                if previous is not None:
+                    self._tombstone(previous)
+                self._positions[doc_id] = row
+                self._ids.append(doc_id)
+                self._documents.append(document)
+                self._live[row] = True
+                for field, values in self._attributes.items():
+                    values[row] = document.get(field)
+            self._size = start + len(doc_ids)
+            if self._graph is not None:
+                for row in range(start, self._size):
+                    self._graph.add(row, self._vectors)
+
+        if self._graph is None and len(self) >= self.hnsw_threshold:
+            self.create_vector_index()
+
+    def remove(self, doc_id: str) -> bool:
+        """
+        Remove a document.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            True if the document was indexed
+        """
+        with self._lock:
+            self._materialize()
+            row = self._positions.pop(doc_id, None)
+            if row is None:
+                return False
+            self._tombstone(row)
+            return True
+
+    def search(self,
+               vector: Sequence[float],
+               top_k: int = 5,
+               filters: Optional[Dict[str, str]] = None) -> List[Tuple[float, Dict]]:
+        """
+        Find the documents most similar to a vector.
+
+        Args:
+            vector: Query embedding
+            top_k: Number of results to return
+            filters: Exact-match values of filter fields, e.g. department
+
+        Returns:
+            List of (cosine similarity, document) pairs, best first
+        """
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        with self._lock:
+            size = self._size
+            vectors = self._vectors
+            graph = self._graph
+            mask = self._live[:size].copy()
+            for field, value in (filters or {}).items():
+                if value is not None:
+                    mask &= self._attributes[field][:size] == value
+            documents = self._documents
+
+        if top_k <= 0 or not mask.any():
+            return []
+
+        rows = np.flatnonzero(mask)
+        if graph is not None and len(rows) > self.hnsw_threshold:
+            selectivity = len(rows) / size
+            ef = int(max(self.ef_search, top_k) / selectivity)
+            found = [
+                (score, row) for score, row in graph.search(query, top_k, ef, vectors, size)
+                if row < size and mask[row]
+            ]
+            if len(found) >= top_k:
+                return [(score, documents[row]) for score, row in found[:top_k]]
+
+        if len(rows) * 2 > size:
+            # Gathering most rows would copy the matrix; scoring the contiguous prefix is cheaper
+            scores = (vectors[:size] @ query)[rows]
+        else:
+            scores = vectors[rows] @ query
+        if len(rows) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-scores[best])]
+        return [(float(scores[i]), documents[rows[i]]) for i in best]
+
+    def items(self) -> Iterator[Tuple[Dict, np.ndarray]]:
+        """
+        Iterate over live documents with their normalized vectors.
+
+        Yields:
+            Tuples of document and vector row
+        """
+        with self._lock:
+            vectors = self._vectors
+            documents = self._documents
+            rows = np.flatnonzero(self._live[:self._size])
+        for row in rows:
+            yield documents[row], vectors[row]
+
+    def _reserve(self, capacity: int) -> None:
+        """
+        Grow the storage arrays to hold at least capacity rows.
+
+        Must be called with the lock held. Grows geometrically, and copies
+        instead of resizing in place so concurrent searches keep a valid
+        view of the old arrays.
+
+        Args:
+            capacity: Required number of rows
+        """
+        current = self._vectors.shape[0]
+        if capacity <= current:
+            return
+        new_capacity = max(capacity, current * 2, 1024)
+        vectors = np.zeros((new_capacity, self.dimensions), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        live = np.zeros(new_capacity, dtype=bool)
+        live[:self._size] = self._live[:self._size]
+        for field, values in self._attributes.items():
+            grown = np.empty(new_capacity, dtype=object)
+            grown[:self._size] = values[:self._size]
+            self._attributes[field] = grown
+        self._vectors, self._live = vectors, live
+
+    def _materialize(self) -> None:
+        """
+        Copy snapshot-backed ids and documents into memory before the first change.
+
+        Must be called with the lock held.
+        """
+        if self._positions is not None:
+            return
+        self._ids = [str(doc_id) for doc_id in self._ids]
+        self._documents = list(self._documents)
+        self._positions = {doc_id: row for row, doc_id in enumerate(self._ids)}
+
+    def _tombstone(self, row: int) -> None:
+        """
+        Hide a row from searches. Must be called with the lock held.
+
+        Args:
+            row: Row number
+        """
+        self._live[row] = False
+        self._documents[row] = None
+
+    @classmethod
+    def from_arrays(cls,
+                    doc_ids: Sequence[str],
+                    vectors: np.ndarray,
+                    documents: Sequence[Dict],
+                    attributes: Optional[Dict[str, np.ndarray]] = None,
+                    **kwargs) -> "LocalVectorIndex":
+        """
+        Wrap existing unit-normalized vectors without copying them.
+
+        Used for read-only memory-mapped snapshots. The ids, filter values
+        and documents are only read on access too; the matrix is copied
+        if documents are added later, and the ids and documents are loaded
+        into memory on the first addition or removal. No HNSW graph is
+        built until create_vector_index is called.
+
+        Args:
+            doc_ids: Document identifiers, one per row
+            vectors: Unit-normalized float32 matrix
+            documents: Documents returned by searches, one per row
+            attributes: Values of each filter field, one per row, read
+                from the documents if not given
+            **kwargs: Index parameters
+
+        Returns:
+            Index backed by vectors
+        """
+        index = cls(dimensions=vectors.shape[1], **kwargs)
+        size = len(doc_ids)
+        index._vectors = vectors
+        index._live = np.ones(size, dtype=bool)
+        for field in cls.FILTER_FIELDS:
+            if attributes is not None:
+                index._attributes[field] = attributes[field]
+            else:
+                values = np.empty(size, dtype=object)
+                values[:] = [document.get(field) for document in documents]
+                index._attributes[field] = values
+        index._ids = doc_ids
+        index._documents = documents
+        index._positions = None
+        index._size = size
+        return index
+
+    @classmethod
+    def from_documents(cls,
+                       documents: Iterable[Dict],
+                       embedding_field: str = "product_title_embedding",
+                       batch_size: int = 1000,
+                       **kwargs) -> "LocalVectorIndex":
+        """
+        Build an index from stored documents carrying their embeddings.
+
+        Args:
+            documents: Documents, e.g. a MongoDB cursor
+            embedding_field: Field holding the embedding
+            batch_size: Number of documents appended at once
+            **kwargs: Index parameters
+
+        Returns:
+            Populated index
+        """
+        index = cls(**kwargs)
+        ids, vectors, docs = [], [], []
+        for document in documents:
+            vector = document.get(embedding_field)
+            if vector is None:
+                continue
+            doc = {key: value for key, value in document.items() if key != embedding_field}
+            doc["_id"] = str(doc.get("_id"))
+            ids.append(doc["_id"])
+            vectors.append(vector)
+            docs.append(doc)
+            if len(ids) >= batch_size:
+                index.add_many(ids, np.asarray(vectors, dtype=np.float32), docs)
+                ids, vectors, docs = [], [], []
+        if ids:
+            index.add_many(ids, np.asarray(vectors, dtype=np.float32), docs)
+        return index
@@ -3,9 +3,13 @@ Vector database repository for MongoDB operations.
 
 Handles database initialization, index creation, and vector search setup.
 """
+import asyncio
 import logging
 import time
+from typing import Dict, List, Optional, Tuple
 
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.database import Database
 from pymongo.operations import SearchIndexModel
 
@@ -20,24 +24,40 @@ class VectorDBRepository:
     for efficient semantic search on product embeddings.
     """
     
-    def __init__(self, mongo_db: Database) -> None:
+    def __init__(self,
+                 mongo_db: Database,
+                 async_db: Optional[AsyncDatabase] = None,
+                 refresh_interval: float = 30.0) -> None:
         """
         Initialize vector database repository.
         
         Args:
             mongo_db: MongoDB database instance
+            async_db: Optional asyncio database instance for non-blocking queries
+            refresh_interval: Seconds between re-reads of the active index settings
         """
         self.mongo_db = mongo_db
+        self.async_db = async_db
         self.collection_name = "embedded_picksmart"
+        self.settings_collection_name = "vector_index_settings"
         self.index_name = "pick_smart_vector_index"
+        self.embedding_field = "product_title_embedding"
+        self.num_dimensions = 1024
+        self.product_id_field = "product_id"
+        self.filter_fields = ("department", "region")
+        self.refresh_interval = refresh_interval
+        self._loaded_at = float("-inf")
     
     def initialize(self) -> None:
         """
         Initialize the vector database with indexes.
         
-        Creates collection and vector search index if they don't exist.
+        Loads the active index settings, then creates collection and
+        vector search index if they don't exist.
         """
+        self.load_active_index()
         self.create_collection()
+        self.create_product_index()
         self.create_vector_index()
     
     def create_collection(self) -> None:
@@ -51,34 +71,166 @@ class VectorDBRepository:
             self.mongo_db.create_collection(self.collection_name)
             logger.info(f"Collection '{self.collection_name}' created successfully.")
     
-    def create_vector_index(self) -> None:
+    def create_product_index(self) -> None:
+        """
+        Create the unique index on product IDs used by catalog upserts.
+        
+        Documents inserted before products carried an ID are left out of
+        the index, so it can be added to an existing collection.
+        """
+        collection = self.mongo_db.get_collection(self.collection_name)
+        collection.create_index(
+            self.product_id_field,
+            name=f"{self.product_id_field}_unique",
+            unique=True,
+            partialFilterExpression={self.product_id_field: {"$exists": True}},
+        )
+    
+    def load_active_index(self) -> None:
+        """
+        Load the active vector index settings.
+        
+        Keeps the built-in defaults when no index was ever activated.
+        """
+        self._loaded_at = time.monotonic()
+        settings = self.mongo_db.get_collection(self.settings_collection_name).find_one({"_id": "active"})
+        self._apply_active_index(settings)
+    
+    def refresh_active_index(self) -> Tuple[str, str]:
+        """
+        Re-read the active index settings once they are refresh_interval old.
+        
+        Lets running servers follow an activate_index call made by another
+        process, such as a backfill, without a restart. A failed read keeps
+        the current settings until the next interval. Blocks on the read,
+        so async callers use arefresh_active_index instead.
+        
+        Returns:
+            Search index name and the embedding field it covers
+        """
+        if time.monotonic() - self._loaded_at >= self.refresh_interval:
+            try:
+                self.load_active_index()
+            except Exception as e:
+                logger.warning(f"Could not re-read the active vector index: {e}")
+        return self.active_index()
+    
+    async def arefresh_active_index(self) -> Tuple[str, str]:
+        """
+        Re-read the active index settings when due without blocking the event loop.
+        
+        Reads through the async database, or in a worker thread when none
+        is configured. Concurrent callers share one read per interval.
+        
+        Returns:
+            Search index name and the embedding field it covers
+        """
+        if time.monotonic() - self._loaded_at < self.refresh_interval:
+            return self.active_index()
+        if self.async_db is None:
+            return await asyncio.to_thread(self.refresh_active_index)
+        self._loaded_at = time.monotonic()
+        try:
+            settings = await self.async_db.get_collection(self.settings_collection_name).find_one({"_id": "active"})
+        except Exception as e:
+            logger.warning(f"Could not re-read the active vector index: {e}")
+        else:
+            self._apply_active_index(settings)
+        return self.active_index()
+    
+    def active_index(self) -> Tuple[str, str]:
+        """
+        Get the active index as last loaded, without reading the database.
+        
+        Returns:
+            Search index name and the embedding field it covers
+        """
+        return self.index_name, self.embedding_field
+    
+    def _apply_active_index(self, settings: Optional[Dict]) -> None:
+        """
+        Switch to the active index settings read from the database.
+        
+        Args:
+            settings: Settings document, None when no index was ever activated
+        """
+        if not settings:
+            return
+        changed = (settings["index_name"], settings["embedding_field"]) != (self.index_name, self.embedding_field)
+        self.index_name, self.embedding_field = settings["index_name"], settings["embedding_field"]
+        self.num_dimensions = settings["num_dimensions"]
+        if changed:
+            logger.info(f"Using vector index '{self.index_name}' on field '{self.embedding_field}'")
+    
+    def activate_index(self, index_name: str, embedding_field: str, num_dimensions: int) -> None:
+        """
+        Make a vector index the one searches and ingestion use.
+        
+        The settings live in a single document, so readers switch from the
+        old index to the new one in one write.
+        
+        Args:
+            index_name: Search index name
+            embedding_field: Field the index covers
+            num_dimensions: Vector dimensions of the field
+        """
+        self.mongo_db.get_collection(self.settings_collection_name).replace_one(
+            {"_id": "active"},
+            {"index_name": index_name, "embedding_field": embedding_field, "num_dimensions": num_dimensions},
+            upsert=True,
+        )
+        self.index_name = index_name
+        self.embedding_field = embedding_field
+        self.num_dimensions = num_dimensions
+        self._loaded_at = time.monotonic()
+        logger.info(f"Activated vector index '{index_name}' on field '{embedding_field}'")
+    
+    def create_vector_index(self,
+                            index_name: Optional[str] = None,
+                            embedding_field: Optional[str] = None,
+                            num_dimensions: Optional[int] = None) -> None:
         """
         Create vector search index for semantic search.
         
-        Creates a vector index on product_title_embedding field configured for
-        cosine similarity with 1024 dimensions and scalar quantization.
+        Creates a vector index on the embedding field configured for cosine
+        similarity and scalar quantization, with department and region as
+        filter fields for pre-filtered searches. Defaults to the active index.
+        
+        Args:
+            index_name: Search index name
+            embedding_field: Field to index
+            num_dimensions: Vector dimensions of the field
         """
+        index_name = index_name or self.index_name
         collection = self.mongo_db.get_collection(self.collection_name)
+        definition = {
+            "fields": [
+                {
+                    "type": "vector",
+                    "path": embedding_field or self.embedding_field,
+                    "numDimensions": num_dimensions or self.num_dimensions,
+                    "similarity": "cosine",
+                    "quantization": "scalar"
+                },
+                *({"type": "filter", "path": field} for field in self.filter_fields),
+            ]
+        }
         
-        # Check if index already exists
-        existing_indexes = list(collection.list_search_indexes())
-        if any(idx.get("name") == self.index_name for idx in existing_indexes):
-            logger.info(f"Index '{self.index_name}' already exists. Skipping creation.")
+        # Check if index already exists, and bring its fields up to date
+        existing = next((idx for idx in collection.list_search_indexes() if idx.get("name") == index_name), None)
+        if existing is not None:
+            existing_fields = existing.get("latestDefinition", {}).get("fields", [])
+            if self._fields_match(existing_fields, definition["fields"]):
+                logger.info(f"Index '{index_name}' already exists. Skipping creation.")
+                return
+            logger.info(f"Updating fields of search index '{index_name}'...")
+            collection.update_search_index(index_name, definition)
+            self._wait_for_index(collection, index_name)
             return
         
         search_index_model = SearchIndexModel(
-            definition={
-                "fields": [
-                    {
-                        "type": "vector",
-                        "path": "product_title_embedding",
-                        "numDimensions": 1024,
-                        "similarity": "cosine",
-                        "quantization": "scalar"
-                    }
-                ]
-            },
-            name=self.index_name,
+            definition=definition,
+            name=index_name,
             type="vectorSearch",
         )
         
@@ -90,6 +242,27 @@ class VectorDBRepository:
         self._wait_for_index(collection, result)
         logger.info(f"Index '{result}' is ready for querying.")
     
+    @staticmethod
+    def _fields_match(existing: List[Dict], wanted: List[Dict]) -> bool:
+        """
+        Check whether an index declares exactly the wanted fields.
+        
+        Settings the server adds to a field, such as defaults, are ignored.
+        
+        Args:
+            existing: Fields of the existing index definition
+            wanted: Fields the index should declare
+            
+        Returns:
+            True if every wanted field is declared and no other
+        """
+        if len(existing) != len(wanted):
+            return False
+        return all(
+            any(field.items() <= current.items() for current in existing)
+            for field in wanted
+        )
+    
     def _wait_for_index(self, collection, index_name: str, timeout_seconds: int = 60) -> None:
         """
         Wait for index to become queryable.
@@ -108,6 +281,22 @@ class VectorDBRepository:
         
         logger.warning(f"Index '{index_name}' did not become queryable within {timeout_seconds} seconds")
     
+    def index_ready(self, index_name: str, timeout_seconds: int = 0) -> bool:
+        """
+        Check whether a search index is queryable.
+        
+        Args:
+            index_name: Name of the index
+            timeout_seconds: Time to wait for the index first
+            
+        Returns:
+            True if the index exists and is queryable
+        """
+        if timeout_seconds:
+            self._wait_for_index(self.get_collection(), index_name, timeout_seconds)
+        indices = list(self.get_collection().list_search_indexes(index_name))
+        return bool(indices and indices[0].get("queryable"))
+    
     def get_collection(self):
         """
         Get the vector database collection.
@@ -116,3 +305,14 @@ class VectorDBRepository:
             MongoDB collection instance
         """
         return self.mongo_db.get_collection(self.collection_name)
+
+    def get_async_collection(self) -> Optional[AsyncCollection]:
+        """
+        Get the vector database collection for asyncio queries.
+        
+        Returns:
+            AsyncCollection instance, or None if no async database is configured
+        """
+        if self.async_db is None:
+            return None
+        return self.async_db.get_collection(self.collection_name)
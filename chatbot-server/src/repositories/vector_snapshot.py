@@ -0,0 +1,214 @@
+"""
+Memory-mapped snapshots of the local vector index.
+
+Persists catalog embeddings and metadata to disk so workers can open
+the index read-only in milliseconds and share its pages through the
+OS page cache.
+"""
+import json
+import logging
+import os
+import shutil
+import time
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from src.repositories.local_vector_index import LocalVectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+class _DocumentFile(Sequence):
+    """
+    Read-only documents of a snapshot, decoded on access.
+
+    Documents are stored as consecutive JSON records in documents.jsonl,
+    with the byte offset of every record in offsets.npy. Both are memory
+    mapped, so a worker only decodes the documents its searches return.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Map the document file of a snapshot.
+
+        Args:
+            path: Snapshot directory
+        """
+        self._offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        size = int(self._offsets[-1])
+        self._data = np.memmap(os.path.join(path, "documents.jsonl"), dtype=np.uint8, mode="r") if size else b""
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        return json.loads(bytes(self._data[start:end]))
+
+
+class VectorSnapshotStore:
+    """
+    Directory of immutable vector index snapshots.
+
+    Each snapshot is a subdirectory holding vectors.npy (unit-normalized
+    float32 rows), ids.npy and one <field>.npy per filter field
+    (fixed-width strings, empty for missing values), the documents in
+    documents.jsonl indexed by offsets.npy, and metadata.json. All arrays
+    are memory-mapped on load, so workers share them through the page
+    cache instead of each holding the catalog in its heap. The CURRENT
+    file names the active snapshot and is swapped with os.replace, so
+    readers always see either the old or the new snapshot, never a
+    partial one.
+    """
+
+    CURRENT = "CURRENT"
+
+    def __init__(self, directory: str, keep: int = 2) -> None:
+        """
+        Initialize snapshot store.
+
+        Args:
+            directory: Directory holding the snapshots
+            keep: Number of snapshots kept after a rebuild
+        """
+        self.directory = directory
+        self.keep = keep
+
+    def current(self) -> Optional[str]:
+        """
+        Get the name of the active snapshot.
+
+        Returns:
+            Snapshot name, or None if no snapshot was published
+        """
+        try:
+            with open(os.path.join(self.directory, self.CURRENT), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def build(self,
+              documents: Iterable[Dict[str, Any]],
+              count: int,
+              dimensions: int = 1024,
+              embedding_field: str = "product_title_embedding") -> str:
+        """
+        Write a snapshot from documents and publish it.
+
+        Vectors are streamed into a memory-mapped .npy file, so building
+        does not hold the whole matrix in memory.
+
+        Args:
+            documents: Documents carrying their embeddings, e.g. a MongoDB cursor
+            count: Upper bound on the number of documents
+            dimensions: Vector dimensions
+            embedding_field: Field holding the embedding
+
+        Returns:
+            Name of the published snapshot
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"snapshot-{time.time_ns()}"
+        path = os.path.join(self.directory, name)
+        os.makedirs(path)
+
+        vectors = np.lib.format.open_memmap(
+            os.path.join(path, "vectors.npy"), mode="w+", dtype=np.float32, shape=(max(count, 1), dimensions)
+        )
+        ids, offsets = [], [0]
+        attributes = {field: [] for field in LocalVectorIndex.FILTER_FIELDS}
+        with open(os.path.join(path, "documents.jsonl"), "wb") as f:
+            for document in documents:
+                vector = document.get(embedding_field)
+                if vector is None or len(ids) >= count:
+                    continue
+                row = np.asarray(vector, dtype=np.float32)
+                norm = np.linalg.norm(row)
+                vectors[len(ids)] = row / norm if norm else row
+                doc = {key: value for key, value in document.items() if key != embedding_field}
+                doc["_id"] = str(doc.get("_id"))
+                ids.append(doc["_id"])
+                for field, values in attributes.items():
+                    value = doc.get(field)
+                    values.append("" if value is None else str(value))
+                offsets.append(offsets[-1] + f.write(json.dumps(doc, default=str).encode("utf-8") + b"\n"))
+        vectors.flush()
+        del vectors
+
+        np.save(os.path.join(path, "ids.npy"), np.asarray(ids, dtype=str))
+        np.save(os.path.join(path, "offsets.npy"), np.asarray(offsets, dtype=np.int64))
+        for field, values in attributes.items():
+            np.save(os.path.join(path, f"{field}.npy"), np.asarray(values, dtype=str))
+        metadata = {"count": len(ids), "dimensions": dimensions}
+        with open(os.path.join(path, "metadata.json"), "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+        self._publish(name)
+        logger.info(f"Published vector snapshot '{name}' with {len(ids)} documents")
+        return name
+
+    def build_from_index(self, index: LocalVectorIndex) -> str:
+        """
+        Write a snapshot of the live documents of an index and publish it.
+
+        Args:
+            index: Index to persist
+
+        Returns:
+            Name of the published snapshot
+        """
+        documents = ({**document, "_embedding": vector} for document, vector in index.items())
+        return self.build(documents, len(index), index.dimensions, embedding_field="_embedding")
+
+    def load(self, name: Optional[str] = None, **kwargs) -> Optional[LocalVectorIndex]:
+        """
+        Open a snapshot as a read-only memory-mapped index.
+
+        Args:
+            name: Snapshot to open, defaults to the active one
+            **kwargs: Index parameters
+
+        Returns:
+            Index backed by the snapshot, or None if there is no snapshot
+        """
+        name = name or self.current()
+        if name is None:
+            return None
+        path = os.path.join(self.directory, name)
+        with open(os.path.join(path, "metadata.json"), encoding="utf-8") as f:
+            metadata = json.load(f)
+        count = metadata["count"]
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")[:count]
+        ids = np.load(os.path.join(path, "ids.npy"), mmap_mode="r")
+        attributes = {
+            field: np.load(os.path.join(path, f"{field}.npy"), mmap_mode="r")
+            for field in LocalVectorIndex.FILTER_FIELDS
+        }
+        return LocalVectorIndex.from_arrays(ids, vectors, _DocumentFile(path), attributes=attributes, **kwargs)
+
+    def _publish(self, name: str) -> None:
+        """
+        Atomically make a snapshot active and prune old ones.
+
+        Args:
+            name: Snapshot to activate
+        """
+        pointer = os.path.join(self.directory, self.CURRENT)
+        temporary = f"{pointer}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(name)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, pointer)
+
+        snapshots = sorted(
+            entry for entry in os.listdir(self.directory)
+            if entry.startswith("snapshot-") and entry != name
+        )
+        # Readers that still map a pruned snapshot keep their pages until they reload
+        for stale in snapshots[:max(0, len(snapshots) - (self.keep - 1))]:
+            shutil.rmtree(os.path.join(self.directory, stale), ignore_errors=True)
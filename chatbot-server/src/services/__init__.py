@@ -8,6 +8,11 @@ from .search_agent import SearchAgent
 from .prompt_messages import PromptMessage
 from .embeddings import EmbeddingsService
 from .vector_store import VectorStoreService
+from .local_vector_store import LocalVectorStoreService
+from .relevance import RelevanceClassifier
+from .ingestion import CatalogIngestionService
+from .backfill import EmbeddingBackfillJob
+from .vector_tuning import NumCandidatesTuner
 
 __all__ = [
     "ChatService",
@@ -15,4 +20,9 @@ __all__ = [
     "PromptMessage",
     "EmbeddingsService",
     "VectorStoreService",
+    "LocalVectorStoreService",
+    "RelevanceClassifier",
+    "CatalogIngestionService",
+    "EmbeddingBackfillJob",
+    "NumCandidatesTuner",
 ]
@@ -0,0 +1,210 @@
+"""
+Embedding backfill job.
+
+Re-embeds the product collection into a shadow field for an embedding
+model or dimension change, then switches searches over to it.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from src.repositories.vector_db_repository import VectorDBRepository
+from src.services.embeddings import EmbeddingsService
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackfillJob:
+    """
+    Resumable re-embedding of the product collection.
+
+    Walks the collection in _id order, embedding batches on a bounded
+    thread pool and writing the vectors to a shadow field, so the active
+    index keeps serving searches meanwhile. Progress is checkpointed after
+    every window of batches; a restarted job resumes after the last
+    checkpointed _id. Products written behind the walk, e.g. by catalog
+    ingestion, are caught up before the shadow field is indexed and made
+    the active index, and once more after running servers had time to
+    switch their writes to it. A job stopped after the switch only repeats
+    that last catch-up.
+    """
+
+    CHECKPOINT_COLLECTION = "embedding_backfills"
+
+    def __init__(self,
+                 vector_db_repo: VectorDBRepository,
+                 embeddings_service: EmbeddingsService,
+                 target_field: str,
+                 num_dimensions: int,
+                 index_name: Optional[str] = None,
+                 batch_size: int = 256,
+                 concurrency: int = 4,
+                 title_field: str = "product_title"):
+        """
+        Initialize embedding backfill job.
+
+        Args:
+            vector_db_repo: Vector database repository
+            embeddings_service: Embeddings service for the new model
+            target_field: Shadow field receiving the new embeddings
+            num_dimensions: Vector dimensions of the new model
+            index_name: Search index on the shadow field, defaults to
+                "<target_field>_index"
+            batch_size: Products per embedding call
+            concurrency: Embedding batches in flight
+            title_field: Product field that is embedded
+        """
+        self.repo = vector_db_repo
+        self.embeddings = embeddings_service
+        self.target_field = target_field
+        self.num_dimensions = num_dimensions
+        self.index_name = index_name or f"{target_field}_index"
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.title_field = title_field
+        self.checkpoints = vector_db_repo.mongo_db.get_collection(self.CHECKPOINT_COLLECTION)
+
+    def run(self, restart: bool = False, index_timeout: int = 600) -> Dict[str, Any]:
+        """
+        Run or resume the backfill.
+
+        Args:
+            restart: Discard the checkpoint and walk the collection from the
+                start; a job that already activated its index only finishes
+                the switch, as a new walk would rewrite the active field
+            index_timeout: Seconds to wait for the new search index to
+                become queryable before switching to it
+
+        Returns:
+            Final job state with status "done", or "indexing" when the new
+            index was not queryable yet; run again to finish the switch
+
+        Raises:
+            ValueError: If the target field is active although this job did
+                not activate it, or the checkpoint was started with other
+                settings
+        """
+        state = self.checkpoints.find_one({"_id": self.target_field})
+        if state is None or (restart and state["status"] != "activated"):
+            state = {
+                "_id": self.target_field,
+                "index_name": self.index_name,
+                "num_dimensions": self.num_dimensions,
+                "last_id": None,
+                "processed": 0,
+                "status": "running",
+            }
+        elif (state["index_name"], state["num_dimensions"]) != (self.index_name, self.num_dimensions):
+            raise ValueError(f"Checkpoint for '{self.target_field}' was started with other settings; pass restart")
+        if state["status"] == "done":
+            return state
+        if state["status"] != "activated" and self.target_field == self.repo.embedding_field:
+            raise ValueError(f"'{self.target_field}' is the active embedding field; backfill into a new field")
+
+        collection = self.repo.get_collection()
+        projection = {self.title_field: 1}
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="backfill") as pool:
+            if state["status"] != "activated":
+                while True:
+                    query = {"_id": {"$gt": state["last_id"]}} if state["last_id"] is not None else {}
+                    documents = self._window(collection, query, projection)
+                    if not documents:
+                        break
+                    self._process(collection, pool, documents)
+                    state["last_id"] = documents[-1]["_id"]
+                    state["processed"] += len(documents)
+                    self._save(state)
+
+                # Catch up on products replaced or inserted behind the walk
+                self._catch_up(collection, pool, projection, state)
+
+                self.repo.create_vector_index(self.index_name, self.target_field, self.num_dimensions)
+                if not self.repo.index_ready(self.index_name, timeout_seconds=index_timeout):
+                    state["status"] = "indexing"
+                    self._save(state)
+                    logger.info(f"Backfill of '{self.target_field}' waiting for index '{self.index_name}'")
+                    return state
+
+                self.repo.activate_index(self.index_name, self.target_field, self.num_dimensions)
+                state["status"] = "activated"
+                state["activated_at"] = time.time()
+                self._save(state)
+
+            # Running servers keep writing the old field until they re-read the active index
+            time.sleep(max(0.0, state["activated_at"] + self.repo.refresh_interval - time.time()))
+            self._catch_up(collection, pool, projection, state)
+
+        state["status"] = "done"
+        self._save(state)
+        logger.info(f"Backfill of '{self.target_field}' finished after {state['processed']} products")
+        return state
+
+    def _catch_up(self, collection, pool: ThreadPoolExecutor, projection: Dict, state: Dict[str, Any]) -> None:
+        """
+        Embed products that still lack the shadow field.
+
+        Args:
+            collection: Product collection
+            pool: Embedding thread pool
+            projection: Fields to read
+            state: Job state, checkpointed after every window
+        """
+        missing = {self.target_field: {"$exists": False}, self.title_field: {"$type": "string"}}
+        while documents := self._window(collection, missing, projection):
+            self._process(collection, pool, documents)
+            state["processed"] += len(documents)
+            self._save(state)
+
+    def _window(self, collection, query: Dict, projection: Dict) -> List[Dict]:
+        """
+        Read the next documents to embed, one batch per pool worker.
+
+        Args:
+            collection: Product collection
+            query: Documents to select
+            projection: Fields to read
+
+        Returns:
+            Documents in _id order
+        """
+        cursor = collection.find(query, projection).sort("_id", 1).limit(self.batch_size * self.concurrency)
+        return list(cursor)
+
+    def _process(self, collection, pool: ThreadPoolExecutor, documents: List[Dict]) -> None:
+        """
+        Embed documents on the pool and write the shadow field.
+
+        Args:
+            collection: Product collection
+            pool: Embedding thread pool
+            documents: Documents to embed
+
+        Raises:
+            ValueError: If the embeddings have the wrong number of dimensions
+        """
+        documents = [doc for doc in documents if isinstance(doc.get(self.title_field), str)]
+        batches = [documents[i:i + self.batch_size] for i in range(0, len(documents), self.batch_size)]
+        texts = [[doc[self.title_field] for doc in batch] for batch in batches]
+        operations = []
+        for batch, vectors in zip(batches, pool.map(self.embeddings.embed_texts, texts)):
+            for document, vector in zip(batch, vectors):
+                if len(vector) != self.num_dimensions:
+                    raise ValueError(
+                        f"Embedding has {len(vector)} dimensions, expected {self.num_dimensions}"
+                    )
+                operations.append(UpdateOne({"_id": document["_id"]}, {"$set": {self.target_field: list(vector)}}))
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+
+    def _save(self, state: Dict[str, Any]) -> None:
+        """
+        Checkpoint the job state.
+
+        Args:
+            state: Job state
+        """
+        state["updated_at"] = time.time()
+        self.checkpoints.replace_one({"_id": state["_id"]}, state, upsert=True)
@@ -3,16 +3,24 @@ Chat service for handling conversation logic.
 
 Manages chat interactions, query relevance, and orchestrates the search pipeline.
 """
+import asyncio
+import contextlib
 import json
 import logging
 import uuid
-from typing import Optional
+from typing import Optional, Tuple
+
+import numpy as np
 
 from src.interfaces import LLMClientInterface, HybridSearchInterface, ProductSourceSearchInterface, IChatService
 from src.services.search_agent import SearchAgent
 from src.services.prompt_messages import PromptMessage
+from src.services.relevance import RelevanceClassifier
+from src.services.semantic_cache import SemanticCache
+from src.utils import AsyncSingleFlight, LRUCache, metrics, normalize_query
 from langchain_core.prompts import ChatPromptTemplate
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,6 +29,13 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+NODE_MESSAGES = {
+    "analyze_query": "Understanding your request...",
+    "search_online_shop": "Searching for products...",
+    "analyze_and_rank": "Ranking and analyzing results...",
+    "search_product_source": "Finding product sources...",
+}
+
 
 class ChatService(IChatService):
     """
@@ -37,7 +52,15 @@ class ChatService(IChatService):
                  llm_client: LLMClientInterface = None,
                  llm_model: str = "",
                  hybrid_search: HybridSearchInterface = None,
-                 source_search: ProductSourceSearchInterface = None):
+                 source_search: ProductSourceSearchInterface = None,
+                 checkpointer: Optional[BaseCheckpointSaver] = None,
+                 relevance_classifier: Optional[RelevanceClassifier] = None,
+                 relevance_cache_size: int = 4096,
+                 response_cache_size: int = 512,
+                 response_cache_ttl: float = 3600.0,
+                 semantic_cache: Optional[SemanticCache] = None,
+                 search_concurrency: int = 3,
+                 search_timeout: float = 20.0):
         """
         Initialize chat service.
 
@@ -47,13 +70,52 @@ class ChatService(IChatService):
             llm_model: Language model identifier
             hybrid_search: Hybrid search adapter
             source_search: Product source search adapter
+            checkpointer: Long-lived checkpoint saver shared by all requests
+            relevance_classifier: Local classifier answering obvious relevance cases
+            relevance_cache_size: Maximum number of cached relevance verdicts
+            response_cache_size: Maximum number of cached pipeline results
+            response_cache_ttl: Seconds a cached pipeline result stays valid
+            semantic_cache: Optional embedding-similarity cache for paraphrased queries
+            search_concurrency: Maximum number of revised queries searched at once
+            search_timeout: Seconds to wait for a single revised query search
         """
         self.template = template
         self.llm_client = llm_client
         self.llm_model = llm_model
         self.hybrid_search = hybrid_search
         self.source_search = source_search
-        self.thread_id = str(uuid.uuid4())
+        self.checkpointer = checkpointer or MemorySaver()
+        self.relevance_classifier = relevance_classifier or RelevanceClassifier()
+        self._relevance_cache = LRUCache(maxsize=relevance_cache_size)
+        self._response_cache = LRUCache(maxsize=response_cache_size, ttl=response_cache_ttl)
+        self.semantic_cache = semantic_cache
+        self.search_concurrency = search_concurrency
+        self.search_timeout = search_timeout
+        self._inflight = AsyncSingleFlight("chat.singleflight")
+        self._agent: Optional[SearchAgent] = None
+
+    @property
+    def agent(self) -> SearchAgent:
+        """
+        Get the search agent shared by all requests.
+
+        The LangGraph state graph is compiled once on first use and reused
+        afterwards; every request runs on its own checkpoint thread.
+
+        Returns:
+            Compiled SearchAgent instance
+        """
+        if self._agent is None:
+            self._agent = SearchAgent(
+                llm_model=self.llm_model,
+                llm_client=self.llm_client,
+                hybrid_search=self.hybrid_search,
+                source_search=self.source_search,
+                checkpointer=self.checkpointer,
+                search_concurrency=self.search_concurrency,
+                search_timeout=self.search_timeout,
+            )
+        return self._agent
 
     def query_llm(self, prompt: str, model: str) -> str:
         """
@@ -73,28 +135,93 @@ class ChatService(IChatService):
             raise ValueError(f"Prompt must be a string, but got {type(prompt)}")
         return self.llm_client.generate(prompt=prompt, model=model)
 
-    def is_query_relevant(self, query: str) -> bool:
+    async def aquery_llm(self, prompt: str, model: str) -> str:
+        """
+        Query the LLM with a prompt without blocking the event loop.
+
+        Args:
+            prompt: Prompt text to send
+            model: Model identifier
+
+        Returns:
+            LLM response text
+
+        Raises:
+            ValueError: If prompt is not a string
+        """
+        if not isinstance(prompt, str):
+            raise ValueError(f"Prompt must be a string, but got {type(prompt)}")
+        return await self.llm_client.agenerate(prompt=prompt, model=model)
+
+    async def is_query_relevant(self, query: str) -> bool:
         """
         Determine if query is relevant to product search.
 
+        Verdicts are served from an LRU cache first, then from the local
+        relevance classifier; only ambiguous queries reach the LLM.
+
         Args:
             query: User query to evaluate
 
         Returns:
             True if relevant, False otherwise
         """
-        relevance_prompt = (
-            f"This is prompt template: \"{self.template}\". Evaluate whether the following query is relevant to the prompt template: \"{query}\". Respond only one word 'relevant' or 'irrelevant'."
+        verdict = self._local_relevance(query)
+        if verdict is None:
+            verdict = await self._llm_relevance(query)
+            self._relevance_cache.set(normalize_query(query), verdict)
+        return verdict
+
+    def _local_relevance(self, query: str) -> Optional[bool]:
+        """
+        Decide relevance from the verdict cache or the local classifier.
+
+        Args:
+            query: User query to evaluate
+
+        Returns:
+            Cached or locally classified verdict, None if the LLM is needed
+        """
+        key = normalize_query(query)
+        verdict = self._relevance_cache.get(key)
+        if verdict is not None:
+            return verdict
+
+        verdict = self.relevance_classifier.classify(query)
+        if verdict is not None:
+            logger.info(f"Relevance decided locally: {verdict}")
+            self._relevance_cache.set(key, verdict)
+        return verdict
+
+    async def _llm_relevance(self, query: str) -> bool:
+        """
+        Ask the LLM whether a query is relevant to product search.
+
+        Args:
+            query: User query to evaluate
+
+        Returns:
+            True if the LLM answers 'relevant'
+        """
+        relevance_prompt = PromptMessage.RELEVANCE_PROMPT.format(
+            domain=" ".join(PromptMessage.System_Message.split()),
+            query=query,
         )
 
-        response = self.query_llm(prompt=relevance_prompt, model=self.llm_model)
+        response = await self.aquery_llm(prompt=relevance_prompt, model=self.llm_model)
         return response.lower().strip() == "relevant"
 
     async def stream_chat(self, query: str):
         """
         Stream chat response as Server-Sent Events.
 
-        Yields progress updates and final results as the pipeline executes.
+        Yields progress updates, ranked products as soon as they are generated,
+        and final results as the pipeline executes.
+
+        Results of previous identical queries are replayed from the
+        response cache, and results of paraphrased queries from the
+        semantic cache, without running the pipeline. Concurrent identical
+        queries are coalesced onto a single pipeline run.
 
         Args:
             query: User query to process
@@ -102,35 +229,88 @@ class ChatService(IChatService):
         Yields:
             JSON-encoded SSE events
         """
-        if not self.is_query_relevant(query):
+        cache_key = self._response_cache_key(query)
+        cached_result = self._response_cache.get(cache_key)
+        if cached_result is not None:
+            metrics.increment("response_cache.hits")
+        else:
+            metrics.increment("response_cache.misses")
+
+        query_vector = None
+        if cached_result is None and self.semantic_cache is not None:
+            query_vector = await self._embed_for_semantic_cache(query)
+            if query_vector is not None:
+                cached_result = self._semantic_lookup(query_vector, query)
+
+        if cached_result is not None:
+            for message in NODE_MESSAGES.values():
+                yield json.dumps({"type": "progress", "message": message})
+            yield json.dumps({"type": "result", "data": cached_result})
+            return
+
+        # Identical queries arriving while one is running share its events.
+        async for event in self._inflight.stream(
+            cache_key, lambda: self._run_pipeline(query, cache_key, query_vector)
+        ):
+            yield event
+
+    async def _run_pipeline(self,
+                            query: str,
+                            cache_key: Tuple[str, str],
+                            query_vector: Optional[np.ndarray] = None):
+        """
+        Run relevance check and search agent for a query.
+
+        Args:
+            query: User query to process
+            cache_key: Response cache key under which the final result is stored
+            query_vector: Query embedding under which the result is stored
+                in the semantic cache
+
+        Yields:
+            JSON-encoded SSE events
+        """
+        speculative = None
+        if self._local_relevance(query) is None:
+            # The LLM relevance check is needed, so decompose the query at the
+            # same time; the result is discarded if the query is irrelevant.
+            speculative = asyncio.create_task(self.agent.analyze_query_node({"user_query": query}))
+            metrics.increment("speculative.analyze_query.started")
+
+        try:
+            relevant = await self.is_query_relevant(query)
+        except BaseException:
+            await self._discard_speculation(speculative)
+            raise
+
+        if not relevant:
+            await self._discard_speculation(speculative)
             yield json.dumps({
                 "type": "result",
                 "data": {"default": PromptMessage.Default_Message}
             })
             return
 
-        NODE_MESSAGES = {
-            "analyze_query": "Understanding your request...",
-            "search_online_shop": "Searching for products...",
-            "analyze_and_rank": "Ranking and analyzing results...",
-            "search_product_source": "Finding product sources...",
-        }
-
-        async with AsyncSqliteSaver.from_conn_string(":memory:") as memory:
-            agent = SearchAgent(
-                llm_model=self.llm_model,
-                llm_client=self.llm_client,
-                hybrid_search=self.hybrid_search,
-                source_search=self.source_search,
-                checkpointer=memory
-            )
+        initial_state = {"user_query": query}
+        if speculative is not None:
+            try:
+                initial_state.update(await speculative)
+                metrics.increment("speculative.analyze_query.used")
+            except Exception as e:
+                logger.warning(f"Speculative query analysis failed, rerunning in graph: {e}")
 
-            logger.info(f"Thread ID: {self.thread_id}")
-            thread = {"configurable": {"thread_id": self.thread_id}}
+        thread_id = str(uuid.uuid4())
+        logger.info(f"Thread ID: {thread_id}")
+        thread = {"configurable": {"thread_id": thread_id}}
 
-            async for chunk in agent.graph.astream(
-                {"user_query": query}, thread, stream_mode="updates"
+        try:
+            async for mode, chunk in self.agent.graph.astream(
+                initial_state, thread, stream_mode=["updates", "custom"]
             ):
+                if mode == "custom":
+                    yield json.dumps(chunk)
+                    continue
+
                 node_name = next(iter(chunk))
                 state_update = chunk[node_name]
 
@@ -141,7 +321,74 @@ class ChatService(IChatService):
                     })
 
                 if "result" in state_update:
+                    self._response_cache.set(cache_key, state_update["result"])
+                    if query_vector is not None:
+                        self.semantic_cache.store(
+                            query_vector, (self.llm_model, state_update["result"]), normalize_query(query)
+                        )
                     yield json.dumps({
                         "type": "result",
                         "data": state_update["result"]
                     })
+        finally:
+            await self.checkpointer.adelete_thread(thread_id)
+
+    def _response_cache_key(self, query: str) -> Tuple[str, str]:
+        """
+        Build the response cache key for a query.
+
+        Args:
+            query: User query
+
+        Returns:
+            Tuple of normalized query and model name
+        """
+        return normalize_query(query), self.llm_model
+
+    async def _embed_for_semantic_cache(self, query: str) -> Optional[np.ndarray]:
+        """
+        Embed a query for the semantic cache without blocking the event loop.
+
+        Args:
+            query: User query
+
+        Returns:
+            Normalized embedding, or None if embedding failed
+        """
+        try:
+            return await asyncio.to_thread(self.semantic_cache.embed, normalize_query(query))
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {e}")
+            return None
+
+    def _semantic_lookup(self, query_vector: np.ndarray, query: str) -> Optional[dict]:
+        """
+        Look up a cached result for a similar query answered by the same model.
+
+        Args:
+            query_vector: Normalized query embedding
+            query: User query
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        entry = self.semantic_cache.lookup(query_vector, normalize_query(query))
+        if entry is None:
+            return None
+        model, result = entry
+        return result if model == self.llm_model else None
+
+    @staticmethod
+    async def _discard_speculation(task: Optional["asyncio.Task"]) -> None:
+        """
+        Cancel speculative work and wait until it has stopped.
+
+        Args:
+            task: Speculative task, or None if nothing was started
+        """
+        if task is None:
+            return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await task
+        metrics.increment("speculative.analyze_query.wasted")
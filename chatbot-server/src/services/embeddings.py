@@ -3,13 +3,45 @@ Embeddings service for generating vector representations.
 
 Provides functionality to generate embeddings from text using various providers.
 """
+import hashlib
 import logging
-from typing import List
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Tuple, Union
 
 import cohere
+import numpy as np
+
+from src.utils import MicroBatcher
 
 logger = logging.getLogger(__name__)
 
+_WORD = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=65536)
+def _word_features(word: str, dimensions: int) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+    """
+    Hash a word and its character trigrams to signed vector positions.
+    
+    Args:
+        word: Lowercase word
+        dimensions: Vector dimensions
+        
+    Returns:
+        Tuple of column indices and matching +1.0 or -1.0 signs
+    """
+    padded = f"<{word}>"
+    features = [f"w:{word}"] + [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    columns, signs = [], []
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        columns.append(value % dimensions)
+        signs.append(1.0 if value >> 63 else -1.0)
+    return tuple(columns), tuple(signs)
+
 
 class EmbeddingsService:
     """
@@ -18,6 +50,9 @@ class EmbeddingsService:
     Wraps embedding providers to generate vector representations
     of text for semantic search and similarity operations.
     """
+
+    # Maximum number of texts a provider accepts in one request
+    MAX_BATCH_SIZE = {"cohere": 96}
     
     def __init__(self, provider_type: str = "mock", **kwargs):
         """
@@ -25,22 +60,34 @@ class EmbeddingsService:
         
         Args:
             provider_type: Type of provider (mock, cohere, openai, etc.)
-            **kwargs: Provider-specific configuration
+            **kwargs: Provider-specific configuration, plus dimensions of
+                mock embeddings and max_concurrency, max_retries and
+                retry_backoff for batch embedding
         """
         self.provider_type = provider_type
         self.kwargs = kwargs
+        self.dimensions = kwargs.get("dimensions", 1024)
+        self.max_concurrency = kwargs.get("max_concurrency", 4)
+        self.max_retries = kwargs.get("max_retries", 3)
+        self.retry_backoff = kwargs.get("retry_backoff", 0.5)
         
         if provider_type == "cohere":
             self.client = cohere.Client(api_key=kwargs.get("api_key"))
+            self._batcher = MicroBatcher(
+                self._embed_cohere_batch,
+                max_wait_ms=kwargs.get("batch_wait_ms", 5.0),
+                name="embeddings_service.batcher",
+            )
         elif provider_type == "mock":
             self.client = None
     
-    def embed_text(self, text: str) -> List[float]:
+    def embed_text(self, text: str, input_type: str = "search_document") -> List[float]:
         """
         Generate embedding for a single text.
         
         Args:
             text: Text to embed
+            input_type: Provider input type of the text
             
         Returns:
             List of float values representing the embedding
@@ -48,24 +95,71 @@ class EmbeddingsService:
         if self.provider_type == "mock":
             return self._mock_embed(text)
         elif self.provider_type == "cohere":
-            return self._embed_cohere(text)
+            return self._embed_cohere(text, input_type)
         else:
             raise ValueError(f"Unknown provider: {self.provider_type}")
     
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_texts(self,
+                    texts: List[str],
+                    as_array: bool = False,
+                    input_type: str = "search_document") -> Union[List[List[float]], np.ndarray]:
         """
         Generate embeddings for multiple texts.
         
+        Texts are split into chunks of the provider's maximum batch size,
+        which are embedded concurrently by at most max_concurrency requests.
+        A failed chunk is retried with exponential backoff.
+        
         Args:
             texts: List of texts to embed
+            as_array: Return one contiguous float32 matrix instead of lists
+            input_type: Provider input type of the texts
             
         Returns:
-            List of embedding vectors
+            Embedding vectors in the order of texts
+            
+        Raises:
+            ValueError: If the provider is unknown
+            Exception: Whatever the provider raised once retries are exhausted
         """
-        embeddings = []
-        for text in texts:
-            embeddings.append(self.embed_text(text))
+        if self.provider_type == "mock":
+            matrix = self._mock_embed_batch(texts)
+            return matrix if as_array else matrix.tolist()
+        elif self.provider_type == "cohere":
+            size = self.MAX_BATCH_SIZE["cohere"]
+            chunks = [texts[start:start + size] for start in range(0, len(texts), size)]
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                results = executor.map(lambda chunk: self._with_retry(chunk, input_type), chunks)
+                embeddings = [vector for chunk in results for vector in chunk]
+        else:
+            raise ValueError(f"Unknown provider: {self.provider_type}")
+
+        if as_array:
+            if not embeddings:
+                return np.empty((0, self.dimensions), dtype=np.float32)
+            return np.ascontiguousarray(embeddings, dtype=np.float32)
         return embeddings
+
+    def _with_retry(self, texts: List[str], input_type: str) -> List[List[float]]:
+        """
+        Embed one chunk, retrying failed requests.
+        
+        Args:
+            texts: Chunk of texts within the provider's batch limit
+            input_type: Provider input type
+            
+        Returns:
+            Embedding vectors of the chunk
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._embed_cohere_batch(texts, input_type)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * 2 ** attempt
+                logger.warning(f"Embedding chunk of {len(texts)} texts failed, retrying in {delay}s: {e}")
+                time.sleep(delay)
     
     def _mock_embed(self, text: str) -> List[float]:
         """
@@ -77,25 +171,66 @@ class EmbeddingsService:
         Returns:
             List of mock embedding values
         """
-        # Generate deterministic mock embedding based on text hash
-        hash_val = hash(text) % (2 ** 32)
-        import random
-        random.seed(hash_val)
-        return [random.random() for _ in range(1536)]
+        return self._mock_embed_batch([text])[0].tolist()
+
+    def _mock_embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate mock embeddings for a batch with feature hashing.
+        
+        Words and their character trigrams are hashed with BLAKE2b to a
+        signed position in the vector, so results are stable across
+        processes and texts sharing words get similar vectors.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Unit-length float32 matrix of shape (len(texts), dimensions)
+        """
+        rows, columns, signs = [], [], []
+        for row, text in enumerate(texts):
+            for word in _WORD.findall(text.lower()):
+                word_columns, word_signs = _word_features(word, self.dimensions)
+                rows.extend([row] * len(word_columns))
+                columns.extend(word_columns)
+                signs.extend(word_signs)
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)),
+                  np.asarray(signs, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
     
-    def _embed_cohere(self, text: str) -> List[float]:
+    def _embed_cohere(self, text: str, input_type: str = "search_document") -> List[float]:
         """
         Generate embedding using Cohere API.
         
+        Concurrent calls are micro-batched into one Cohere request.
+        
         Args:
             text: Text to embed
+            input_type: Cohere input type
             
         Returns:
             Embedding vector from Cohere
         """
+        return self._batcher.embed([text], input_type)[0]
+
+    def _embed_cohere_batch(self, texts: List[str], input_type: str) -> List[List[float]]:
+        """
+        Embed a batch of texts with one Cohere request.
+        
+        Args:
+            texts: Texts to embed
+            input_type: Cohere input type
+            
+        Returns:
+            Embedding vectors from Cohere
+        """
         response = self.client.embed(
             model="embed-english-v3.0",
-            texts=[text],
-            input_type="search_document",
+            texts=texts,
+            input_type=input_type,
         )
-        return response.embeddings[0]
+        return response.embeddings
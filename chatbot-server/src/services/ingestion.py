@@ -0,0 +1,317 @@
+"""
+Catalog ingestion service.
+
+Loads product catalogs into the vector collection with batched
+embedding and unordered bulk upserts, re-embedding only products whose
+content changed since the last load.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import AsyncIterable, Dict, List, Optional, Tuple
+
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from src.repositories.vector_db_repository import VectorDBRepository
+from src.services.embeddings import EmbeddingsService
+from src.utils.text import normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogIngestionService:
+    """
+    Service for bulk loading product catalogs.
+
+    Products flow through three stages connected by bounded queues:
+    batching, embedding and writing. When embedding or writing falls
+    behind, the full queues block the stage before it, so a slow database
+    slows down reading the upload instead of buffering it in memory.
+    A batch that fails to embed or write is counted as failed and the
+    remaining batches continue.
+
+    Each stored product carries a content hash. On re-ingest, products
+    whose hash matches the stored one are neither embedded nor written,
+    so a refresh costs in proportion to the catalog churn.
+    """
+
+    DELETE_BATCH_SIZE = 10000
+
+    def __init__(self,
+                 vector_db_repo: VectorDBRepository,
+                 embeddings_service: EmbeddingsService,
+                 batch_size: int = 512,
+                 queue_size: int = 4,
+                 embed_workers: int = 2,
+                 write_workers: int = 4,
+                 title_field: str = "product_title",
+                 embedding_field: Optional[str] = None,
+                 hash_field: str = "content_hash",
+                 prune_min_ratio: float = 0.9):
+        """
+        Initialize catalog ingestion service.
+
+        Args:
+            vector_db_repo: Vector database repository
+            embeddings_service: Embeddings generation service
+            batch_size: Products per embedding call and write
+            queue_size: Batches buffered between stages
+            embed_workers: Embedding batches in flight
+            write_workers: Write batches in flight
+            title_field: Product field that is embedded
+            embedding_field: Document field receiving the embedding,
+                defaults to the repository's active embedding field
+            hash_field: Document field holding the content hash
+            prune_min_ratio: Fraction of the stored products a stream must
+                contain before products missing from it are deleted
+        """
+        self.repo = vector_db_repo
+        self.embeddings = embeddings_service
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.embed_workers = embed_workers
+        self.write_workers = write_workers
+        self.title_field = title_field
+        self._embedding_field = embedding_field
+        self.hash_field = hash_field
+        self.id_field = vector_db_repo.product_id_field
+        self.prune_min_ratio = prune_min_ratio
+
+    @property
+    def embedding_field(self) -> str:
+        """Document field receiving the embedding."""
+        return self._embedding_field or self.repo.embedding_field
+
+    async def ingest(self, products: AsyncIterable[Dict], prune: bool = False) -> Dict[str, int]:
+        """
+        Embed and upsert the new and changed products of a stream.
+
+        Args:
+            products: Product dictionaries, e.g. from iter_ndjson or iter_csv
+            prune: Delete stored products missing from the stream, for
+                streams that carry the full catalog. Refused for empty
+                streams, streams with failed batches and streams holding
+                fewer than prune_min_ratio of the stored products
+
+        Returns:
+            Counts of received, inserted, updated, unchanged, deleted,
+            skipped (no title) and failed products
+        """
+        stats = {
+            "received": 0, "inserted": 0, "updated": 0, "unchanged": 0,
+            "deleted": 0, "skipped": 0, "failed": 0,
+        }
+        await self.repo.arefresh_active_index()
+        await asyncio.to_thread(self.repo.create_product_index)
+        stored = await self._load_hashes()
+        seen = set()
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async def batch_products() -> None:
+            batch: List[Dict] = []
+            async for product in products:
+                stats["received"] += 1
+                title = product.get(self.title_field)
+                if not isinstance(title, str) or not title.strip():
+                    stats["skipped"] += 1
+                    continue
+                product = {**product, self.id_field: self.product_id(product)}
+                product.pop("_id", None)
+                product.pop(self.embedding_field, None)
+                seen.add(product[self.id_field])
+                digest = self.content_hash(product)
+                if stored.get(product[self.id_field]) == digest:
+                    stats["unchanged"] += 1
+                    continue
+                product[self.hash_field] = digest
+                batch.append(product)
+                if len(batch) >= self.batch_size:
+                    await embed_queue.put(batch)
+                    batch = []
+            if batch:
+                await embed_queue.put(batch)
+            for _ in range(self.embed_workers):
+                await embed_queue.put(None)
+
+        async def embed_batches() -> None:
+            while (batch := await embed_queue.get()) is not None:
+                documents = await self._embed(batch)
+                if documents is None:
+                    stats["failed"] += len(batch)
+                else:
+                    await write_queue.put(documents)
+
+        async def run_embedders() -> None:
+            await asyncio.gather(*(embed_batches() for _ in range(self.embed_workers)))
+            for _ in range(self.write_workers):
+                await write_queue.put(None)
+
+        async def write_batches() -> None:
+            while (documents := await write_queue.get()) is not None:
+                inserted, updated = await self._write(documents)
+                stats["inserted"] += inserted
+                stats["updated"] += updated
+                stats["failed"] += len(documents) - inserted - updated
+
+        async with asyncio.TaskGroup() as group:
+            group.create_task(batch_products())
+            group.create_task(run_embedders())
+            for _ in range(self.write_workers):
+                group.create_task(write_batches())
+
+        if prune:
+            reason = self._prune_refusal(stats, len(seen), len(stored))
+            if reason:
+                logger.warning(f"Not deleting missing products: {reason}")
+            else:
+                vanished = [product_id for product_id in stored if product_id not in seen]
+                stats["deleted"] = await self._delete(vanished)
+
+        logger.info(f"Catalog ingestion finished: {stats}")
+        return stats
+
+    def _prune_refusal(self, stats: Dict[str, int], seen: int, stored: int) -> Optional[str]:
+        """
+        Check that a stream looks like a full catalog before pruning.
+
+        Args:
+            stats: Ingestion counts of the stream
+            seen: Distinct products in the stream
+            stored: Products stored before the stream
+
+        Returns:
+            Why pruning is refused, or None if it may proceed
+        """
+        if stats["received"] == 0:
+            return "the catalog was empty"
+        if stats["failed"]:
+            return f"{stats['failed']} products failed to load"
+        if seen < self.prune_min_ratio * stored:
+            return f"the catalog holds {seen} of {stored} stored products, below the {self.prune_min_ratio:.0%} minimum"
+        return None
+
+    def product_id(self, product: Dict) -> str:
+        """
+        Get the key that identifies a product across catalog loads.
+
+        Args:
+            product: Product dictionary
+
+        Returns:
+            The product's ID, or its normalized title if it has none
+        """
+        product_id = product.get(self.id_field)
+        if product_id is None or product_id == "":
+            return normalize_query(product[self.title_field])
+        return str(product_id)
+
+    def content_hash(self, product: Dict) -> str:
+        """
+        Hash the catalog content of a product.
+
+        Args:
+            product: Product dictionary without embedding
+
+        Returns:
+            SHA-256 hex digest of the product's fields in canonical order
+        """
+        content = {key: value for key, value in product.items() if key != self.hash_field}
+        payload = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _load_hashes(self) -> Dict[str, str]:
+        """
+        Load the content hash of every stored product.
+
+        Returns:
+            Mapping of product ID to content hash
+        """
+        query = {self.id_field: {"$exists": True}}
+        projection = {self.id_field: 1, self.hash_field: 1, "_id": 0}
+        collection = self.repo.get_async_collection()
+        if collection is not None:
+            return {
+                doc[self.id_field]: doc.get(self.hash_field)
+                async for doc in collection.find(query, projection)
+            }
+
+        def load() -> Dict[str, str]:
+            cursor = self.repo.get_collection().find(query, projection)
+            return {doc[self.id_field]: doc.get(self.hash_field) for doc in cursor}
+
+        return await asyncio.to_thread(load)
+
+    async def _embed(self, batch: List[Dict]) -> Optional[List[Dict]]:
+        """
+        Attach title embeddings to a batch of products.
+
+        Args:
+            batch: Products with titles
+
+        Returns:
+            Documents ready to write, or None if embedding failed
+        """
+        titles = [product[self.title_field] for product in batch]
+        try:
+            vectors = await asyncio.to_thread(self.embeddings.embed_texts, titles)
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(batch)} products failed: {e}")
+            return None
+        return [
+            {**product, self.embedding_field: list(vector)}
+            for product, vector in zip(batch, vectors)
+        ]
+
+    async def _write(self, documents: List[Dict]) -> Tuple[int, int]:
+        """
+        Upsert documents by product ID with one unordered bulk write.
+
+        Args:
+            documents: Documents to write
+
+        Returns:
+            Numbers of inserted and updated documents
+        """
+        operations = [
+            ReplaceOne({self.id_field: document[self.id_field]}, document, upsert=True)
+            for document in documents
+        ]
+        try:
+            collection = self.repo.get_async_collection()
+            if collection is not None:
+                result = await collection.bulk_write(operations, ordered=False)
+            else:
+                result = await asyncio.to_thread(
+                    self.repo.get_collection().bulk_write, operations, ordered=False
+                )
+            return result.upserted_count, result.matched_count
+        except BulkWriteError as e:
+            logger.warning(f"Write batch had {len(e.details.get('writeErrors', []))} write errors")
+            return e.details.get("nUpserted", 0), e.details.get("nMatched", 0)
+        except Exception as e:
+            logger.error(f"Write batch of {len(documents)} documents failed: {e}")
+            return 0, 0
+
+    async def _delete(self, product_ids: List[str]) -> int:
+        """
+        Delete products by ID in bulk.
+
+        Args:
+            product_ids: IDs of the products to delete
+
+        Returns:
+            Number of deleted documents
+        """
+        deleted = 0
+        collection = self.repo.get_async_collection()
+        for start in range(0, len(product_ids), self.DELETE_BATCH_SIZE):
+            query = {self.id_field: {"$in": product_ids[start:start + self.DELETE_BATCH_SIZE]}}
+            if collection is not None:
+                result = await collection.delete_many(query)
+            else:
+                result = await asyncio.to_thread(self.repo.get_collection().delete_many, query)
+            deleted += result.deleted_count
+        return deleted
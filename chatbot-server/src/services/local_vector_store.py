@@ -0,0 +1,197 @@
+"""
+Local vector store service.
+
+Serves semantic search from an in-process vector index instead of
+MongoDB Atlas, for development, CI, benchmarks and hot read replicas.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+
+from src.interfaces import IVectorStoreService
+from src.repositories.local_vector_index import LocalVectorIndex
+from src.repositories.vector_snapshot import VectorSnapshotStore
+from src.services.embeddings import EmbeddingsService
+
+logger = logging.getLogger(__name__)
+
+
+class LocalVectorStoreService(IVectorStoreService):
+    """
+    Service for vector search and storage on a LocalVectorIndex.
+
+    Mirrors VectorStoreService, returning results in the same
+    {"similarityScore", "document"} shape. When backed by a snapshot
+    store, searches pick up a newly published snapshot within
+    refresh_interval seconds.
+
+    Implements IVectorStoreService contract for dependency injection.
+    """
+
+    def __init__(self,
+                 index: LocalVectorIndex,
+                 embeddings_service: EmbeddingsService,
+                 embedding_field: str = "product_title_embedding",
+                 content_field: str = "product_title",
+                 snapshots: Optional[VectorSnapshotStore] = None,
+                 refresh_interval: float = 30.0):
+        """
+        Initialize local vector store service.
+
+        Args:
+            index: In-process vector index
+            embeddings_service: Embeddings generation service
+            embedding_field: Document field holding the embedding
+            content_field: Document field embedded when no embedding is given
+            snapshots: Snapshot store the index was loaded from, if any
+            refresh_interval: Seconds between checks for a newer snapshot
+        """
+        self.index = index
+        self.embeddings = embeddings_service
+        self.embedding_field = embedding_field
+        self.content_field = content_field
+        self.snapshots = snapshots
+        self.refresh_interval = refresh_interval
+        self._snapshot = snapshots.current() if snapshots is not None else None
+        self._checked_at = time.monotonic()
+        self._refresh_lock = threading.Lock()
+
+    def search_similar(self,
+                       query: str,
+                       top_k: int = 5,
+                       department: Optional[str] = None,
+                       region: Optional[str] = None) -> List[Dict]:
+        """
+        Search for semantically similar products.
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            department: Filter by department
+            region: Filter by region
+
+        Returns:
+            List of similar documents with scores
+        """
+        self._maybe_refresh()
+        query_embedding = self.embeddings.embed_text(query)
+        matches = self.index.search(
+            query_embedding,
+            top_k=top_k,
+            filters={"department": department, "region": region},
+        )
+        logger.info(f"Found {len(matches)} similar items for query: {query}")
+        return [{"similarityScore": score, "document": document} for score, document in matches]
+
+    async def asearch_similar(self,
+                              query: str,
+                              top_k: int = 5,
+                              department: Optional[str] = None,
+                              region: Optional[str] = None) -> List[Dict]:
+        """
+        Search for semantically similar products in a worker thread.
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            department: Filter by department
+            region: Filter by region
+
+        Returns:
+            List of similar documents with scores
+        """
+        return await asyncio.to_thread(self.search_similar, query, top_k, department, region)
+
+    async def asearch_batch(self, searches: List[Dict]) -> List[List[Dict]]:
+        """
+        Run many semantic searches with one batched embedding call.
+
+        Args:
+            searches: Searches with query and optional top_k, department and region
+
+        Returns:
+            Results of each search, in the order of searches
+        """
+        return await asyncio.to_thread(self._search_batch, searches)
+
+    def _search_batch(self, searches: List[Dict]) -> List[List[Dict]]:
+        """
+        Embed distinct queries together and search the index for each.
+
+        Args:
+            searches: Searches with query and optional top_k, department and region
+
+        Returns:
+            Results of each search, in the order of searches
+        """
+        self._maybe_refresh()
+        queries = list(dict.fromkeys(search["query"] for search in searches))
+        vectors = dict(zip(queries, self.embeddings.embed_texts(queries)))
+        index = self.index
+        return [
+            [
+                {"similarityScore": score, "document": document}
+                for score, document in index.search(
+                    vectors[search["query"]],
+                    top_k=search.get("top_k", 5),
+                    filters={"department": search.get("department"), "region": search.get("region")},
+                )
+            ]
+            for search in searches
+        ]
+
+    def insert_vector(self, vector_data: Dict) -> str:
+        """
+        Insert a vector document into the index.
+
+        Args:
+            vector_data: Document with vector embedding, or with the content
+                field to embed
+
+        Returns:
+            Document ID
+        """
+        document = {key: value for key, value in vector_data.items() if key != self.embedding_field}
+        doc_id = str(document.get("_id") or ObjectId())
+        document["_id"] = doc_id
+        vector = vector_data.get(self.embedding_field)
+        if vector is None:
+            vector = self.embeddings.embed_text(vector_data[self.content_field])
+        self.index.add(doc_id, vector, document)
+        logger.info(f"Inserted vector document: {doc_id}")
+        return doc_id
+
+    def delete_document(self, doc_id: str) -> bool:
+        """
+        Delete document from the index.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            True if deleted, False if not found
+        """
+        return self.index.remove(doc_id)
+
+    def _maybe_refresh(self) -> None:
+        """Swap in the active snapshot if it changed since the last check."""
+        if self.snapshots is None or time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            current = self.snapshots.current()
+            if current is None or current == self._snapshot:
+                return
+            self.index = self.snapshots.load(current, hnsw_threshold=self.index.hnsw_threshold)
+            self._snapshot = current
+            logger.info(f"Switched local vector index to snapshot '{current}'")
+        except Exception as e:
+            logger.warning(f"Could not load vector snapshot: {e}")
+        finally:
+            self._refresh_lock.release()
@@ -47,6 +47,9 @@ class PromptMessage:
     and I'll do my best to provide you with accurate and up-to-date recommendations.
     """
     
+    RELEVANCE_PROMPT = """This is the assistant's role: "{domain}". Evaluate whether the following query \
+    is relevant to this role: "{query}". Respond only one word 'relevant' or 'irrelevant'."""
+    
     ANALYZE_QUERY_PROMPT = """You are an AI assistant charged with revising user query that can \
     be used when searching online products. Generate a list of effective search queries for llm models \
     that will help to gather any relevant product information. \
@@ -0,0 +1,149 @@
+"""
+Local relevance classifier for incoming chat queries.
+
+Decides obvious relevant and irrelevant queries from keywords without
+an LLM round-trip, leaving only ambiguous queries to the model.
+"""
+import re
+from typing import FrozenSet, Optional
+
+from src.services.prompt_messages import PromptMessage
+from src.utils import normalize_query
+
+_TOKEN = re.compile(r"[a-z0-9$]+")
+_PRICE = re.compile(r"(\$\s*\d+|\d+\s*(usd|dollars?|bucks|baht|thb|eur|euros?|gbp|pounds?|k)\b)")
+
+# Words that name what is being bought. A query needs a price, or one of
+# these together with intent words or a second product, before it is
+# accepted without the LLM.
+PRODUCT_TERMS: FrozenSet[str] = frozenset({
+    "product", "products",
+    "laptop", "laptops", "phone", "phones", "smartphone", "tablet", "headphones", "earbuds",
+    "headset", "speaker", "speakers", "camera", "tv", "monitor", "keyboard", "mouse",
+    "watch", "smartwatch", "charger", "console", "shoes", "sneakers", "shirt", "jacket",
+    "dress", "bag", "backpack", "chair", "desk", "mattress", "sofa", "vacuum", "blender",
+    "fridge", "microwave", "kettle", "bike", "stroller", "toy", "toys", "skincare",
+    "perfume",
+})
+
+# Product words with common non-product meanings ("what's on tv tonight",
+# "get rid of a mouse"). They only count as products next to a purchase word.
+AMBIGUOUS_PRODUCT_TERMS: FrozenSet[str] = frozenset({
+    "product", "products", "tv", "mouse", "watch", "monitor", "console", "speaker",
+    "speakers", "bag", "dress",
+})
+
+# Words that show the user is buying something.
+PURCHASE_TERMS: FrozenSet[str] = frozenset({
+    "buy", "buying", "purchase", "shop", "shopping", "price", "prices", "priced",
+    "cheap", "cheapest", "affordable", "budget", "deal", "deals", "discount", "sale",
+    "recommend", "recommendation", "recommendations", "compare", "comparison", "vs",
+    "versus", "review", "reviews", "rated", "brand", "brands", "gift", "alternative",
+    "wireless", "bluetooth", "waterproof", "portable", "gaming", "ergonomic",
+})
+
+# Shopping intent and attribute words. Common outside shopping too ("best
+# football player", "I want to ..."), so on their own they are ambiguous.
+INTENT_TERMS: FrozenSet[str] = PURCHASE_TERMS | frozenset({
+    "order", "best", "top", "suggest", "model", "find", "looking", "need", "want",
+})
+
+SHOPPING_TERMS: FrozenSet[str] = PRODUCT_TERMS | INTENT_TERMS
+
+OFF_DOMAIN_TERMS: FrozenSet[str] = frozenset({
+    "weather", "forecast", "joke", "jokes", "poem", "story", "lyrics", "translate",
+    "translation", "capital", "president", "history", "politics", "election", "news",
+    "recipe", "homework", "equation", "solve", "calculate", "integral", "derivative",
+    "code", "python", "javascript", "debug", "meaning", "philosophy", "horoscope",
+    "diagnose", "symptoms", "lawyer", "sports", "score", "movie", "song",
+})
+
+SMALL_TALK_TERMS: FrozenSet[str] = frozenset({
+    "hi", "hello", "hey", "yo", "thanks", "thank", "you", "bye", "goodbye", "ok", "okay",
+    "good", "morning", "afternoon", "evening", "night", "how", "are", "who", "what",
+    "is", "your", "name", "there",
+})
+
+# Words of the system prompt that describe the assistant rather than shopping.
+_GENERIC_PROMPT_TERMS: FrozenSet[str] = frozenset({
+    "assistant", "specialized", "helping", "users", "user", "online", "retrieval",
+    "augmented", "generation", "provide", "accurate", "date", "based", "responsibilities",
+    "clarify", "case", "retrieve", "relevant", "concise", "fact", "clear", "reasoning",
+    "links", "available", "follow", "helpful", "questions", "input", "unclear", "always",
+    "responses", "polite", "tailored", "with", "that", "your", "their",
+})
+
+
+def _domain_terms(domain_text: str) -> FrozenSet[str]:
+    """
+    Extract content words describing the assistant's domain.
+
+    Args:
+        domain_text: System prompt describing the assistant
+
+    Returns:
+        Set of lowercase domain keywords
+    """
+    return frozenset(
+        token for token in _TOKEN.findall(domain_text.lower())
+        if len(token) > 3 and token not in _GENERIC_PROMPT_TERMS
+    )
+
+
+class RelevanceClassifier:
+    """
+    Keyword-based relevance classifier for product search queries.
+
+    Scores a query against shopping vocabulary and the domain described by
+    the system prompt, and against clearly off-domain vocabulary. Returns a
+    verdict only when the evidence is one-sided; mixed or missing evidence is
+    reported as ambiguous so the caller can fall back to the LLM. A query
+    is only accepted if it names a price, or a product together with intent
+    words or a second product. Words like "tv" or "mouse" only count as
+    products next to a purchase word.
+    """
+
+    def __init__(self, domain_text: str = PromptMessage.System_Message) -> None:
+        """
+        Initialize relevance classifier.
+
+        Args:
+            domain_text: Text describing the assistant's domain
+        """
+        self.product_terms = PRODUCT_TERMS
+        self.relevant_terms = SHOPPING_TERMS | (_domain_terms(domain_text) - SMALL_TALK_TERMS)
+        self.irrelevant_terms = OFF_DOMAIN_TERMS - SHOPPING_TERMS
+
+    def classify(self, query: str) -> Optional[bool]:
+        """
+        Classify a query locally.
+
+        Args:
+            query: User query to evaluate
+
+        Returns:
+            True if clearly relevant, False if clearly irrelevant,
+            None if the query is ambiguous
+        """
+        normalized = normalize_query(query)
+        tokens = _TOKEN.findall(normalized)
+        if not tokens:
+            return False
+
+        relevant_hits = sum(1 for token in tokens if token in self.relevant_terms)
+        products = {token for token in tokens if token in self.product_terms}
+        if not any(token in PURCHASE_TERMS for token in tokens):
+            products -= AMBIGUOUS_PRODUCT_TERMS
+        has_intent = any(token in INTENT_TERMS for token in tokens)
+        has_product = _PRICE.search(normalized) is not None or bool(products and (has_intent or len(products) > 1))
+        if has_product:
+            relevant_hits += 1
+        irrelevant_hits = sum(1 for token in tokens if token in self.irrelevant_terms)
+
+        if has_product and not irrelevant_hits:
+            return True
+        if irrelevant_hits and not relevant_hits:
+            return False
+        if not relevant_hits and all(token in SMALL_TALK_TERMS for token in tokens):
+            return False
+        return None
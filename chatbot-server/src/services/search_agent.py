@@ -5,14 +5,16 @@ Implements the multi-step product search and analysis pipeline.
 """
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 
 from src.interfaces import LLMClientInterface, HybridSearchInterface, ProductSourceSearchInterface
 from src.models import SearchAgentState
 from src.services.prompt_messages import PromptMessage
+from src.utils import IncrementalProductParser
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langgraph.graph import StateGraph
+from langgraph.types import StreamWriter
 import asyncio
 
 logging.basicConfig(
@@ -46,7 +48,9 @@ class SearchAgent:
                  llm_client: LLMClientInterface,
                  hybrid_search: HybridSearchInterface,
                  source_search: ProductSourceSearchInterface,
-                 checkpointer: Optional[Any] = None) -> None:
+                 checkpointer: Optional[Any] = None,
+                 search_concurrency: int = 3,
+                 search_timeout: float = 20.0) -> None:
         """
         Initialize the search agent.
 
@@ -56,11 +60,15 @@ class SearchAgent:
             hybrid_search: Hybrid search adapter for products
             source_search: Search adapter for product sources
             checkpointer: Optional checkpoint saver for state persistence
+            search_concurrency: Maximum number of revised queries searched at once
+            search_timeout: Seconds to wait for a single revised query search
         """
         self.model = llm_model
         self.llm_client = llm_client
         self.hybrid_search = hybrid_search
         self.source_search = source_search
+        self.search_concurrency = search_concurrency
+        self.search_timeout = search_timeout
         
         graph = StateGraph(SearchAgentState)
         graph.add_node("analyze_query", self.analyze_query_node)
@@ -74,9 +82,9 @@ class SearchAgent:
         graph.set_finish_point("analyze_and_rank")
         self.graph = graph.compile(checkpointer=checkpointer)
 
-    def call_client(self, prompt: str) -> str:
+    async def call_client(self, prompt: str) -> str:
         """
-        Call the LLM client with a prompt.
+        Call the LLM client with a prompt without blocking the event loop.
 
         Args:
             prompt: The prompt text to send to the LLM
@@ -90,17 +98,40 @@ class SearchAgent:
         try:
             if not isinstance(prompt, str):
                 raise ValueError(f"Prompt must be a string, but got {type(prompt)}")
-            return self.llm_client.generate(prompt=prompt, model=self.model)
+            return await self.llm_client.agenerate(prompt=prompt, model=self.model)
         except Exception as e:
             logger.error(f"An error occurred: {str(e)}")
             raise
 
-    def analyze_query_node(self, state: SearchAgentState) -> Dict[str, List[str]]:
+    async def stream_client(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream the LLM response for a prompt.
+
+        Args:
+            prompt: The prompt text to send to the LLM
+
+        Yields:
+            Text fragments of the LLM response
+
+        Raises:
+            ValueError: If prompt is not a string
+        """
+        try:
+            if not isinstance(prompt, str):
+                raise ValueError(f"Prompt must be a string, but got {type(prompt)}")
+            async for token in self.llm_client.astream(prompt=prompt, model=self.model):
+                yield token
+        except Exception as e:
+            logger.error(f"An error occurred: {str(e)}")
+            raise
+
+    async def analyze_query_node(self, state: SearchAgentState) -> Dict[str, List[str]]:
         """
         Analyze user query and generate multiple search queries.
 
         Takes the user's input query and uses the LLM to break it down
         into multiple effective search queries for product discovery.
+        Queries already decomposed speculatively by the caller are kept.
 
         Args:
             state: Current agent state containing user query
@@ -108,6 +139,9 @@ class SearchAgent:
         Returns:
             Dictionary with revised_query field containing list of search queries
         """
+        if state.get("revised_query"):
+            return {"revised_query": state["revised_query"]}
+
         prompt = ChatPromptTemplate.from_messages(
             [
                 SystemMessage(content=PromptMessage.ANALYZE_QUERY_PROMPT),
@@ -115,7 +149,7 @@ class SearchAgent:
             ]
         )
 
-        response = self.call_client(prompt.invoke({}).to_string())
+        response = await self.call_client(prompt.invoke({}).to_string())
 
         queries = []
         for query in response.split("|"):
@@ -127,8 +161,10 @@ class SearchAgent:
         """
         Search for products using revised queries.
 
-        Executes hybrid search across local database and web for each
-        revised query, aggregating relevant product information.
+        Executes hybrid search across local database and web for all
+        revised queries concurrently, bounded by search_concurrency.
+        Results are merged in query order; a query that fails or exceeds
+        search_timeout contributes no products instead of failing the node.
 
         Args:
             state: Current agent state containing revised queries
@@ -136,32 +172,44 @@ class SearchAgent:
         Returns:
             Dictionary with relevant_products field containing concatenated products
         """
-        products = []
-
-        for query in state['revised_query']:
-
-            query = f"find the specific product title from this product requirement: {query}"
-            response = await asyncio.to_thread(
-                self.hybrid_search.search_products,
-                query,
-                3,
-                2,
-            )
-            products.extend(response)
-
-        products = " ".join([product for product in products])
+        semaphore = asyncio.Semaphore(self.search_concurrency)
+
+        async def search(query: str) -> List[str]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        asyncio.to_thread(
+                            self.hybrid_search.search_products,
+                            f"find the specific product title from this product requirement: {query}",
+                            3,
+                            2,
+                        ),
+                        timeout=self.search_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Search timed out after {self.search_timeout}s for query: {query}")
+                except Exception as e:
+                    logger.warning(f"Search failed for query '{query}': {e}")
+                return []
+
+        responses = await asyncio.gather(*(search(query) for query in state['revised_query']))
+
+        products = " ".join([product for response in responses for product in response])
 
         return {"relevant_products": products}
 
-    def analyze_rank_node(self, state: SearchAgentState) -> Dict[str, str]:
+    async def analyze_rank_node(self,
+                                state: SearchAgentState,
+                                writer: StreamWriter = None) -> Dict[str, str]:
         """
         Analyze and rank products based on user requirements.
 
-        Uses the LLM to evaluate and rank found products according
-        to the original user requirements.
+        Streams the LLM ranking and emits every product as a custom stream
+        event as soon as it is fully generated, before the ranking finishes.
 
         Args:
             state: Current agent state with products and user query
+            writer: Stream writer injected by LangGraph for custom events
 
         Returns:
             Dictionary with analyze_result field containing ranked products
@@ -171,9 +219,19 @@ class SearchAgent:
             PromptMessage.ANALYZE_RANK_HUMAN_PROMPT
         ]).invoke({"products": state["relevant_products"], "requirements": state["user_query"]}).to_string()
 
-        return {"analyze_result": self.call_client(prompt)}
+        parser = IncrementalProductParser()
+        tokens = []
+        index = 0
+        async for token in self.stream_client(prompt):
+            tokens.append(token)
+            for product in parser.feed(token):
+                if writer is not None:
+                    writer({"type": "product", "index": index, "data": product})
+                index += 1
+
+        return {"analyze_result": "".join(tokens)}
 
-    def search_source_node(self, state: SearchAgentState) -> Dict[str, Any]:
+    async def search_source_node(self, state: SearchAgentState) -> Dict[str, Any]:
         """
         Find product sources, URLs, and images.
 
@@ -191,9 +249,9 @@ class SearchAgent:
         analyze_result = json.loads(analyze_result)
 
         product_titles = [product["title"] for product in analyze_result["products"]]
-        product_sources = self.source_search.find_sources(product_titles)
+        product_sources = await self.source_search.afind_sources(product_titles)
 
-        for idx, product in enumerate(analyze_result["products"]):
-            product["image"] = product_sources[idx].get("image", "")
-            product["url"] = product_sources[idx].get("url", "")
+        for product, source in zip(analyze_result["products"], product_sources):
+            product["image"] = (source or {}).get("image", "")
+            product["url"] = (source or {}).get("url", "")
         return {"result": analyze_result}
@@ -0,0 +1,228 @@
+"""
+Semantic cache for near-duplicate chat queries.
+
+Serves answers of previously seen queries whose embeddings are close
+enough to an incoming query, catching paraphrases that miss exact caches.
+"""
+import logging
+import re
+import threading
+import time
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from src.services.embeddings import EmbeddingsService
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*k?")
+_COMPARATORS = frozenset({
+    "under", "below", "less", "over", "above", "more", "max", "maximum", "min", "minimum",
+    "least", "most", "between", "within", "cheaper", "upto",
+})
+
+
+def query_constraints(query: str) -> frozenset:
+    """
+    Extract the numbers and price comparators of a query.
+
+    Queries that differ only in these, such as budgets, embed almost
+    identically but need different answers.
+
+    Args:
+        query: Query text
+
+    Returns:
+        Set of number tokens and comparator words
+    """
+    text = query.lower()
+    words = set(re.findall(r"[a-z]+", text))
+    return frozenset(_NUMBER.findall(text)) | frozenset(words & _COMPARATORS)
+
+
+class SemanticCache:
+    """
+    In-process embedding-similarity cache.
+
+    Keeps the unit-normalized embeddings of recently answered queries in a
+    fixed-size matrix. A lookup is one matrix-vector product; the best entry
+    is a hit when its cosine similarity reaches the threshold. Entries expire
+    after a TTL and the least recently used entry is evicted when full.
+
+    An entry only matches queries with the same numbers and price
+    comparators, so "laptop under 500" never serves "laptop under 1500".
+
+    Besides the configured threshold, every lookup also records whether it
+    would have hit at each of the report thresholds, so the hit rate can be
+    compared across thresholds before tuning.
+    """
+
+    def __init__(self,
+                 embeddings_service: EmbeddingsService,
+                 threshold: float = 0.92,
+                 maxsize: int = 512,
+                 ttl: Optional[float] = 3600.0,
+                 report_thresholds: Iterable[float] = (0.8, 0.85, 0.9, 0.95)) -> None:
+        """
+        Initialize semantic cache.
+
+        Args:
+            embeddings_service: Service used to embed queries; needs a
+                semantic model such as Cohere, lexical mock embeddings
+                score different budgets as near-duplicates
+            threshold: Minimum cosine similarity for a hit
+            maxsize: Maximum number of cached queries
+            ttl: Seconds before an entry expires, None to never expire
+            report_thresholds: Thresholds for which hit rates are reported
+        """
+        if maxsize <= 0:
+            raise ValueError(f"maxsize must be positive, but got {maxsize}")
+        self.embeddings = embeddings_service
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.report_thresholds = tuple(sorted(set(report_thresholds) | {threshold}))
+        self._matrix: Optional[np.ndarray] = None
+        self._values: list = [None] * maxsize
+        self._constraints: list = [frozenset()] * maxsize
+        self._expires = np.full(maxsize, np.inf)
+        self._last_used = np.zeros(maxsize)
+        self._occupied = np.zeros(maxsize, dtype=bool)
+        self._lookups = 0
+        self._would_hit = {t: 0 for t in self.report_thresholds}
+        self._lock = threading.Lock()
+
+    def embed(self, query: str) -> np.ndarray:
+        """
+        Embed and normalize a query.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Unit-length float32 embedding
+        """
+        vector = np.asarray(self.embeddings.embed_text(query, input_type="search_query"), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, vector: np.ndarray, query: str = "") -> Optional[Any]:
+        """
+        Find the cached value of the most similar query.
+
+        Args:
+            vector: Normalized query embedding
+            query: Query text, whose numeric constraints must match the entry's
+
+        Returns:
+            Cached value if the best similarity reaches the threshold, else None
+        """
+        with self._lock:
+            best_index, best_score = self._best_match(vector, query_constraints(query))
+            self._record_lookup(best_score)
+            if best_index is None or best_score < self.threshold:
+                metrics.increment("semantic_cache.misses")
+                return None
+            self._last_used[best_index] = time.monotonic()
+            metrics.increment("semantic_cache.hits")
+            return self._values[best_index]
+
+    def store(self, vector: np.ndarray, value: Any, query: str = "") -> None:
+        """
+        Cache a value under a query embedding.
+
+        Args:
+            vector: Normalized query embedding
+            value: Value to cache
+            query: Query text the value answers
+        """
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+            elif vector.shape[0] != self._matrix.shape[1]:
+                logger.warning("Embedding dimension changed, clearing semantic cache")
+                self._matrix = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+                self._occupied[:] = False
+
+            now = time.monotonic()
+            slot = self._free_slot(now)
+            self._matrix[slot] = vector
+            self._values[slot] = value
+            self._constraints[slot] = query_constraints(query)
+            self._expires[slot] = now + self.ttl if self.ttl is not None else np.inf
+            self._last_used[slot] = now
+            self._occupied[slot] = True
+
+    def hit_rates(self) -> dict:
+        """
+        Get the observed hit rate for every report threshold.
+
+        Returns:
+            Mapping of threshold to fraction of lookups that would have hit
+        """
+        with self._lock:
+            if not self._lookups:
+                return {t: 0.0 for t in self.report_thresholds}
+            return {t: count / self._lookups for t, count in self._would_hit.items()}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(np.count_nonzero(self._live_mask(time.monotonic())))
+
+    def _live_mask(self, now: float) -> np.ndarray:
+        """Mask of slots holding entries that have not expired."""
+        return self._occupied & (self._expires > now)
+
+    def _best_match(self, vector: np.ndarray, constraints: frozenset) -> Tuple[Optional[int], float]:
+        """
+        Find the live entry most similar to a vector among entries with the same constraints.
+
+        Args:
+            vector: Normalized query embedding
+            constraints: Numeric constraints of the query
+
+        Returns:
+            Tuple of slot index and similarity, (None, -1.0) if nothing matches
+        """
+        if self._matrix is None or vector.shape[0] != self._matrix.shape[1]:
+            return None, -1.0
+        live = self._live_mask(time.monotonic())
+        live &= np.fromiter((c == constraints for c in self._constraints), dtype=bool, count=self.maxsize)
+        if not live.any():
+            return None, -1.0
+        scores = np.where(live, self._matrix @ vector, -np.inf)
+        best_index = int(np.argmax(scores))
+        return best_index, float(scores[best_index])
+
+    def _free_slot(self, now: float) -> int:
+        """
+        Choose the slot for a new entry.
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            Index of an empty or expired slot, else of the least recently used one
+        """
+        live = self._live_mask(now)
+        if not live.all():
+            return int(np.argmin(live))
+        return int(np.argmin(self._last_used))
+
+    def _record_lookup(self, best_score: float) -> None:
+        """
+        Update per-threshold hit rate statistics.
+
+        Args:
+            best_score: Similarity of the best match of the lookup
+        """
+        self._lookups += 1
+        for threshold in self.report_thresholds:
+            if best_score >= threshold:
+                self._would_hit[threshold] += 1
+            metrics.set_gauge(
+                f"semantic_cache.hit_rate@{threshold:.2f}",
+                self._would_hit[threshold] / self._lookups,
+            )
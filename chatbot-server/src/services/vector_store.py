@@ -3,12 +3,15 @@ Vector store service for semantic search operations.
 
 Provides high-level interface for searching and storing vectors.
 """
+import asyncio
 import logging
+import math
 from typing import List, Dict, Optional
 
 from src.interfaces import IVectorStoreService
 from src.repositories.vector_db_repository import VectorDBRepository
 from src.services.embeddings import EmbeddingsService
+from src.utils import AsyncSingleFlight, LRUCache, SingleFlight
 from bson import ObjectId
 
 logger = logging.getLogger(__name__)
@@ -21,21 +24,46 @@ class VectorStoreService(IVectorStoreService):
     Combines embeddings generation with vector search to enable
     semantic similarity search on product data.
     
+    Searches run Atlas $vectorSearch on the active index. Department and
+    region filters are applied inside the vector stage, so filtered
+    searches still return top_k matches. The candidate list grows as
+    filters get more selective; the fraction of documents each filter
+    matches is counted once and cached. In exact mode every matching
+    document is scored instead, trading latency for full recall.
+    
     Implements IVectorStoreService contract for dependency injection.
     """
     
+    MAX_CANDIDATES = 10000
+    MIN_SELECTIVITY = 0.001
+    
     def __init__(self, 
                  vector_db_repo: VectorDBRepository,
-                 embeddings_service: EmbeddingsService):
+                 embeddings_service: EmbeddingsService,
+                 batch_concurrency: int = 16,
+                 selectivity_ttl: float = 600.0,
+                 num_candidates_multiplier: int = 10,
+                 exact: bool = False):
         """
         Initialize vector store service.
         
         Args:
             vector_db_repo: Vector database repository
             embeddings_service: Embeddings generation service
+            batch_concurrency: Maximum aggregations in flight for one batch search
+            selectivity_ttl: Seconds a filter's cached selectivity stays valid
+            num_candidates_multiplier: Candidates considered per requested
+                result for unfiltered searches
+            exact: Run exact nearest-neighbour searches
         """
         self.repo = vector_db_repo
         self.embeddings = embeddings_service
+        self.batch_concurrency = batch_concurrency
+        self.num_candidates_multiplier = num_candidates_multiplier
+        self.exact = exact
+        self._selectivity = LRUCache(maxsize=1024, ttl=selectivity_ttl)
+        self._inflight = SingleFlight("vector_search.singleflight")
+        self._ainflight = AsyncSingleFlight("vector_search.async_singleflight")
     
     def search_similar(self, 
                       query: str, 
@@ -45,6 +73,8 @@ class VectorStoreService(IVectorStoreService):
         """
         Search for semantically similar products.
         
+        Concurrent identical searches share one embedding and aggregation.
+        
         Args:
             query: Search query
             top_k: Number of results to return
@@ -54,46 +84,346 @@ class VectorStoreService(IVectorStoreService):
         Returns:
             List of similar documents with scores
         """
+        return self._inflight.do(
+            (query, top_k, department, region),
+            self._search_similar,
+            query,
+            top_k,
+            department,
+            region,
+        )
+
+    def _search_similar(self,
+                        query: str,
+                        top_k: int,
+                        department: Optional[str],
+                        region: Optional[str]) -> List[Dict]:
+        """
+        Embed the query and run the vector search aggregation.
+        
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            department: Filter by department
+            region: Filter by region
+            
+        Returns:
+            List of similar documents with scores
+        """
+        self.repo.refresh_active_index()
+        collection = self.repo.get_collection()
+        selectivity = self._filter_selectivity(collection, department, region)
+        if selectivity == 0:
+            return []
+        
         # Generate embedding for query
         query_embedding = self.embeddings.embed_text(query)
+        pipeline = self._build_search_pipeline(query_embedding, top_k, department, region, selectivity)
         
-        # Build search query pipeline
-        collection = self.repo.get_collection()
+        try:
+            results = list(collection.aggregate(pipeline))
+            logger.info(f"Found {len(results)} similar items for query: {query}")
+            return results
+        except Exception as e:
+            logger.error(f"Error searching vectors: {e}")
+            return []
+
+    async def asearch_similar(self,
+                              query: str,
+                              top_k: int = 5,
+                              department: Optional[str] = None,
+                              region: Optional[str] = None) -> List[Dict]:
+        """
+        Search for semantically similar products without blocking the event loop.
         
-        pipeline = [
-            {
-                "$search": {
-                    "cosmosSearch": {
-                        "vector": query_embedding,
-                        "k": top_k,
-                    },
-                    "returnBase64EncodedVectors": False,
-                }
-            },
-            {
-                "$project": {
-                    "similarityScore": {"$meta": "searchScore"},
-                    "document": "$$ROOT",
-                }
-            },
-        ]
+        Uses the repository's async collection so concurrent searches
+        overlap their database I/O, falling back to the blocking search in
+        a worker thread when no async database is configured. Concurrent
+        identical searches share one embedding and aggregation.
         
-        # Add filters if provided
-        if department or region:
-            match_stage = {}
-            if department:
-                match_stage["department"] = department
-            if region:
-                match_stage["region"] = region
-            pipeline.append({"$match": match_stage})
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            department: Filter by department
+            region: Filter by region
+            
+        Returns:
+            List of similar documents with scores
+        """
+        collection = self.repo.get_async_collection()
+        if collection is None:
+            return await asyncio.to_thread(self.search_similar, query, top_k, department, region)
+        return await self._ainflight.do(
+            (query, top_k, department, region),
+            self._asearch_similar,
+            collection,
+            query,
+            top_k,
+            department,
+            region,
+        )
+
+    async def _asearch_similar(self,
+                               collection,
+                               query: str,
+                               top_k: int,
+                               department: Optional[str],
+                               region: Optional[str]) -> List[Dict]:
+        """
+        Embed the query and run the vector search aggregation asynchronously.
+        
+        Args:
+            collection: Async collection to search
+            query: Search query
+            top_k: Number of results to return
+            department: Filter by department
+            region: Filter by region
+            
+        Returns:
+            List of similar documents with scores
+        """
+        await self.repo.arefresh_active_index()
+        selectivity = await self._afilter_selectivity(collection, department, region)
+        if selectivity == 0:
+            return []
+        query_embedding = await asyncio.to_thread(self.embeddings.embed_text, query)
+        pipeline = self._build_search_pipeline(query_embedding, top_k, department, region, selectivity)
         
         try:
-            results = list(collection.aggregate(pipeline))
+            cursor = await collection.aggregate(pipeline)
+            results = await cursor.to_list()
             logger.info(f"Found {len(results)} similar items for query: {query}")
             return results
         except Exception as e:
             logger.error(f"Error searching vectors: {e}")
             return []
+
+    async def asearch_batch(self, searches: List[Dict]) -> List[List[Dict]]:
+        """
+        Run many semantic searches with one batched embedding call.
+        
+        Distinct queries are embedded together, then the aggregations run
+        concurrently, at most batch_concurrency at a time. A failed search
+        yields an empty result without failing the batch.
+        
+        Args:
+            searches: Searches with query and optional top_k, department and region
+            
+        Returns:
+            Results of each search, in the order of searches
+        """
+        queries = list(dict.fromkeys(search["query"] for search in searches))
+        embeddings = await asyncio.to_thread(self.embeddings.embed_texts, queries)
+        vectors = dict(zip(queries, embeddings))
+        collection = self.repo.get_async_collection()
+        await self.repo.arefresh_active_index()
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run(search: Dict) -> List[Dict]:
+            async with semaphore:
+                try:
+                    if collection is None:
+                        selectivity = await asyncio.to_thread(
+                            self._filter_selectivity,
+                            self.repo.get_collection(),
+                            search.get("department"),
+                            search.get("region"),
+                        )
+                    else:
+                        selectivity = await self._afilter_selectivity(
+                            collection, search.get("department"), search.get("region")
+                        )
+                    if selectivity == 0:
+                        return []
+                    pipeline = self._build_search_pipeline(
+                        vectors[search["query"]],
+                        search.get("top_k", 5),
+                        search.get("department"),
+                        search.get("region"),
+                        selectivity,
+                    )
+                    if collection is None:
+                        return await asyncio.to_thread(
+                            lambda: list(self.repo.get_collection().aggregate(pipeline))
+                        )
+                    cursor = await collection.aggregate(pipeline)
+                    return await cursor.to_list()
+                except Exception as e:
+                    logger.error(f"Error searching vectors for query '{search['query']}': {e}")
+                    return []
+
+        results = await asyncio.gather(*(run(search) for search in searches))
+        logger.info(f"Ran batch of {len(searches)} searches with {len(queries)} distinct queries")
+        return list(results)
+
+    @staticmethod
+    def _search_filter(department: Optional[str], region: Optional[str]) -> Dict:
+        """
+        Build the pre-filter for the vector stage.
+        
+        Args:
+            department: Filter by department
+            region: Filter by region
+            
+        Returns:
+            Filter on the index's filter fields, empty when unfiltered
+        """
+        search_filter = {}
+        if department:
+            search_filter["department"] = {"$eq": department}
+        if region:
+            search_filter["region"] = {"$eq": region}
+        return search_filter
+
+    def _filter_selectivity(self, collection, department: Optional[str], region: Optional[str]) -> float:
+        """
+        Get the fraction of documents a filter matches.
+        
+        Args:
+            collection: Collection to count
+            department: Filter by department
+            region: Filter by region
+            
+        Returns:
+            Matching fraction, 1.0 when unfiltered or when counting fails
+        """
+        search_filter = self._search_filter(department, region)
+        if not search_filter:
+            return 1.0
+        key = (department, region)
+        selectivity = self._selectivity.get(key)
+        if selectivity is None:
+            try:
+                total = collection.estimated_document_count()
+                matched = collection.count_documents(search_filter)
+            except Exception as e:
+                logger.warning(f"Could not estimate filter selectivity: {e}")
+                return 1.0
+            selectivity = min(1.0, matched / total) if total else 0.0
+            self._selectivity.set(key, selectivity)
+        return selectivity
+
+    async def _afilter_selectivity(self, collection, department: Optional[str], region: Optional[str]) -> float:
+        """
+        Get the fraction of documents a filter matches, counting asynchronously.
+        
+        Args:
+            collection: Async collection to count
+            department: Filter by department
+            region: Filter by region
+            
+        Returns:
+            Matching fraction, 1.0 when unfiltered or when counting fails
+        """
+        search_filter = self._search_filter(department, region)
+        if not search_filter:
+            return 1.0
+        key = (department, region)
+        selectivity = self._selectivity.get(key)
+        if selectivity is None:
+            try:
+                total = await collection.estimated_document_count()
+                matched = await collection.count_documents(search_filter)
+            except Exception as e:
+                logger.warning(f"Could not estimate filter selectivity: {e}")
+                return 1.0
+            selectivity = min(1.0, matched / total) if total else 0.0
+            self._selectivity.set(key, selectivity)
+        return selectivity
+
+    def _num_candidates(self, top_k: int, selectivity: float) -> int:
+        """
+        Size the nearest-neighbour candidate list for a filtered search.
+        
+        A filter matching a fraction s of the documents leaves about s of
+        the candidates, so the list grows by 1/s, up to MAX_CANDIDATES.
+        
+        Args:
+            top_k: Number of results to return
+            selectivity: Fraction of documents the filter matches
+            
+        Returns:
+            Number of candidates to consider
+        """
+        candidates = top_k * self.num_candidates_multiplier / max(selectivity, self.MIN_SELECTIVITY)
+        return max(top_k, min(self.MAX_CANDIDATES, math.ceil(candidates)))
+
+    def _build_search_pipeline(self,
+                               query_embedding: List[float],
+                               top_k: int,
+                               department: Optional[str],
+                               region: Optional[str],
+                               selectivity: float = 1.0,
+                               num_candidates: Optional[int] = None,
+                               exact: Optional[bool] = None) -> List[Dict]:
+        """
+        Build the $vectorSearch aggregation pipeline on the active index.
+        
+        Reads the active index as last loaded; callers refresh it first.
+        
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results to return
+            department: Filter by department
+            region: Filter by region
+            selectivity: Fraction of documents the filters match
+            num_candidates: Candidate list size, overriding the one derived
+                from selectivity
+            exact: Run an exact search, defaults to the service mode
+            
+        Returns:
+            Aggregation pipeline stages
+        """
+        index_name, embedding_field = self.repo.active_index()
+        search = {
+            "index": index_name,
+            "path": embedding_field,
+            "queryVector": query_embedding,
+            "limit": top_k,
+        }
+        if self.exact if exact is None else exact:
+            search["exact"] = True
+        else:
+            search["numCandidates"] = num_candidates or self._num_candidates(top_k, selectivity)
+        search_filter = self._search_filter(department, region)
+        if search_filter:
+            search["filter"] = search_filter
+        
+        return [
+            {"$vectorSearch": search},
+            {
+                "$project": {
+                    "similarityScore": {"$meta": "vectorSearchScore"},
+                    "document": "$$ROOT",
+                }
+            },
+        ]
+
+    def search_vector(self,
+                      query_embedding: List[float],
+                      top_k: int = 5,
+                      num_candidates: Optional[int] = None,
+                      exact: Optional[bool] = None) -> List[Dict]:
+        """
+        Run an unfiltered vector search for an embedded query.
+        
+        Errors are raised rather than logged, for tooling that measures
+        searches such as NumCandidatesTuner.
+        
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results to return
+            num_candidates: Candidate list size, defaults to the service setting
+            exact: Run an exact search, defaults to the service mode
+            
+        Returns:
+            List of similar documents with scores
+        """
+        self.repo.refresh_active_index()
+        pipeline = self._build_search_pipeline(
+            query_embedding, top_k, None, None, num_candidates=num_candidates, exact=exact
+        )
+        return list(self.repo.get_collection().aggregate(pipeline))
     
     def insert_vector(self, vector_data: Dict) -> str:
         """
@@ -0,0 +1,130 @@
+"""
+Recall tuning for approximate vector search.
+
+Measures recall against exact search and latency for a range of
+numCandidates settings on the live index.
+"""
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Sequence
+
+from src.services.vector_store import VectorStoreService
+
+logger = logging.getLogger(__name__)
+
+
+class NumCandidatesTuner:
+    """
+    Picks the smallest numCandidates meeting a recall target.
+
+    Each sample query is searched once exactly for ground truth, then
+    with every candidate setting in ascending order. A setting qualifies
+    when its mean recall@top_k reaches target_recall and its p95 latency
+    stays within the budget. Larger settings only add latency, so the
+    search stops at the first qualifying setting, or as soon as the
+    latency budget is exceeded.
+    """
+
+    DEFAULT_MULTIPLIERS = (1, 2, 4, 8, 10, 15, 20, 30, 50, 100)
+
+    def __init__(self,
+                 vector_store: VectorStoreService,
+                 top_k: int = 10,
+                 target_recall: float = 0.95,
+                 p95_budget_ms: float = 100.0,
+                 candidates: Optional[Sequence[int]] = None):
+        """
+        Initialize numCandidates tuner.
+
+        Args:
+            vector_store: Vector store service searching the index to tune
+            top_k: Results per search
+            target_recall: Minimum mean recall@top_k against exact search
+            p95_budget_ms: Maximum p95 search latency in milliseconds
+            candidates: numCandidates settings to try, defaults to
+                multiples of top_k up to the Atlas limit
+        """
+        self.vector_store = vector_store
+        self.top_k = top_k
+        self.target_recall = target_recall
+        self.p95_budget_ms = p95_budget_ms
+        if candidates is None:
+            candidates = [top_k * multiplier for multiplier in self.DEFAULT_MULTIPLIERS]
+        self.candidates = sorted({
+            min(VectorStoreService.MAX_CANDIDATES, max(top_k, count)) for count in candidates
+        })
+
+    def tune(self, queries: List[str]) -> Dict:
+        """
+        Measure every candidate setting until one qualifies.
+
+        Args:
+            queries: Sample search queries
+
+        Returns:
+            Chosen num_candidates and the matching num_candidates_multiplier
+            (None if no setting qualified), whether the targets were met,
+            and recall and p95_ms per tried setting
+        """
+        vectors = self.vector_store.embeddings.embed_texts(queries)
+        truth = [self._ids(self.vector_store.search_vector(vector, self.top_k, exact=True)) for vector in vectors]
+
+        trials = []
+        chosen = None
+        for num_candidates in self.candidates:
+            recalls, latencies = [], []
+            for vector, expected in zip(vectors, truth):
+                started = time.perf_counter()
+                results = self.vector_store.search_vector(vector, self.top_k, num_candidates=num_candidates, exact=False)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if expected:
+                    recalls.append(len(self._ids(results) & expected) / len(expected))
+            trial = {
+                "num_candidates": num_candidates,
+                "recall": sum(recalls) / len(recalls) if recalls else 1.0,
+                "p95_ms": self._p95(latencies),
+            }
+            trials.append(trial)
+            logger.info(f"numCandidates={num_candidates}: recall {trial['recall']:.3f}, p95 {trial['p95_ms']:.1f} ms")
+            if trial["p95_ms"] > self.p95_budget_ms:
+                break
+            if trial["recall"] >= self.target_recall:
+                chosen = num_candidates
+                break
+
+        return {
+            "num_candidates": chosen,
+            "num_candidates_multiplier": math.ceil(chosen / self.top_k) if chosen else None,
+            "met": chosen is not None,
+            "trials": trials,
+        }
+
+    @staticmethod
+    def _ids(results: List[Dict]) -> set:
+        """
+        Get the document IDs of search results.
+
+        Args:
+            results: Search results
+
+        Returns:
+            Set of document IDs
+        """
+        return {str(result["document"]["_id"]) for result in results}
+
+    @staticmethod
+    def _p95(latencies: List[float]) -> float:
+        """
+        Get the 95th percentile latency by the nearest-rank method.
+
+        Args:
+            latencies: Latencies in milliseconds
+
+        Returns:
+            p95 latency, 0.0 for no samples
+        """
+        if not latencies:
+            return 0.0
+        ordered = sorted(latencies)
+        return ordered[math.ceil(0.95 * len(ordered)) - 1]
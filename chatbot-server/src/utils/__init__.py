@@ -4,5 +4,30 @@ Utility functions and helpers.
 Contains common utilities used across the application.
 """
 from .file_utils import FileUtils
+from .json_stream import IncrementalProductParser
+from .cache import LRUCache
+from .text import normalize_query
+from .metrics import MetricsRegistry, metrics
+from .sqlite_store import SQLiteKeyValueStore
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .embedding_cache import EmbeddingCache, MemmapVectorStore
+from .micro_batcher import MicroBatcher
+from .catalog_stream import iter_csv, iter_ndjson, read_file_chunks
 
-__all__ = ["FileUtils"]
+__all__ = [
+    "FileUtils",
+    "IncrementalProductParser",
+    "LRUCache",
+    "normalize_query",
+    "MetricsRegistry",
+    "metrics",
+    "SQLiteKeyValueStore",
+    "SingleFlight",
+    "AsyncSingleFlight",
+    "EmbeddingCache",
+    "MemmapVectorStore",
+    "MicroBatcher",
+    "iter_ndjson",
+    "iter_csv",
+    "read_file_chunks",
+]
@@ -0,0 +1,104 @@
+"""
+Streaming catalog parsers.
+
+Turn byte chunks of NDJSON or CSV product catalogs into product
+dictionaries without reading the whole file into memory.
+"""
+import asyncio
+import csv
+import json
+import logging
+from typing import AsyncIterable, AsyncIterator, Dict
+
+logger = logging.getLogger(__name__)
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """
+    Split a byte stream into decoded lines.
+
+    Args:
+        chunks: Byte chunks of arbitrary size
+
+    Yields:
+        Lines without their line terminator
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8")
+    if buffer.strip():
+        yield buffer.rstrip(b"\r").decode("utf-8")
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Dict]:
+    """
+    Parse newline-delimited JSON products.
+
+    Blank lines are ignored; malformed lines and non-object values are
+    logged and skipped.
+
+    Args:
+        chunks: Byte chunks of the NDJSON document
+
+    Yields:
+        One dictionary per product
+    """
+    number = 0
+    async for line in iter_lines(chunks):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            product = json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed NDJSON line {number}: {e}")
+            continue
+        if isinstance(product, dict):
+            yield product
+        else:
+            logger.warning(f"Skipping NDJSON line {number}: expected an object")
+
+
+async def iter_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[Dict]:
+    """
+    Parse CSV products with a header row.
+
+    Each record must fit on one line; empty cells are dropped.
+
+    Args:
+        chunks: Byte chunks of the CSV document
+
+    Yields:
+        One dictionary per product, keyed by header
+    """
+    header = None
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip().lstrip("\ufeff") for name in row]
+            continue
+        yield {name: value for name, value in zip(header, row) if value != ""}
+
+
+async def read_file_chunks(path: str, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    """
+    Read a file in chunks without blocking the event loop.
+
+    Args:
+        path: File path
+        chunk_size: Bytes per chunk
+
+    Yields:
+        Byte chunks of the file
+    """
+    with open(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
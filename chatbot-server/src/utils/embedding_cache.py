@@ -0,0 +1,259 @@
+"""
+Embedding cache utilities.
+
+Memoizes text embeddings by content hash so repeated texts are not sent
+to the embedding provider again.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .cache import LRUCache
+from .metrics import metrics
+
+
+class MemmapVectorStore:
+    """
+    Append-only on-disk store of float32 vectors.
+
+    Vectors of each dimension live in one flat file that is read through a
+    read-only memory map, so cached vectors cost no heap memory until used.
+    A SQLite index maps keys to rows; row allocation happens inside a write
+    transaction, which keeps several workers appending to the same
+    directory consistent.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initialize the store and create its index if needed.
+
+        Args:
+            directory: Directory holding the vector files and the index
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._local = threading.local()
+        self._maps: Dict[int, np.memmap] = {}
+        self._lock = threading.Lock()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors "
+            "(key TEXT PRIMARY KEY, dim INTEGER NOT NULL, row INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS vectors_dim_row ON vectors (dim, row)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the index connection of the current thread.
+
+        Returns:
+            SQLite connection in autocommit mode
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                os.path.join(self.directory, "index.sqlite"),
+                timeout=30,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _path(self, dim: int) -> str:
+        """Path of the vector file for a dimension."""
+        return os.path.join(self.directory, f"vectors-{dim}.f32")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Get a stored vector.
+
+        Args:
+            key: Entry key
+
+        Returns:
+            Copy of the stored vector, or None if missing
+        """
+        row = self._connection().execute(
+            "SELECT dim, row FROM vectors WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        dim, index = row
+        with self._lock:
+            mapped = self._maps.get(dim)
+            if mapped is None or index >= mapped.shape[0]:
+                mapped = self._remap(dim)
+            if mapped is None or index >= mapped.shape[0]:
+                return None
+            return np.array(mapped[index])
+
+    def set(self, key: str, vector: np.ndarray) -> None:
+        """
+        Append a vector unless the key is already stored.
+
+        Args:
+            key: Entry key
+            vector: One-dimensional vector
+        """
+        data = np.ascontiguousarray(vector, dtype=np.float32)
+        dim = int(data.shape[0])
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM vectors WHERE key = ?", (key,)).fetchone():
+                conn.execute("COMMIT")
+                return
+            (index,) = conn.execute(
+                "SELECT COALESCE(MAX(row) + 1, 0) FROM vectors WHERE dim = ?", (dim,)
+            ).fetchone()
+            fd = os.open(self._path(dim), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                os.pwrite(fd, data.tobytes(), index * dim * 4)
+            finally:
+                os.close(fd)
+            conn.execute("INSERT INTO vectors (key, dim, row) VALUES (?, ?, ?)", (key, dim, index))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _remap(self, dim: int) -> Optional[np.memmap]:
+        """
+        Map the current contents of a vector file.
+
+        Args:
+            dim: Vector dimension
+
+        Returns:
+            Read-only memory map of all complete rows, None if the file is empty
+        """
+        path = self._path(dim)
+        rows = os.path.getsize(path) // (dim * 4) if os.path.exists(path) else 0
+        if not rows:
+            return None
+        mapped = np.memmap(path, dtype=np.float32, mode="r", shape=(rows, dim))
+        self._maps[dim] = mapped
+        return mapped
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of text embeddings.
+
+    Entries are keyed on a hash of the model, input type and text, so
+    document and query embeddings of the same text stay separate. Lookups
+    hit an in-memory LRU first and then an optional memory-mapped disk tier.
+    """
+
+    def __init__(self, maxsize: int = 4096, path: Optional[str] = None) -> None:
+        """
+        Initialize embedding cache.
+
+        Args:
+            maxsize: Maximum number of embeddings kept in memory
+            path: Directory of the disk tier, None for memory only
+        """
+        self._memory = LRUCache(maxsize=maxsize)
+        self._store = MemmapVectorStore(path) if path else None
+
+    @staticmethod
+    def cache_key(text: str, model: str, input_type: str) -> str:
+        """
+        Build the cache key of an embedding.
+
+        Args:
+            text: Embedded text
+            model: Embedding model identifier
+            input_type: Provider input type, e.g. search_query
+
+        Returns:
+            SHA-256 hex digest of model, input type and text
+        """
+        payload = "\0".join((model, input_type, text))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, text: str, model: str, input_type: str) -> Optional[np.ndarray]:
+        """
+        Look up an embedding in memory, then on disk.
+
+        Args:
+            text: Embedded text
+            model: Embedding model identifier
+            input_type: Provider input type
+
+        Returns:
+            Cached float32 vector, or None on a miss
+        """
+        key = self.cache_key(text, model, input_type)
+        vector = self._memory.get(key)
+        if vector is not None:
+            metrics.increment("embedding_cache.memory_hits")
+            return vector
+
+        if self._store is not None:
+            vector = self._store.get(key)
+            if vector is not None:
+                self._memory.set(key, vector)
+                metrics.increment("embedding_cache.disk_hits")
+                return vector
+
+        metrics.increment("embedding_cache.misses")
+        return None
+
+    def set(self, text: str, model: str, input_type: str, vector: Sequence[float]) -> None:
+        """
+        Store an embedding in memory and on disk.
+
+        Args:
+            text: Embedded text
+            model: Embedding model identifier
+            input_type: Provider input type
+            vector: Embedding vector
+        """
+        key = self.cache_key(text, model, input_type)
+        data = np.asarray(vector, dtype=np.float32)
+        self._memory.set(key, data)
+        if self._store is not None:
+            self._store.set(key, data)
+
+    def embed(self,
+              texts: List[str],
+              model: str,
+              input_type: str,
+              embed_fn: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """
+        Embed texts, calling the provider only for uncached ones.
+
+        Args:
+            texts: Texts to embed
+            model: Embedding model identifier
+            input_type: Provider input type
+            embed_fn: Function embedding a list of texts in one provider call
+
+        Returns:
+            Embedding vectors in the order of texts
+        """
+        vectors: Dict[str, np.ndarray] = {}
+        missing: Dict[str, None] = {}
+        for text in texts:
+            if text in vectors or text in missing:
+                continue
+            cached = self.get(text, model, input_type)
+            if cached is None:
+                missing[text] = None
+            else:
+                vectors[text] = cached
+
+        if missing:
+            for text, vector in zip(missing, embed_fn(list(missing))):
+                self.set(text, model, input_type, vector)
+                vectors[text] = np.asarray(vector, dtype=np.float32)
+
+        return [vectors[text].tolist() for text in texts]
@@ -0,0 +1,108 @@
+"""
+Incremental JSON parsing helpers for streamed LLM output.
+
+Contains parsers that extract complete JSON objects from a response
+while it is still being generated, token by token.
+"""
+import json
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalProductParser:
+    """
+    Incremental parser for the ranking response of the search agent.
+    
+    Consumes the ranking JSON chunk by chunk and returns every object of the
+    top-level products array as soon as its closing brace arrives, so
+    products can be shown before the full completion has finished.
+    """
+
+    def __init__(self, array_key: str = "products") -> None:
+        """
+        Initialize the incremental parser.
+        
+        Args:
+            array_key: Top-level key holding the array of objects to extract
+        """
+        self._array_key = array_key
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_key = None
+        self._in_array = False
+        self._object_start = -1
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Feed the next chunk of the streamed response.
+        
+        Args:
+            chunk: Newly received text
+            
+        Returns:
+            List of objects completed by this chunk, in stream order
+        """
+        self._buffer += chunk
+        completed: List[Dict[str, Any]] = []
+
+        while self._pos < len(self._buffer):
+            char = self._buffer[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = self._buffer[self._string_start + 1:self._pos]
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char == "{":
+                self._depth += 1
+                if self._in_array and self._depth == 3:
+                    self._object_start = self._pos
+            elif char == "}":
+                if self._in_array and self._depth == 3 and self._object_start >= 0:
+                    completed.extend(self._parse_object(self._buffer[self._object_start:self._pos + 1]))
+                    self._object_start = -1
+                self._depth -= 1
+            elif char == "[":
+                self._depth += 1
+                if self._depth == 2 and self._last_key == self._array_key:
+                    self._in_array = True
+            elif char == "]":
+                if self._in_array and self._depth == 2:
+                    self._in_array = False
+                self._depth -= 1
+            elif char == "," and self._depth == 1:
+                self._last_key = None
+
+            self._pos += 1
+
+        return completed
+
+    @staticmethod
+    def _parse_object(text: str) -> List[Dict[str, Any]]:
+        """
+        Parse a single extracted object.
+        
+        Args:
+            text: JSON text of one object
+            
+        Returns:
+            List with the parsed object, or an empty list if it is malformed
+        """
+        try:
+            return [json.loads(text)]
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping malformed streamed object: {text}")
+            return []
@@ -0,0 +1,82 @@
+"""
+In-process metrics registry.
+
+Collects counters and gauges from services so they can be exposed
+through the API without an external metrics backend.
+"""
+import threading
+from collections import defaultdict
+from typing import Dict, Union
+
+Number = Union[int, float]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of named counters and gauges.
+    
+    Counters only grow and record events such as cache hits; gauges hold
+    the latest value of a derived measurement such as a ratio.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._gauges: Dict[str, Number] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """
+        Increase a counter.
+        
+        Args:
+            name: Counter name
+            value: Amount to add
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: Number) -> None:
+        """
+        Set a gauge to its latest value.
+        
+        Args:
+            name: Gauge name
+            value: Current value
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def get(self, name: str) -> Number:
+        """
+        Get the current value of a counter or gauge.
+        
+        Args:
+            name: Metric name
+            
+        Returns:
+            Current value, or 0 if the metric was never recorded
+        """
+        with self._lock:
+            if name in self._gauges:
+                return self._gauges[name]
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Number]]:
+        """
+        Get a copy of all metrics.
+        
+        Returns:
+            Dictionary with counters and gauges keyed by name
+        """
+        with self._lock:
+            return {"counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+    def reset(self) -> None:
+        """Clear all metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+metrics = MetricsRegistry()
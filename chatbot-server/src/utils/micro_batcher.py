@@ -0,0 +1,192 @@
+"""
+Micro-batching of embedding requests.
+
+Collects texts submitted by concurrent callers for a few milliseconds
+and embeds them with one provider call.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+EmbedBatchFunction = Callable[[List[str], str], List[List[float]]]
+
+
+class MicroBatcher:
+    """
+    Cross-request batcher for embedding calls.
+
+    Texts are queued per input type. A background thread flushes a queue
+    once it holds max_batch_size texts or its oldest text has waited
+    max_wait_ms, sending the unique texts in one call of embed_fn and
+    resolving the future of every waiting caller. Batches run on a small
+    thread pool so a slow provider call does not hold back the next batch.
+    Usable from threads through embed and from coroutines through aembed.
+    """
+
+    def __init__(self,
+                 embed_fn: EmbedBatchFunction,
+                 max_batch_size: int = 96,
+                 max_wait_ms: float = 5.0,
+                 max_concurrent_batches: int = 4,
+                 name: str = "embedding_batcher") -> None:
+        """
+        Initialize micro-batcher.
+
+        Args:
+            embed_fn: Function embedding a list of texts for an input type
+            max_batch_size: Maximum number of texts per provider call
+            max_wait_ms: Maximum milliseconds a text waits for its batch to fill
+            max_concurrent_batches: Maximum number of provider calls in flight
+            name: Metric prefix of this batcher
+        """
+        if max_batch_size <= 0:
+            raise ValueError(f"max_batch_size must be positive, but got {max_batch_size}")
+        self._embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._pending: Dict[str, List[Tuple[str, Future, float]]] = {}
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_batches,
+                                            thread_name_prefix=name)
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, text: str, input_type: str) -> Future:
+        """
+        Queue a text for embedding.
+
+        Args:
+            text: Text to embed
+            input_type: Provider input type, e.g. search_query
+
+        Returns:
+            Future resolving to the embedding vector
+        """
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=f"{self.name}-worker", daemon=True)
+                self._worker.start()
+            self._pending.setdefault(input_type, []).append((text, future, time.monotonic()))
+            self._condition.notify()
+        return future
+
+    def embed(self, texts: List[str], input_type: str) -> List[List[float]]:
+        """
+        Embed texts, sharing provider calls with concurrent callers.
+
+        Args:
+            texts: Texts to embed
+            input_type: Provider input type
+
+        Returns:
+            Embedding vectors in the order of texts
+
+        Raises:
+            Exception: Whatever embed_fn raised for the batch of a text
+        """
+        futures = [self.submit(text, input_type) for text in texts]
+        return [future.result() for future in futures]
+
+    async def aembed(self, texts: List[str], input_type: str) -> List[List[float]]:
+        """
+        Asynchronously embed texts without blocking the event loop.
+
+        Args:
+            texts: Texts to embed
+            input_type: Provider input type
+
+        Returns:
+            Embedding vectors in the order of texts
+        """
+        futures = [asyncio.wrap_future(self.submit(text, input_type)) for text in texts]
+        return list(await asyncio.gather(*futures))
+
+    def close(self) -> None:
+        """Flush queued texts and stop the background thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._worker is not None:
+            self._worker.join()
+        self._executor.shutdown(wait=True)
+
+    def _run(self) -> None:
+        """Background loop flushing due batches."""
+        while True:
+            with self._condition:
+                batch = self._next_batch()
+                while batch is None:
+                    if self._closed:
+                        return
+                    self._condition.wait(timeout=self._time_to_deadline())
+                    batch = self._next_batch()
+            self._executor.submit(self._flush, *batch)
+
+    def _time_to_deadline(self) -> Optional[float]:
+        """
+        Seconds until the oldest queued text is due, None if nothing is queued.
+
+        Must be called with the condition held.
+        """
+        oldest = [items[0][2] for items in self._pending.values() if items]
+        if not oldest:
+            return None
+        return max(0.0, min(oldest) + self.max_wait - time.monotonic())
+
+    def _next_batch(self) -> Optional[Tuple[str, List[Tuple[str, Future, float]]]]:
+        """
+        Take the next due batch off its queue.
+
+        Must be called with the condition held. A queue is due when full,
+        when its oldest text has waited long enough, or when closing.
+
+        Returns:
+            Tuple of input type and queued items, None if nothing is due
+        """
+        now = time.monotonic()
+        for input_type, items in self._pending.items():
+            if not items:
+                continue
+            if (len(items) >= self.max_batch_size
+                    or items[0][2] + self.max_wait <= now
+                    or self._closed):
+                batch = items[:self.max_batch_size]
+                del items[:self.max_batch_size]
+                return input_type, batch
+        return None
+
+    def _flush(self, input_type: str, batch: List[Tuple[str, Future, float]]) -> None:
+        """
+        Embed a batch with one provider call and resolve its futures.
+
+        Args:
+            input_type: Provider input type of the batch
+            batch: Queued texts with their futures
+        """
+        unique = list(dict.fromkeys(text for text, _, _ in batch))
+        metrics.increment(f"{self.name}.batches")
+        metrics.increment(f"{self.name}.texts", len(batch))
+        metrics.set_gauge(f"{self.name}.last_batch_size", len(unique))
+        try:
+            embeddings = self._embed_fn(unique, input_type)
+            if len(embeddings) != len(unique):
+                raise ValueError(f"Expected {len(unique)} embeddings, but got {len(embeddings)}")
+            vectors = dict(zip(unique, embeddings))
+        except Exception as e:
+            logger.warning(f"Embedding batch of {len(unique)} texts failed: {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        for text, future, _ in batch:
+            future.set_result(vectors[text])
@@ -0,0 +1,282 @@
+"""
+In-flight request coalescing.
+
+Lets concurrent identical requests share one running computation
+instead of each starting their own.
+"""
+import asyncio
+import contextlib
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from .metrics import metrics
+
+
+class _CoalescingStats:
+    """Records how many calls joined an already running computation."""
+
+    def __init__(self, name: str) -> None:
+        """
+        Initialize statistics.
+
+        Args:
+            name: Metric prefix of this coalescing group
+        """
+        self.name = name
+        self.calls = 0
+        self.coalesced = 0
+        self._stats_lock = threading.Lock()
+
+    def _record(self, coalesced: bool) -> None:
+        """
+        Record one call and publish the coalescing ratio.
+
+        Args:
+            coalesced: Whether the call joined a running computation
+        """
+        with self._stats_lock:
+            self.calls += 1
+            self.coalesced += int(coalesced)
+            ratio = self.coalesced / self.calls
+        metrics.increment(f"{self.name}.calls")
+        if coalesced:
+            metrics.increment(f"{self.name}.coalesced")
+        metrics.set_gauge(f"{self.name}.coalescing_ratio", ratio)
+
+
+class _Call:
+    """Result slot of one running synchronous computation."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(_CoalescingStats):
+    """
+    Coalescing of concurrent identical blocking calls across threads.
+
+    The first caller of a key runs the function; callers arriving while it
+    runs wait for and share its result or exception. Shared results must
+    be treated as read-only by the callers.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Initialize coalescing group.
+
+        Args:
+            name: Metric prefix of this coalescing group
+        """
+        super().__init__(name)
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the request
+            fn: Function computing the result
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of fn, shared by all coalesced callers
+
+        Raises:
+            Exception: Whatever fn raised, re-raised in every coalesced caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        self._record(coalesced=not leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class _Flight:
+    """One running async computation and the callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class _Broadcast:
+    """Events of one running stream, buffered for every subscriber."""
+
+    def __init__(self) -> None:
+        self.events: List[Any] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.condition = asyncio.Condition()
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class AsyncSingleFlight(_CoalescingStats):
+    """
+    Coalescing of concurrent identical async calls and streams on one event loop.
+
+    For calls, the first caller of a key starts the coroutine in a
+    background task and callers arriving meanwhile share its result or
+    exception. A cancelled caller only stops waiting; the task is cancelled
+    once its last caller is gone. For streams, the first
+    subscriber of a key starts the stream in a background task; every
+    subscriber, including late ones, receives all events from the
+    beginning. The stream is cancelled once its last subscriber leaves.
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Initialize coalescing group.
+
+        Args:
+            name: Metric prefix of this coalescing group
+        """
+        super().__init__(name)
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        self._calls: Dict[Hashable, _Flight] = {}
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        Await fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the request
+            fn: Coroutine function computing the result
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of fn, shared by all coalesced callers
+
+        Raises:
+            Exception: Whatever fn raised, re-raised in every coalesced caller
+        """
+        flight = self._calls.get(key)
+        leader = flight is None
+        if leader:
+            flight = self._calls[key] = _Flight(asyncio.create_task(fn(*args, **kwargs)))
+            flight.task.add_done_callback(lambda task: self._finish_call(key, flight))
+        self._record(coalesced=not leader)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                if self._calls.get(key) is flight:
+                    del self._calls[key]
+                flight.task.cancel()
+
+    def _finish_call(self, key: Hashable, flight: _Flight) -> None:
+        """
+        Forget a finished call so the next caller of its key starts afresh.
+
+        Args:
+            key: Identity of the request
+            flight: The finished call
+        """
+        if self._calls.get(key) is flight:
+            del self._calls[key]
+        if not flight.task.cancelled():
+            # Mark the exception retrieved when every caller had left
+            flight.task.exception()
+
+    async def stream(self,
+                     key: Hashable,
+                     factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """
+        Subscribe to the stream of a key, starting it if none is running.
+
+        Args:
+            key: Identity of the request
+            factory: Callable creating the async iterator of events
+
+        Yields:
+            Events of the shared stream in order
+
+        Raises:
+            Exception: Whatever the shared stream raised
+        """
+        broadcast = self._streams.get(key)
+        leader = broadcast is None
+        if leader:
+            broadcast = self._streams[key] = _Broadcast()
+            broadcast.task = asyncio.create_task(self._pump(key, broadcast, factory()))
+        self._record(coalesced=not leader)
+
+        broadcast.subscribers += 1
+        index = 0
+        try:
+            while True:
+                async with broadcast.condition:
+                    await broadcast.condition.wait_for(
+                        lambda: index < len(broadcast.events) or broadcast.finished
+                    )
+                    pending = broadcast.events[index:]
+                    finished = broadcast.finished
+
+                for event in pending:
+                    yield event
+                index += len(pending)
+
+                if finished and index >= len(broadcast.events):
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.task.done():
+                if self._streams.get(key) is broadcast:
+                    del self._streams[key]
+                broadcast.task.cancel()
+
+    async def _pump(self, key: Hashable, broadcast: _Broadcast, events: AsyncIterator[Any]) -> None:
+        """
+        Drive the shared stream and buffer its events.
+
+        Args:
+            key: Identity of the request
+            broadcast: Buffer shared by the subscribers
+            events: Async iterator producing the events
+        """
+        try:
+            async for event in events:
+                async with broadcast.condition:
+                    broadcast.events.append(event)
+                    broadcast.condition.notify_all()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                with contextlib.suppress(Exception):
+                    await aclose()
+            if self._streams.get(key) is broadcast:
+                del self._streams[key]
+            async with broadcast.condition:
+                broadcast.finished = True
+                broadcast.condition.notify_all()
@@ -0,0 +1,104 @@
+"""
+SQLite-backed key-value store.
+
+Provides a small persistent store shared by processes on the same host,
+used as the disk tier of in-memory caches.
+"""
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class SQLiteKeyValueStore:
+    """
+    Persistent string key-value store in a SQLite database file.
+    
+    Uses write-ahead logging and a busy timeout so several uvicorn
+    workers can read and write the same file concurrently. Each thread
+    gets its own connection.
+    """
+
+    def __init__(self, path: str, table: str = "kv") -> None:
+        """
+        Initialize the store and create its table if needed.
+        
+        Args:
+            path: Path of the SQLite database file
+            table: Table name, allowing several stores in one file
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.path = path
+        self.table = table
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the connection of the current thread.
+        
+        Returns:
+            SQLite connection configured for concurrent access
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a stored value.
+        
+        Args:
+            key: Entry key
+            
+        Returns:
+            Stored value, or None if missing or expired
+        """
+        row = self._connection().execute(
+            f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, replacing any previous one.
+        
+        Args:
+            key: Entry key
+            value: Value to store
+            ttl: Seconds before the entry expires, None to never expire
+        """
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._connection() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+
+    def delete_expired(self) -> int:
+        """
+        Remove expired entries.
+        
+        Returns:
+            Number of removed entries
+        """
+        with self._connection() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            return cursor.rowcount
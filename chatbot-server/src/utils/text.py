@@ -0,0 +1,26 @@
+"""
+Text normalization helpers.
+
+Contains functions that canonicalize user text for matching and cache keys.
+"""
+import re
+
+_NON_WORD = re.compile(r"[^\w$%.\s-]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a user query for comparison and cache keys.
+    
+    Lowercases the text, drops punctuation that does not change the meaning
+    of a product query, and collapses whitespace.
+    
+    Args:
+        query: Raw user query
+        
+    Returns:
+        Normalized query string
+    """
+    text = _NON_WORD.sub(" ", query.lower())
+    return _WHITESPACE.sub(" ", text).strip(" .-")
@@ -66,4 +66,15 @@ def test_health_check() -> None:
     response = client.get("/api/health")
 
     assert response.status_code == 200
-    assert response.json() == {"status": "healthy"}
\ No newline at end of file
+    assert response.json() == {"status": "healthy"}
+
+def test_metrics_returns_snapshot() -> None:
+    app = FastAPI()
+    app.include_router(router)
+
+    client = TestClient(app)
+
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"counters", "gauges"}
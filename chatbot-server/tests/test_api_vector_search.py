@@ -13,9 +13,19 @@ class FakeVectorStore:
         self.calls.append((query, top_k, department, region))
         return self.results
 
+    async def asearch_similar(self, query: str, top_k: int = 5, department=None, region=None):
+        return self.search_similar(query, top_k, department, region)
+
+    async def asearch_batch(self, searches):
+        self.calls.extend(searches)
+        return [[{"query": search["query"]}] for search in searches]
+
 
 class ErrorVectorStore:
-    def search_similar(self, query: str, top_k: int = 5, department=None, region=None):
+    async def asearch_similar(self, query: str, top_k: int = 5, department=None, region=None):
+        raise RuntimeError("boom")
+
+    async def asearch_batch(self, searches):
         raise RuntimeError("boom")
 
 
@@ -69,3 +79,63 @@ def test_semantic_search_handles_error() -> None:
 
     assert response.status_code == 200
     assert response.json()["results"] == []
+
+
+def test_batch_search_applies_defaults_and_keeps_order() -> None:
+    app = FastAPI()
+    store = FakeVectorStore([])
+    app.state.vector_store = store
+    app.include_router(router)
+
+    client = TestClient(app)
+
+    response = client.post("/api/vector/search/batch", json={
+        "queries": [{"query": "shoes"}, {"query": "hats", "top_k": 1, "region": "eu"}],
+        "top_k": 3,
+        "department": "apparel",
+    })
+
+    assert response.status_code == 200
+    assert [item["query"] for item in response.json()["results"]] == ["shoes", "hats"]
+    assert store.calls == [
+        {"query": "shoes", "top_k": 3, "department": "apparel", "region": None},
+        {"query": "hats", "top_k": 1, "department": "apparel", "region": "eu"},
+    ]
+
+
+def test_batch_search_validates_and_handles_errors() -> None:
+    app = FastAPI()
+    app.state.vector_store = ErrorVectorStore()
+    app.include_router(router)
+
+    client = TestClient(app)
+
+    assert client.post("/api/vector/search/batch", json={"queries": []}).status_code == 422
+    response = client.post("/api/vector/search/batch", json={"queries": [{"query": "shoes"}]})
+    assert response.json()["results"] == []
+
+
+class FakeIngestionService:
+    def __init__(self):
+        self.products = []
+
+    async def ingest(self, products):
+        async for product in products:
+            self.products.append(product)
+        return {"received": len(self.products), "inserted": len(self.products), "skipped": 0, "failed": 0}
+
+
+def test_ingest_streams_ndjson_and_csv() -> None:
+    app = FastAPI()
+    ingestion = FakeIngestionService()
+    app.state.ingestion_service = ingestion
+    app.include_router(router)
+
+    client = TestClient(app)
+
+    response = client.post("/api/vector/ingest", content=b'{"product_title": "Shoe"}\n{"product_title": "Hat"}\n')
+    assert response.json()["inserted"] == 2
+
+    response = client.post("/api/vector/ingest?format=csv", content=b"product_title,price\nScarf,10\n")
+    assert response.json()["received"] == 3
+    assert ingestion.products[-1] == {"product_title": "Scarf", "price": "10"}
@@ -0,0 +1,178 @@
+import pytest
+
+from src.services.backfill import EmbeddingBackfillJob
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, key, direction):
+        self.documents = sorted(self.documents, key=lambda doc: doc[key])
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    def __iter__(self):
+        return iter(self.documents)
+
+
+class FakeCollection:
+    def __init__(self, documents=()):
+        self.documents = {doc["_id"]: dict(doc) for doc in documents}
+
+    def find(self, query, projection=None):
+        def matches(doc):
+            for field, condition in query.items():
+                if "$gt" in condition and not doc[field] > condition["$gt"]:
+                    return False
+                if "$exists" in condition and (field in doc) != condition["$exists"]:
+                    return False
+                if "$type" in condition and not isinstance(doc.get(field), str):
+                    return False
+            return True
+
+        return FakeCursor([dict(doc) for doc in self.documents.values() if matches(doc)])
+
+    def find_one(self, query):
+        return self.documents.get(query["_id"])
+
+    def replace_one(self, query, document, upsert=False):
+        self.documents[query["_id"]] = dict(document)
+
+    def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.documents[op._filter["_id"]].update(op._doc["$set"])
+
+
+class FakeMongoDB:
+    def __init__(self):
+        self.collections = {}
+
+    def get_collection(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+
+class FakeRepo:
+    refresh_interval = 0
+
+    def __init__(self, products, ready=True):
+        self.mongo_db = FakeMongoDB()
+        self.products = FakeCollection(products)
+        self.ready = ready
+        self.embedding_field = "product_title_embedding"
+        self.created = []
+        self.activated = None
+        self.write_on_activate = False
+
+    def get_collection(self):
+        return self.products
+
+    def create_vector_index(self, index_name, embedding_field, num_dimensions):
+        self.created.append((index_name, embedding_field, num_dimensions))
+
+    def index_ready(self, index_name, timeout_seconds=0):
+        return self.ready
+
+    def activate_index(self, index_name, embedding_field, num_dimensions):
+        self.activated = (index_name, embedding_field, num_dimensions)
+        if self.write_on_activate:
+            self.products.documents[99] = {"_id": 99, "product_title": "saved during the switch"}
+
+
+class FakeEmbeddings:
+    def __init__(self, dimensions=2, fail_on=None):
+        self.dimensions = dimensions
+        self.fail_on = fail_on
+        self.texts = []
+
+    def embed_texts(self, texts):
+        if self.fail_on in texts:
+            raise RuntimeError("provider down")
+        self.texts.extend(texts)
+        return [[float(len(text))] * self.dimensions for text in texts]
+
+
+def products(count):
+    return [{"_id": i, "product_title": f"item {i}"} for i in range(count)]
+
+
+def test_backfill_embeds_shadow_field_and_activates_index() -> None:
+    repo = FakeRepo(products(9) + [{"_id": 9}])
+    job = EmbeddingBackfillJob(repo, FakeEmbeddings(), "embedding_v2", 2, batch_size=2, concurrency=2)
+
+    state = job.run()
+
+    assert state["status"] == "done"
+    assert state["processed"] == 10
+    assert repo.products.documents[3]["embedding_v2"] == [6.0, 6.0]
+    assert repo.created == [("embedding_v2_index", "embedding_v2", 2)]
+    assert repo.activated == ("embedding_v2_index", "embedding_v2", 2)
+    repo.embedding_field = "embedding_v2"
+    assert job.run()["processed"] == 10
+
+
+def test_backfill_resumes_from_checkpoint_and_catches_up() -> None:
+    repo = FakeRepo(products(8))
+    failing = EmbeddingBackfillJob(repo, FakeEmbeddings(fail_on="item 5"), "embedding_v2", 2, batch_size=2, concurrency=2)
+
+    with pytest.raises(RuntimeError):
+        failing.run()
+    checkpoint = repo.mongo_db.get_collection("embedding_backfills").find_one({"_id": "embedding_v2"})
+    assert checkpoint["last_id"] == 3
+
+    # A catalog re-ingest replaced product 1 behind the walk
+    repo.products.documents[1] = {"_id": 1, "product_title": "item 1 renamed"}
+    embeddings = FakeEmbeddings()
+    state = EmbeddingBackfillJob(repo, embeddings, "embedding_v2", 2, batch_size=2, concurrency=2).run()
+
+    assert embeddings.texts == ["item 4", "item 5", "item 6", "item 7", "item 1 renamed"]
+    assert state["processed"] == 9
+    assert all("embedding_v2" in doc for doc in repo.products.documents.values())
+
+
+def test_backfill_waits_for_index_and_validates_dimensions() -> None:
+    repo = FakeRepo(products(2), ready=False)
+
+    state = EmbeddingBackfillJob(repo, FakeEmbeddings(), "embedding_v2", 2).run()
+    assert state["status"] == "indexing"
+    assert repo.activated is None
+
+    with pytest.raises(ValueError):
+        EmbeddingBackfillJob(repo, FakeEmbeddings(dimensions=3), "embedding_v3", 2).run()
+    with pytest.raises(ValueError):
+        EmbeddingBackfillJob(repo, FakeEmbeddings(), "product_title_embedding", 2).run()
+
+
+def test_backfill_catches_up_on_writes_during_the_switch() -> None:
+    repo = FakeRepo(products(3))
+    repo.write_on_activate = True
+
+    state = EmbeddingBackfillJob(repo, FakeEmbeddings(), "embedding_v2", 2).run()
+
+    assert state["status"] == "done"
+    assert repo.products.documents[99]["embedding_v2"] == [23.0, 23.0]
+
+
+def test_backfill_finishes_after_stopping_once_activated() -> None:
+    repo = FakeRepo(products(3))
+    repo.write_on_activate = True
+    failing = EmbeddingBackfillJob(repo, FakeEmbeddings(fail_on="saved during the switch"), "embedding_v2", 2)
+
+    with pytest.raises(RuntimeError):
+        failing.run()
+    checkpoint = repo.mongo_db.get_collection("embedding_backfills").find_one({"_id": "embedding_v2"})
+    assert checkpoint["status"] == "activated"
+
+    # The CLI loads the active index, which is now the target field
+    repo.embedding_field = "embedding_v2"
+    repo.created = []
+    embeddings = FakeEmbeddings()
+    state = EmbeddingBackfillJob(repo, embeddings, "embedding_v2", 2).run(restart=True)
+
+    assert state["status"] == "done"
+    assert embeddings.texts == ["saved during the switch"]
+    assert repo.created == []
+    assert repo.products.documents[99]["embedding_v2"] == [23.0, 23.0]
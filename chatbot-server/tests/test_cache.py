@@ -0,0 +1,38 @@
+import pytest
+
+from src.utils.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert len(cache) == 2
+
+    cache.clear()
+    assert cache.get("a", "missing") == "missing"
+
+
+def test_lru_cache_rejects_non_positive_size() -> None:
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+
+def test_lru_cache_expires_entries(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr("src.utils.cache.time.monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+
+    now[0] += 11
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
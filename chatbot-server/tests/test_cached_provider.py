@@ -0,0 +1,100 @@
+import pytest
+
+from src.adapters.llm.cached_provider import CachedLLMClient
+from src.utils.sqlite_store import SQLiteKeyValueStore
+
+
+class FakeLLMClient:
+    generation_params = {"temperature": 0.5, "max_tokens": 1024}
+
+    def __init__(self, response: str = "answer"):
+        self.response = response
+        self.calls = 0
+
+    def generate(self, prompt: str, model: str) -> str:
+        self.calls += 1
+        return self.response
+
+    async def agenerate(self, prompt: str, model: str) -> str:
+        self.calls += 1
+        return self.response
+
+    async def astream(self, prompt: str, model: str):
+        self.calls += 1
+        for token in ["ans", "wer"]:
+            yield token
+
+
+def run(coro):
+    return __import__("asyncio").run(coro)
+
+
+def test_cached_client_memoizes_completions() -> None:
+    inner = FakeLLMClient()
+    client = CachedLLMClient(inner)
+
+    assert client.generate("p", "m") == "answer"
+    assert client.generate("p", "m") == "answer"
+    assert run(client.agenerate("p", "m")) == "answer"
+    assert client.generate("p", "other") == "answer"
+
+    assert inner.calls == 2
+
+
+def test_cache_key_includes_params() -> None:
+    inner = FakeLLMClient()
+
+    default = CachedLLMClient(inner).cache_key("p", "m")
+    hotter = CachedLLMClient(inner, params={"temperature": 1.0}).cache_key("p", "m")
+
+    assert default != hotter
+
+
+def test_cached_client_persists_across_instances(tmp_path) -> None:
+    path = str(tmp_path / "llm.sqlite")
+    first = FakeLLMClient()
+    run(CachedLLMClient(first, cache_path=path).agenerate("p", "m"))
+
+    second = FakeLLMClient("different")
+    result = run(CachedLLMClient(second, cache_path=path).agenerate("p", "m"))
+
+    assert result == "answer"
+    assert second.calls == 0
+
+
+def test_cached_client_stream_replays_cached_completion(tmp_path) -> None:
+    inner = FakeLLMClient()
+    client = CachedLLMClient(inner, cache_path=str(tmp_path / "llm.sqlite"))
+
+    async def collect():
+        return [token async for token in client.astream("p", "m")]
+
+    assert run(collect()) == ["ans", "wer"]
+    assert run(collect()) == ["answer"]
+    assert inner.calls == 1
+
+
+def test_cached_client_rejects_non_string_prompt() -> None:
+    client = CachedLLMClient(FakeLLMClient())
+
+    with pytest.raises(ValueError):
+        client.generate(123, "m")
+
+
+def test_sqlite_store_expires_entries(tmp_path, monkeypatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("src.utils.sqlite_store.time.time", lambda: now[0])
+    store = SQLiteKeyValueStore(str(tmp_path / "kv.sqlite"))
+    store.set("a", b"1", ttl=10)
+    store.set("b", b"2")
+
+    now[0] += 11
+
+    assert store.get("a") is None
+    assert store.get("b") == b"2"
+    assert store.delete_expired() == 1
+
+
+def test_sqlite_store_rejects_invalid_table(tmp_path) -> None:
+    with pytest.raises(ValueError):
+        SQLiteKeyValueStore(str(tmp_path / "kv.sqlite"), table="bad;table")
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+
+from src.adapters.search.cached_source_provider import CachedSourceSearchProvider
+
+
+class FakeSourceSearch:
+    def __init__(self, sources=None, failing=()):
+        self.sources = sources or {}
+        self.failing = set(failing)
+        self.calls = []
+
+    def find_sources(self, titles):
+        self.calls.append(list(titles))
+        return [
+            None if title in self.failing else self.sources.get(title, {"image": "", "url": ""})
+            for title in titles
+        ]
+
+    async def afind_sources(self, titles):
+        return self.find_sources(titles)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+        self.indexes = []
+
+    def create_index(self, field, **kwargs):
+        self.indexes.append((field, kwargs))
+
+    def find(self, query):
+        keys = query["_id"]["$in"]
+        now = query["expires_at"]["$gt"]
+        return [dict(self.docs[key], _id=key) for key in keys
+                if key in self.docs and self.docs[key]["expires_at"] > now]
+
+    def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.docs[op._filter["_id"]] = dict(op._doc["$set"])
+
+
+def run(coro):
+    return __import__("asyncio").run(coro)
+
+
+def test_cached_provider_normalizes_titles_and_keeps_order() -> None:
+    inner = FakeSourceSearch({"Phone X": {"image": "img", "url": "u"}})
+    provider = CachedSourceSearchProvider(inner)
+
+    assert provider.find_sources(["Phone X", "Laptop"]) == [
+        {"image": "img", "url": "u"},
+        {"image": "", "url": ""},
+    ]
+    result = run(provider.afind_sources(["  phone x ", "laptop", "Phone X"]))
+
+    assert result[0] == {"image": "img", "url": "u"}
+    assert result[2] == result[0]
+    assert inner.calls == [["Phone X", "Laptop"]]
+
+
+def test_cached_provider_resolves_only_missing_titles() -> None:
+    inner = FakeSourceSearch({"A": {"image": "a", "url": "ua"}, "B": {"image": "b", "url": "ub"}})
+    provider = CachedSourceSearchProvider(inner)
+
+    provider.find_sources(["A"])
+    result = run(provider.afind_sources(["A", "B", "b"]))
+
+    assert [source["url"] for source in result] == ["ua", "ub", "ub"]
+    assert inner.calls == [["A"], ["B"]]
+
+
+def test_negative_results_expire_sooner() -> None:
+    inner = FakeSourceSearch()
+    provider = CachedSourceSearchProvider(inner, negative_ttl=0)
+
+    provider.find_sources(["Missing"])
+    provider.find_sources(["Missing"])
+
+    assert inner.calls == [["Missing"], ["Missing"]]
+
+
+def test_persistent_tier_is_shared_across_instances() -> None:
+    collection = FakeCollection()
+    first = FakeSourceSearch({"A": {"image": "a", "url": "ua"}})
+    run(CachedSourceSearchProvider(first, collection=collection).afind_sources(["A"]))
+
+    second = FakeSourceSearch()
+    provider = CachedSourceSearchProvider(second, collection=collection)
+
+    assert provider.find_sources(["a"]) == [{"image": "a", "url": "ua"}]
+    assert second.calls == []
+    assert collection.indexes[0] == ("expires_at", {"expireAfterSeconds": 0})
+    assert collection.docs["a"]["expires_at"] > datetime.now(timezone.utc) + timedelta(hours=23)
+
+
+def test_failed_lookups_are_not_cached() -> None:
+    collection = FakeCollection()
+    inner = FakeSourceSearch({"A": {"image": "a", "url": "ua"}}, failing={"Slow"})
+    provider = CachedSourceSearchProvider(inner, collection=collection)
+
+    result = run(provider.afind_sources(["A", "Slow", "Missing"]))
+
+    assert result == [{"image": "a", "url": "ua"}, {"image": "", "url": ""}, {"image": "", "url": ""}]
+    assert set(collection.docs) == {"a", "missing"}
+
+    # The failed title is retried, the title without sources stays cached negatively
+    inner.failing.clear()
+    inner.sources["Slow"] = {"image": "s", "url": "us"}
+    assert run(provider.afind_sources(["Slow", "Missing"])) == [{"image": "s", "url": "us"}, {"image": "", "url": ""}]
+    assert inner.calls == [["A", "Slow", "Missing"], ["Slow"]]
@@ -0,0 +1,37 @@
+import asyncio
+
+from src.utils.catalog_stream import iter_csv, iter_ndjson, read_file_chunks
+
+
+async def chunked(data: bytes, size: int = 3):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def test_iter_ndjson_handles_split_lines_and_skips_bad_rows() -> None:
+    data = b'{"product_title": "Shoe"}\r\n\nnot json\n[1, 2]\n{"product_title": "Hat"}'
+
+    products = asyncio.run(collect(iter_ndjson(chunked(data))))
+
+    assert products == [{"product_title": "Shoe"}, {"product_title": "Hat"}]
+
+
+def test_iter_csv_uses_header_and_drops_empty_cells() -> None:
+    data = '\ufeffproduct_title,department\n"Shoe, red",apparel\nHat,\n'.encode("utf-8")
+
+    products = asyncio.run(collect(iter_csv(chunked(data, 5))))
+
+    assert products == [{"product_title": "Shoe, red", "department": "apparel"}, {"product_title": "Hat"}]
+
+
+def test_read_file_chunks(tmp_path) -> None:
+    path = tmp_path / "catalog.ndjson"
+    path.write_bytes(b"abcdefg")
+
+    chunks = asyncio.run(collect(read_file_chunks(str(path), chunk_size=3)))
+
+    assert chunks == [b"abc", b"def", b"g"]
@@ -4,6 +4,7 @@ from types import SimpleNamespace
 import pytest
 
 from src.services.chat import ChatService
+from src.utils.metrics import metrics
 from src.services.prompt_messages import PromptMessage
 
 
@@ -16,6 +17,10 @@ class FakeLLMClient:
         self.calls.append((prompt, model))
         return self.response
 
+    async def agenerate(self, prompt: str, model: str) -> str:
+        self.calls.append((prompt, model))
+        return self.response
+
 
 class FakeHybridSearch:
     def search_products(self, query: str, max_local: int = 3, max_foreign: int = 2):
@@ -26,19 +31,36 @@ class FakeSourceSearch:
     def find_sources(self, titles):
         return []
 
+    async def afind_sources(self, titles):
+        return []
+
 
 class FakeGraph:
     def __init__(self, updates):
         self._updates = updates
+        self.payloads = []
 
     async def astream(self, payload, thread, stream_mode="updates"):
+        self.payloads.append(payload)
         for update in self._updates:
-            yield update
+            yield update if isinstance(update, tuple) else ("updates", update)
 
 
 class FakeSearchAgent:
     def __init__(self, **kwargs):
         self.graph = FakeGraph(kwargs["updates"])
+        self.analyze_delay = kwargs.get("analyze_delay", 0)
+        self.analyze_calls = []
+        self.analyze_cancelled = False
+
+    async def analyze_query_node(self, state):
+        self.analyze_calls.append(state)
+        try:
+            await __import__("asyncio").sleep(self.analyze_delay)
+        except __import__("asyncio").CancelledError:
+            self.analyze_cancelled = True
+            raise
+        return {"revised_query": ["q1", "q2"]}
 
 
 def collect_async(async_iter):
@@ -62,7 +84,14 @@ def test_is_query_relevant_checks_response() -> None:
     llm = FakeLLMClient("relevant")
     service = ChatService(llm_client=llm, llm_model="m")
 
-    assert service.is_query_relevant("find shoes") is True
+    assert __import__("asyncio").run(service.is_query_relevant("find shoes")) is True
+
+
+def test_aquery_llm_requires_string() -> None:
+    service = ChatService(llm_client=FakeLLMClient("ok"), llm_model="m")
+
+    with pytest.raises(ValueError):
+        __import__("asyncio").run(service.aquery_llm(prompt=123, model="m"))
 
 
 def test_stream_chat_returns_default_for_irrelevant(monkeypatch) -> None:
@@ -90,3 +119,235 @@ def test_stream_chat_emits_progress_and_result(monkeypatch) -> None:
 
     assert json.loads(results[-1])["type"] == "result"
     assert json.loads(results[-1])["data"]["final"]["message"] == "done"
+
+
+def test_stream_chat_forwards_streamed_products(monkeypatch) -> None:
+    llm = FakeLLMClient("relevant")
+    service = ChatService(llm_client=llm, llm_model="m")
+
+    product_event = {"type": "product", "index": 0, "data": {"title": "t1"}}
+    updates = [
+        {"analyze_query": {}},
+        ("custom", product_event),
+        {"analyze_and_rank": {"result": {"final": {"message": "done"}}}},
+    ]
+
+    monkeypatch.setattr("src.services.chat.SearchAgent", lambda **kwargs: FakeSearchAgent(updates=updates))
+
+    results = collect_async(service.stream_chat("query"))
+
+    assert json.loads(results[1]) == product_event
+    assert json.loads(results[-1])["type"] == "result"
+
+
+def test_stream_chat_reuses_compiled_agent(monkeypatch) -> None:
+    llm = FakeLLMClient("relevant")
+    service = ChatService(llm_client=llm, llm_model="m", search_concurrency=5, search_timeout=2.5)
+    built = []
+    deleted = []
+
+    updates = [{"analyze_and_rank": {"result": {"final": {"message": "done"}}}}]
+
+    def build_agent(**kwargs):
+        built.append(kwargs)
+        return FakeSearchAgent(updates=updates)
+
+    async def fake_delete_thread(thread_id):
+        deleted.append(thread_id)
+
+    monkeypatch.setattr("src.services.chat.SearchAgent", build_agent)
+    monkeypatch.setattr(service.checkpointer, "adelete_thread", fake_delete_thread)
+
+    collect_async(service.stream_chat("first"))
+    collect_async(service.stream_chat("second"))
+
+    assert len(built) == 1
+    assert built[0]["checkpointer"] is service.checkpointer
+    assert (built[0]["search_concurrency"], built[0]["search_timeout"]) == (5, 2.5)
+    assert len(set(deleted)) == 2
+
+
+def test_is_query_relevant_uses_local_fast_path() -> None:
+    llm = FakeLLMClient("irrelevant")
+    service = ChatService(llm_client=llm, llm_model="m")
+
+    assert __import__("asyncio").run(service.is_query_relevant("best budget earbuds")) is True
+    assert __import__("asyncio").run(service.is_query_relevant("tell me a joke")) is False
+    assert llm.calls == []
+
+
+def test_is_query_relevant_caches_llm_verdicts() -> None:
+    llm = FakeLLMClient("relevant")
+    service = ChatService(llm_client=llm, llm_model="m")
+
+    assert __import__("asyncio").run(service.is_query_relevant("Something odd")) is True
+    assert __import__("asyncio").run(service.is_query_relevant("something   ODD")) is True
+
+    assert len(llm.calls) == 1
+    assert "ChatPromptTemplate" not in llm.calls[0][0]
+    assert "Something odd" in llm.calls[0][0]
+
+
+class SlowLLMClient(FakeLLMClient):
+    async def agenerate(self, prompt: str, model: str) -> str:
+        await __import__("asyncio").sleep(0.05)
+        return await super().agenerate(prompt, model)
+
+
+def test_stream_chat_uses_speculative_query_analysis(monkeypatch) -> None:
+    metrics.reset()
+    service = ChatService(llm_client=SlowLLMClient("relevant"), llm_model="m")
+    agent = FakeSearchAgent(updates=[{"analyze_and_rank": {"result": {"final": {"message": "done"}}}}])
+    monkeypatch.setattr("src.services.chat.SearchAgent", lambda **kwargs: agent)
+
+    collect_async(service.stream_chat("something odd"))
+
+    assert agent.analyze_calls == [{"user_query": "something odd"}]
+    assert agent.graph.payloads == [{"user_query": "something odd", "revised_query": ["q1", "q2"]}]
+    assert metrics.get("speculative.analyze_query.started") == 1
+    assert metrics.get("speculative.analyze_query.used") == 1
+    assert metrics.get("speculative.analyze_query.wasted") == 0
+
+
+def test_stream_chat_cancels_speculation_for_irrelevant_query(monkeypatch) -> None:
+    metrics.reset()
+    service = ChatService(llm_client=SlowLLMClient("irrelevant"), llm_model="m")
+    agent = FakeSearchAgent(updates=[], analyze_delay=10)
+    monkeypatch.setattr("src.services.chat.SearchAgent", lambda **kwargs: agent)
+
+    results = collect_async(service.stream_chat("something odd"))
+
+    assert json.loads(results[0])["data"] == {"default": PromptMessage.Default_Message}
+    assert agent.analyze_cancelled is True
+    assert agent.graph.payloads == []
+    assert metrics.get("speculative.analyze_query.wasted") == 1
+
+
+def test_stream_chat_skips_speculation_when_decided_locally(monkeypatch) -> None:
+    metrics.reset()
+    service = ChatService(llm_client=FakeLLMClient("relevant"), llm_model="m")
+    agent = FakeSearchAgent(updates=[])
+    monkeypatch.setattr("src.services.chat.SearchAgent", lambda **kwargs: agent)
+
+    collect_async(service.stream_chat("best budget earbuds"))
+
+    assert agent.analyze_calls == []
+    assert agent.graph.payloads == [{"user_query": "best budget earbuds"}]
+    assert metrics.get("speculative.analyze_query.started") == 0
+
+
+def test_stream_chat_reruns_analysis_when_speculation_fails(monkeypatch) -> None:
+    service = ChatService(llm_client=FakeLLMClient("relevant"), llm_model="m")
+    agent = FakeSearchAgent(updates=[])
+
+    async def failing_analyze(state):
+        raise RuntimeError("boom")
+
+    agent.analyze_query_node = failing_analyze
+    monkeypatch.setattr("src.services.chat.SearchAgent", lambda **kwargs: agent)
+
+    collect_async(service.stream_chat("something odd"))
+
+    assert agent.graph.payloads == [{"user_query": "something odd"}]
+
+
+def test_stream_chat_replays_cached_result(monkeypatch) -> None:
+    metrics.reset()
+    service = ChatService(llm_client=FakeLLMClient("relevant"), llm_model="m")
+    agent = FakeSearchAgent(updates=[
+        {"analyze_query": {}},
+        {"search_product_source": {"result": {"final": {"message": "done"}}}},
+    ])
+    monkeypatch.setattr("src.services.chat.SearchAgent", lambda **kwargs: agent)
+
+    first = collect_async(service.stream_chat("Best budget earbuds"))
+    second = collect_async(service.stream_chat("best  budget earbuds?"))
+
+    assert len(agent.graph.payloads) == 1
+    assert json.loads(second[-1]) == json.loads(first[-1])
+    assert [json.loads(event)["type"] for event in second] == ["progress"] * 4 + ["result"]
+    assert metrics.get("response_cache.hits") == 1
+    assert metrics.get("response_cache.misses") == 1
+
+
+def test_stream_chat_cache_is_keyed_by_model(monkeypatch) -> None:
+    service = ChatService(llm_client=FakeLLMClient("relevant"), llm_model="m")
+    agent = FakeSearchAgent(updates=[{"search_product_source": {"result": {"final": {"message": "done"}}}}])
+    monkeypatch.setattr("src.services.chat.SearchAgent", lambda **kwargs: agent)
+
+    collect_async(service.stream_chat("best earbuds"))
+    service.llm_model = "other"
+    collect_async(service.stream_chat("best earbuds"))
+
+    assert len(agent.graph.payloads) == 2
+
+
+class FakeQueryEmbeddings:
+    def embed_text(self, text: str, input_type: str = "search_document"):
+        if text == "broken":
+            raise RuntimeError("boom")
+        return [1.0, 0.1] if "earbuds" in text else [0.0, 1.0]
+
+
+def test_stream_chat_serves_paraphrase_from_semantic_cache(monkeypatch) -> None:
+    from src.services.semantic_cache import SemanticCache
+
+    service = ChatService(
+        llm_client=FakeLLMClient("relevant"),
+        llm_model="m",
+        semantic_cache=SemanticCache(FakeQueryEmbeddings(), threshold=0.9),
+    )
+    agent = FakeSearchAgent(updates=[{"search_product_source": {"result": {"final": {"message": "done"}}}}])
+    monkeypatch.setattr("src.services.chat.SearchAgent", lambda **kwargs: agent)
+
+    collect_async(service.stream_chat("best earbuds"))
+    replayed = collect_async(service.stream_chat("recommend earbuds"))
+    collect_async(service.stream_chat("best chair"))
+
+    assert json.loads(replayed[-1])["data"] == {"final": {"message": "done"}}
+    assert len(agent.graph.payloads) == 2
+
+
+def test_stream_chat_ignores_semantic_cache_failures(monkeypatch) -> None:
+    from src.services.semantic_cache import SemanticCache
+
+    service = ChatService(
+        llm_client=FakeLLMClient("relevant"),
+        llm_model="m",
+        semantic_cache=SemanticCache(FakeQueryEmbeddings(), threshold=0.9),
+    )
+    agent = FakeSearchAgent(updates=[{"search_product_source": {"result": {"final": {"message": "done"}}}}])
+    monkeypatch.setattr("src.services.chat.SearchAgent", lambda **kwargs: agent)
+
+    results = collect_async(service.stream_chat("broken"))
+
+    assert json.loads(results[-1])["type"] == "result"
+
+
+def test_stream_chat_coalesces_concurrent_identical_queries(monkeypatch) -> None:
+    service = ChatService(llm_client=FakeLLMClient("relevant"), llm_model="m")
+
+    class SlowGraph(FakeGraph):
+        async def astream(self, payload, thread, stream_mode="updates"):
+            self.payloads.append(payload)
+            await __import__("asyncio").sleep(0.05)
+            yield ("updates", {"search_product_source": {"result": {"final": {"message": "done"}}}})
+
+    agent = FakeSearchAgent(updates=[])
+    agent.graph = SlowGraph([])
+    monkeypatch.setattr("src.services.chat.SearchAgent", lambda **kwargs: agent)
+
+    async def run_both():
+        asyncio = __import__("asyncio")
+        return await asyncio.gather(
+            _gather(service.stream_chat("best earbuds")),
+            _gather(service.stream_chat("Best earbuds!")),
+        )
+
+    async def _gather(iterator):
+        return [item async for item in iterator]
+
+    first, second = __import__("asyncio").run(run_both())
+
+    assert first == second
+    assert len(agent.graph.payloads) == 1
@@ -0,0 +1,128 @@
+import pytest
+
+from src import cli
+
+
+class FakeCollection:
+    def find(self, query):
+        return [{"_id": 1, "product_title_embedding": [1.0, 0.0]}]
+
+    def count_documents(self, query):
+        return 1
+
+
+class FakeRepo:
+    embedding_field = "product_title_embedding"
+    num_dimensions = 2
+
+    def get_collection(self):
+        return FakeCollection()
+
+
+def test_snapshot_command_publishes_snapshot(monkeypatch, tmp_path, capsys) -> None:
+    monkeypatch.setattr(cli, "_vector_db_repo", lambda config: FakeRepo())
+
+    cli.main(["snapshot", "--dir", str(tmp_path)])
+
+    assert "Published snapshot" in capsys.readouterr().out
+    assert (tmp_path / "CURRENT").exists()
+    assert cli.VectorSnapshotStore(str(tmp_path)).load().dimensions == 2
+
+
+def test_snapshot_command_requires_directory(monkeypatch) -> None:
+    monkeypatch.delenv("VECTOR_SNAPSHOT_DIR", raising=False)
+
+    with pytest.raises(SystemExit):
+        cli.main(["snapshot"])
+
+
+def test_ingest_command_loads_catalog(monkeypatch, tmp_path, capsys) -> None:
+    inserted = []
+
+    class UpsertCollection:
+        def find(self, query, projection):
+            return [{"product_id": "hat", "content_hash": "stale"}, {"product_id": "scarf"}]
+
+        def bulk_write(self, operations, ordered=True):
+            inserted.extend(op._doc for op in operations)
+            return type("Result", (), {"upserted_count": 1, "matched_count": 1})()
+
+        def delete_many(self, query):
+            return type("Result", (), {"deleted_count": len(query["product_id"]["$in"])})()
+
+    class IngestRepo:
+        product_id_field = "product_id"
+        embedding_field = "product_title_embedding"
+        num_dimensions = 1024
+
+        async def arefresh_active_index(self):
+            pass
+
+        def create_product_index(self):
+            pass
+
+        def get_collection(self):
+            return UpsertCollection()
+
+        def get_async_collection(self):
+            return None
+
+    monkeypatch.setattr(cli, "_vector_db_repo", lambda config: IngestRepo())
+    path = tmp_path / "catalog.csv"
+    path.write_text("product_title\nShoe\nHat\n")
+
+    cli.main(["ingest", str(path), "--provider", "mock", "--prune"])
+
+    assert "1 inserted, 1 updated, 0 unchanged, 1 deleted" in capsys.readouterr().out
+    assert [doc["product_title"] for doc in inserted] == ["Shoe", "Hat"]
+
+
+def test_backfill_command_runs_job(monkeypatch, capsys) -> None:
+    runs = []
+
+    class FakeJob:
+        def __init__(self, repo, embeddings, **kwargs):
+            self.kwargs = kwargs
+
+        def run(self, restart=False, index_timeout=600):
+            runs.append((self.kwargs, restart, index_timeout))
+            return {"status": "done", "processed": 3}
+
+    monkeypatch.setattr(cli, "_vector_db_repo", lambda config: FakeRepo())
+    monkeypatch.setattr(cli, "EmbeddingBackfillJob", FakeJob)
+
+    cli.main(["backfill", "--field", "embedding_v2", "--dimensions", "8", "--provider", "mock", "--restart"])
+
+    assert "Backfill of embedding_v2 is done after 3 products" in capsys.readouterr().out
+    assert runs[0][0]["num_dimensions"] == 8
+    assert runs[0][1] is True
+
+
+def test_tune_command_prints_multiplier(monkeypatch, tmp_path, capsys) -> None:
+    class FakeTuner:
+        def __init__(self, vector_store, **kwargs):
+            self.kwargs = kwargs
+
+        def tune(self, queries):
+            assert queries == ["red shoe", "hat"]
+            return {
+                "met": True,
+                "num_candidates": 40,
+                "num_candidates_multiplier": 4,
+                "trials": [{"num_candidates": 40, "recall": 0.97, "p95_ms": 12.0}],
+            }
+
+    class TuneRepo(FakeRepo):
+        index_name = "pick_smart_vector_index"
+        num_dimensions = 8
+
+    monkeypatch.setattr(cli, "_vector_db_repo", lambda config: TuneRepo())
+    monkeypatch.setattr(cli, "NumCandidatesTuner", FakeTuner)
+    queries = tmp_path / "queries.txt"
+    queries.write_text("red shoe\n\nhat\n")
+
+    cli.main(["tune", "--queries", str(queries), "--provider", "mock"])
+
+    output = capsys.readouterr().out
+    assert "numCandidates=40: recall 0.970" in output
+    assert "VECTOR_NUM_CANDIDATES_MULTIPLIER=4" in output
@@ -23,24 +23,37 @@ class FakeMongoProvider:
     def get_database(self):
         return SimpleNamespace(name="db")
 
+    def get_async_database(self):
+        return SimpleNamespace(name="async-db")
+
 
 class FakeVectorRepo:
-    def __init__(self, mongo_db):
+    index_name = "pick_smart_vector_index"
+    embedding_field = "product_title_embedding"
+
+    def __init__(self, mongo_db, async_db=None):
         self.mongo_db = mongo_db
+        self.async_db = async_db
 
     def initialize(self):
         return None
 
+    def refresh_active_index(self):
+        return self.index_name, self.embedding_field
+
 
 class FakeEmbeddings:
-    def __init__(self, provider_type: str):
+    def __init__(self, provider_type: str, **kwargs):
         self.provider_type = provider_type
+        self.kwargs = kwargs
 
 
 class FakeVectorStoreService:
-    def __init__(self, vector_db_repo, embeddings_service):
+    def __init__(self, vector_db_repo, embeddings_service, num_candidates_multiplier=10, exact=False):
         self.vector_db_repo = vector_db_repo
         self.embeddings_service = embeddings_service
+        self.num_candidates_multiplier = num_candidates_multiplier
+        self.exact = exact
 
 
 class FakeHybridSearch:
@@ -58,6 +71,12 @@ class FakeChatService:
         self.kwargs = kwargs
 
 
+class FakeIngestionService:
+    def __init__(self, vector_db_repo, embeddings_service):
+        self.vector_db_repo = vector_db_repo
+        self.embeddings_service = embeddings_service
+
+
 def test_config_reads_env(monkeypatch) -> None:
     monkeypatch.setenv("GROQ_API_KEY", "g")
     monkeypatch.setenv("TAVILY_API_KEY", "t")
@@ -78,6 +97,43 @@ def test_config_reads_env(monkeypatch) -> None:
     assert cfg.mongo_database == "db"
 
 
+def test_config_cache_settings(monkeypatch) -> None:
+    monkeypatch.setenv("RESPONSE_CACHE_SIZE", "10")
+    monkeypatch.setenv("RESPONSE_CACHE_TTL", "60")
+    monkeypatch.setenv("SEMANTIC_CACHE_THRESHOLD", "0.9")
+
+    cfg = config_module.Config()
+
+    assert cfg.response_cache_size == 10
+    assert cfg.response_cache_ttl == 60.0
+    assert cfg.semantic_cache_threshold == 0.9
+
+    monkeypatch.setenv("SEMANTIC_CACHE_THRESHOLD", "")
+    assert cfg.semantic_cache_threshold is None
+
+
+def test_config_search_settings(monkeypatch) -> None:
+    cfg = config_module.Config()
+    assert cfg.search_concurrency == 3
+    assert cfg.search_timeout == 20.0
+
+    monkeypatch.setenv("SEARCH_CONCURRENCY", "6")
+    monkeypatch.setenv("SEARCH_TIMEOUT", "7.5")
+    assert cfg.search_concurrency == 6
+    assert cfg.search_timeout == 7.5
+
+
+def test_config_vector_search_settings(monkeypatch) -> None:
+    cfg = config_module.Config()
+    assert cfg.vector_num_candidates_multiplier == 10
+    assert cfg.vector_exact_search is False
+
+    monkeypatch.setenv("VECTOR_NUM_CANDIDATES_MULTIPLIER", "4")
+    monkeypatch.setenv("VECTOR_EXACT_SEARCH", "true")
+    assert cfg.vector_num_candidates_multiplier == 4
+    assert cfg.vector_exact_search is True
+
+
 def test_dependency_container_builds_services(monkeypatch) -> None:
     monkeypatch.setattr(config_module, "CustomModelProvider", FakeModelProvider)
     monkeypatch.setattr(config_module, "default_model_path", lambda: "model.yaml")
@@ -93,10 +149,28 @@ def test_dependency_container_builds_services(monkeypatch) -> None:
     container = config_module.DependencyContainer()
 
     assert container.llm_client.api_key == container.config.groq_api_key
+    assert not isinstance(container.llm_client, config_module.CachedLLMClient)
     assert container.vector_store.vector_db_repo.mongo_db.name == "db"
+    assert container.vector_store.vector_db_repo.async_db.name == "async-db"
+    assert container.vector_store.num_candidates_multiplier == 10
+    assert isinstance(container.source_search, config_module.CachedSourceSearchProvider)
+    assert container.hybrid_search.kwargs["embedding_field"] == "product_title_embedding"
+    assert container.hybrid_search.kwargs["active_index"]() == ("pick_smart_vector_index", "product_title_embedding")
 
     chat_service = container.get_chat_service()
     assert isinstance(chat_service, FakeChatService)
+    assert chat_service.kwargs["semantic_cache"] is None
+    assert chat_service.kwargs["search_concurrency"] == container.config.search_concurrency
+    assert chat_service.kwargs["search_timeout"] == container.config.search_timeout
+
+    monkeypatch.setattr(config_module, "CatalogIngestionService", FakeIngestionService)
+    ingestion = container.ingestion_service
+    assert ingestion.embeddings_service.provider_type == "cohere"
+    assert ingestion.embeddings_service.kwargs["api_key"] == container.config.cohere_api_key
+
+    monkeypatch.setenv("SEMANTIC_CACHE_THRESHOLD", "0.9")
+    chat_service = container.get_chat_service()
+    assert chat_service.kwargs["semantic_cache"].threshold == 0.9
 
 
 def test_get_dependency_container_is_singleton(monkeypatch) -> None:
@@ -109,3 +183,36 @@ def test_get_dependency_container_is_singleton(monkeypatch) -> None:
 
     assert first == "instance"
     assert second == "instance"
+
+
+def test_dependency_container_wraps_llm_with_cache(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    monkeypatch.setattr(config_module, "CustomModelProvider", FakeModelProvider)
+    monkeypatch.setattr(config_module, "default_model_path", lambda: "model.yaml")
+    monkeypatch.setattr(config_module, "GroqProvider", FakeGroqProvider)
+    monkeypatch.setattr(config_module, "MongoDBVectorProvider", FakeMongoProvider)
+    monkeypatch.setattr(config_module, "VectorDBRepository", FakeVectorRepo)
+    monkeypatch.setattr("src.services.embeddings.EmbeddingsService", FakeEmbeddings)
+    monkeypatch.setattr(config_module, "VectorStoreService", FakeVectorStoreService)
+    monkeypatch.setattr(config_module, "TavilyHybridSearchProvider", FakeHybridSearch)
+    monkeypatch.setattr(config_module, "TavilySourceSearchProvider", FakeSourceSearch)
+
+    container = config_module.DependencyContainer()
+
+    assert isinstance(container.llm_client, config_module.CachedLLMClient)
+
+
+def test_dependency_container_local_vector_backend(monkeypatch) -> None:
+    monkeypatch.setenv("VECTOR_BACKEND", "local")
+    monkeypatch.setattr(config_module, "CustomModelProvider", FakeModelProvider)
+    monkeypatch.setattr(config_module, "default_model_path", lambda: "model.yaml")
+    monkeypatch.setattr(config_module, "GroqProvider", FakeGroqProvider)
+    monkeypatch.setattr(config_module, "MongoDBVectorProvider", FakeMongoProvider)
+    monkeypatch.setattr(config_module, "VectorDBRepository", FakeVectorRepo)
+    monkeypatch.setattr(config_module, "TavilyHybridSearchProvider", FakeHybridSearch)
+    monkeypatch.setattr(config_module, "TavilySourceSearchProvider", FakeSourceSearch)
+
+    container = config_module.DependencyContainer()
+
+    assert isinstance(container.vector_store, config_module.LocalVectorStoreService)
+    assert len(container.vector_store.index) == 0
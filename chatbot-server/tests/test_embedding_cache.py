@@ -0,0 +1,56 @@
+import numpy as np
+
+from src.utils.embedding_cache import EmbeddingCache, MemmapVectorStore
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0, 2.0] for text in texts]
+
+
+def test_embed_calls_provider_only_for_missing_texts() -> None:
+    cache = EmbeddingCache()
+    embedder = FakeEmbedder()
+
+    first = cache.embed(["a", "bb", "a"], "m", "search_query", embedder)
+    second = cache.embed(["bb", "ccc"], "m", "search_query", embedder)
+
+    assert first == [[1.0, 1.0, 2.0], [2.0, 1.0, 2.0], [1.0, 1.0, 2.0]]
+    assert second == [[2.0, 1.0, 2.0], [3.0, 1.0, 2.0]]
+    assert embedder.calls == [["a", "bb"], ["ccc"]]
+
+
+def test_cache_key_separates_model_and_input_type() -> None:
+    keys = {
+        EmbeddingCache.cache_key("text", "m", "search_query"),
+        EmbeddingCache.cache_key("text", "m", "search_document"),
+        EmbeddingCache.cache_key("text", "other", "search_query"),
+    }
+
+    assert len(keys) == 3
+
+
+def test_disk_tier_survives_new_instances(tmp_path) -> None:
+    path = str(tmp_path / "embeddings")
+    EmbeddingCache(path=path).embed(["a", "bb"], "m", "search_query", FakeEmbedder())
+
+    embedder = FakeEmbedder()
+    result = EmbeddingCache(path=path).embed(["bb", "a"], "m", "search_query", embedder)
+
+    assert result == [[2.0, 1.0, 2.0], [1.0, 1.0, 2.0]]
+    assert embedder.calls == []
+
+
+def test_memmap_store_keeps_dimensions_apart(tmp_path) -> None:
+    store = MemmapVectorStore(str(tmp_path))
+    store.set("small", np.array([1.0, 2.0]))
+    store.set("large", np.array([1.0, 2.0, 3.0, 4.0]))
+    store.set("small", np.array([9.0, 9.0]))
+
+    assert store.get("small").tolist() == [1.0, 2.0]
+    assert store.get("large").tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert store.get("missing") is None
@@ -20,7 +20,20 @@ def test_mock_embeddings_is_deterministic() -> None:
     vec2 = service.embed_text("hello")
 
     assert vec1 == vec2
-    assert len(vec1) == 1536
+    assert len(vec1) == 1024
+
+
+def test_mock_embeddings_batch_matrix() -> None:
+    service = EmbeddingsService(provider_type="mock", dimensions=64)
+
+    matrix = service.embed_texts(["wireless headphones", "wireless headphone", "garden hose", ""], as_array=True)
+
+    assert matrix.shape == (4, 64)
+    assert matrix.dtype == "float32"
+    assert abs(float(matrix[0] @ matrix[0]) - 1.0) < 1e-5
+    assert matrix[0] @ matrix[1] > matrix[0] @ matrix[2]
+    assert not matrix[3].any()
+    assert matrix[0].tolist() == service.embed_text("wireless headphones")
 
 
 def test_cohere_embeddings(monkeypatch) -> None:
@@ -37,3 +50,57 @@ def test_unknown_provider_raises() -> None:
 
     with pytest.raises(ValueError):
         service.embed_text("hello")
+
+
+class BatchCohereClient:
+    def __init__(self, api_key: str, failures: int = 0):
+        self.calls = []
+        self.failures = failures
+
+    def embed(self, model: str, texts, input_type: str):
+        self.calls.append(len(texts))
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("temporary")
+
+        class Result:
+            embeddings = [[float(text), 1.0] for text in texts]
+        return Result()
+
+
+def test_embed_texts_batches_and_preserves_order(monkeypatch) -> None:
+    client = BatchCohereClient("key")
+    monkeypatch.setattr("src.services.embeddings.cohere.Client", lambda api_key: client)
+    service = EmbeddingsService(provider_type="cohere", api_key="key")
+    texts = [str(i) for i in range(200)]
+
+    vectors = service.embed_texts(texts)
+
+    assert sorted(client.calls) == [8, 96, 96]
+    assert [vector[0] for vector in vectors] == [float(i) for i in range(200)]
+
+
+def test_embed_texts_retries_and_returns_array(monkeypatch) -> None:
+    client = BatchCohereClient("key", failures=2)
+    monkeypatch.setattr("src.services.embeddings.cohere.Client", lambda api_key: client)
+    service = EmbeddingsService(provider_type="cohere", api_key="key", retry_backoff=0)
+
+    matrix = service.embed_texts(["1", "2"], as_array=True)
+
+    assert matrix.dtype == "float32"
+    assert matrix.flags["C_CONTIGUOUS"]
+    assert matrix.tolist() == [[1.0, 1.0], [2.0, 1.0]]
+    assert client.calls == [2, 2, 2]
+
+    empty = service.embed_texts([], as_array=True)
+    assert empty.shape == (0, service.dimensions)
+    assert empty.dtype == "float32"
+
+
+def test_embed_texts_gives_up_after_max_retries(monkeypatch) -> None:
+    client = BatchCohereClient("key", failures=5)
+    monkeypatch.setattr("src.services.embeddings.cohere.Client", lambda api_key: client)
+    service = EmbeddingsService(provider_type="cohere", api_key="key", max_retries=1, retry_backoff=0)
+
+    with pytest.raises(RuntimeError):
+        service.embed_texts(["1"])
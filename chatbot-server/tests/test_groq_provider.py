@@ -15,6 +15,23 @@ class FakeGroqClient:
         return types.SimpleNamespace(choices=[choice])
 
 
+class FakeAsyncGroqClient:
+    def __init__(self):
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        if kwargs.get("stream"):
+            return self._stream()
+        message = types.SimpleNamespace(content="hello async")
+        choice = types.SimpleNamespace(message=message)
+        return types.SimpleNamespace(choices=[choice])
+
+    async def _stream(self):
+        for content in ["hel", None, "lo"]:
+            delta = types.SimpleNamespace(content=content)
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+
 def test_groq_provider_generates_response(monkeypatch) -> None:
     monkeypatch.setattr("src.adapters.llm.groq_provider.Groq", lambda api_key: FakeGroqClient())
     provider = GroqProvider(api_key="key")
@@ -30,3 +47,33 @@ def test_groq_provider_rejects_non_string_prompt(monkeypatch) -> None:
 
     with pytest.raises(ValueError):
         provider.generate(prompt=123, model="model")
+
+
+def test_groq_provider_agenerate_uses_async_client(monkeypatch) -> None:
+    monkeypatch.setattr("src.adapters.llm.groq_provider.Groq", lambda api_key: FakeGroqClient())
+    monkeypatch.setattr("src.adapters.llm.groq_provider.AsyncGroq", lambda api_key: FakeAsyncGroqClient())
+    provider = GroqProvider(api_key="key")
+
+    result = __import__("asyncio").run(provider.agenerate(prompt="ping", model="model"))
+
+    assert result == "hello async"
+
+
+def test_groq_provider_agenerate_rejects_non_string_prompt(monkeypatch) -> None:
+    monkeypatch.setattr("src.adapters.llm.groq_provider.Groq", lambda api_key: FakeGroqClient())
+    monkeypatch.setattr("src.adapters.llm.groq_provider.AsyncGroq", lambda api_key: FakeAsyncGroqClient())
+    provider = GroqProvider(api_key="key")
+
+    with pytest.raises(ValueError):
+        __import__("asyncio").run(provider.agenerate(prompt=123, model="model"))
+
+
+def test_groq_provider_astream_yields_deltas(monkeypatch) -> None:
+    monkeypatch.setattr("src.adapters.llm.groq_provider.Groq", lambda api_key: FakeGroqClient())
+    monkeypatch.setattr("src.adapters.llm.groq_provider.AsyncGroq", lambda api_key: FakeAsyncGroqClient())
+    provider = GroqProvider(api_key="key")
+
+    async def _collect():
+        return [token async for token in provider.astream(prompt="ping", model="model")]
+
+    assert __import__("asyncio").run(_collect()) == ["hel", "lo"]
@@ -0,0 +1,174 @@
+import asyncio
+from types import SimpleNamespace
+
+from pymongo.errors import BulkWriteError
+
+from src.services.ingestion import CatalogIngestionService
+
+
+class FakeCollection:
+    def __init__(self, fail_titles=()):
+        self.documents = {}
+        self.batches = []
+        self.deletes = []
+        self.fail_titles = set(fail_titles)
+
+    def find(self, query, projection):
+        return [
+            {"product_id": doc["product_id"], "content_hash": doc.get("content_hash")}
+            for doc in self.documents.values()
+        ]
+
+    def bulk_write(self, operations, ordered=True):
+        assert ordered is False
+        self.batches.append([op._doc for op in operations])
+        upserted = matched = 0
+        for op in operations:
+            doc = op._doc
+            if doc["product_title"] in self.fail_titles:
+                continue
+            if doc["product_id"] in self.documents:
+                matched += 1
+            else:
+                upserted += 1
+            self.documents[doc["product_id"]] = doc
+        if upserted + matched < len(operations):
+            raise BulkWriteError({"nUpserted": upserted, "nMatched": matched, "writeErrors": [{}]})
+        return SimpleNamespace(upserted_count=upserted, matched_count=matched)
+
+    def delete_many(self, query):
+        ids = query["product_id"]["$in"]
+        self.deletes.append(ids)
+        for product_id in ids:
+            self.documents.pop(product_id, None)
+        return SimpleNamespace(deleted_count=len(ids))
+
+
+class FakeAsyncCollection(FakeCollection):
+    async def find(self, query, projection):
+        for doc in FakeCollection.find(self, query, projection):
+            yield doc
+
+    async def bulk_write(self, operations, ordered=True):
+        return FakeCollection.bulk_write(self, operations, ordered)
+
+    async def delete_many(self, query):
+        return FakeCollection.delete_many(self, query)
+
+
+class FakeRepo:
+    product_id_field = "product_id"
+    embedding_field = "product_title_embedding"
+
+    def __init__(self, collection=None, async_collection=None):
+        self.collection = collection
+        self.async_collection = async_collection
+        self.indexed = False
+
+    async def arefresh_active_index(self):
+        pass
+
+    def create_product_index(self):
+        self.indexed = True
+
+    def get_collection(self):
+        return self.collection
+
+    def get_async_collection(self):
+        return self.async_collection
+
+
+class FakeEmbeddings:
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    def embed_texts(self, texts):
+        self.calls.append(texts)
+        if self.fail_on in texts:
+            raise RuntimeError("embedding failed")
+        return [[float(len(text))] for text in texts]
+
+
+async def products(items):
+    for item in items:
+        yield item
+
+
+def test_ingest_batches_embeds_and_upserts() -> None:
+    collection = FakeCollection()
+    embeddings = FakeEmbeddings()
+    repo = FakeRepo(collection)
+    service = CatalogIngestionService(repo, embeddings, batch_size=2, embed_workers=1, write_workers=1)
+    items = [{"product_title": title} for title in ["a", "bb", "ccc"]] + [{"price": 1}, {"product_title": " "}]
+
+    stats = asyncio.run(service.ingest(products(items)))
+
+    assert stats["received"] == 5
+    assert stats["inserted"] == 3
+    assert stats["skipped"] == 2
+    assert repo.indexed
+    assert embeddings.calls == [["a", "bb"], ["ccc"]]
+    document = collection.batches[0][1]
+    assert document["product_id"] == "bb"
+    assert document["product_title_embedding"] == [2.0]
+    assert document["content_hash"] == service.content_hash({"product_title": "bb", "product_id": "bb"})
+
+
+def test_reingest_embeds_only_changed_products_and_prunes() -> None:
+    collection = FakeAsyncCollection()
+    embeddings = FakeEmbeddings()
+    service = CatalogIngestionService(FakeRepo(async_collection=collection), embeddings)
+    catalog = [{"product_id": i, "product_title": f"item {i}", "price": 10} for i in range(4)]
+    asyncio.run(service.ingest(products(catalog)))
+    embeddings.calls.clear()
+
+    refreshed = catalog[:2] + [{**catalog[2], "price": 12}, {"product_id": 9, "product_title": "new"}]
+    stats = asyncio.run(service.ingest(products(refreshed), prune=True))
+
+    assert embeddings.calls == [["item 2", "new"]]
+    assert stats == {
+        "received": 4, "inserted": 1, "updated": 1, "unchanged": 2,
+        "deleted": 1, "skipped": 0, "failed": 0,
+    }
+    assert collection.deletes == [["3"]]
+    assert sorted(collection.documents) == ["0", "1", "2", "9"]
+
+
+def test_ingest_counts_failed_batches() -> None:
+    collection = FakeCollection(fail_titles={"b"})
+    service = CatalogIngestionService(FakeRepo(collection), FakeEmbeddings(fail_on="x"), batch_size=2)
+    items = [{"product_title": title} for title in ["a", "b", "x", "y", "z"]]
+
+    stats = asyncio.run(service.ingest(products(items)))
+
+    assert stats["inserted"] == 2
+    assert stats["failed"] == 3
+
+
+def test_prune_refuses_empty_and_truncated_catalogs() -> None:
+    collection = FakeCollection()
+    service = CatalogIngestionService(FakeRepo(collection), FakeEmbeddings())
+    catalog = [{"product_id": i, "product_title": f"item {i}"} for i in range(10)]
+    asyncio.run(service.ingest(products(catalog)))
+
+    assert asyncio.run(service.ingest(products([]), prune=True))["deleted"] == 0
+    assert asyncio.run(service.ingest(products([{"price": 1}]), prune=True))["deleted"] == 0
+    assert asyncio.run(service.ingest(products(catalog[:5]), prune=True))["deleted"] == 0
+    assert len(collection.documents) == 10
+
+    assert asyncio.run(service.ingest(products(catalog[:9]), prune=True))["deleted"] == 1
+    assert len(collection.documents) == 9
+
+
+def test_prune_refuses_after_failed_batches() -> None:
+    collection = FakeCollection()
+    catalog = [{"product_id": i, "product_title": f"item {i}"} for i in range(4)]
+    asyncio.run(CatalogIngestionService(FakeRepo(collection), FakeEmbeddings()).ingest(products(catalog)))
+
+    failing = CatalogIngestionService(FakeRepo(collection), FakeEmbeddings(fail_on="new"), prune_min_ratio=0.5)
+    stats = asyncio.run(failing.ingest(products(catalog[:2] + [{"product_title": "new"}]), prune=True))
+
+    assert stats["failed"] == 1
+    assert stats["deleted"] == 0
+    assert len(collection.documents) == 4
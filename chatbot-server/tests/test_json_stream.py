@@ -0,0 +1,41 @@
+import json
+
+from src.utils.json_stream import IncrementalProductParser
+
+
+def test_parser_emits_products_as_they_complete() -> None:
+    payload = json.dumps({
+        "initial": {"message": "a {tricky} \"quoted\" message"},
+        "products": [
+            {"title": "t1", "description": "has } brace"},
+            {"title": "t2", "description": "nested", "specs": {"size": "L"}},
+        ],
+        "final": {"message": "bye"},
+    })
+    parser = IncrementalProductParser()
+
+    emitted = []
+    for start in range(0, len(payload), 5):
+        emitted.append(parser.feed(payload[start:start + 5]))
+
+    products = [product for batch in emitted for product in batch]
+    assert [product["title"] for product in products] == ["t1", "t2"]
+    assert products[1]["specs"] == {"size": "L"}
+    first_batch = next(idx for idx, batch in enumerate(emitted) if batch)
+    assert first_batch < len(emitted) - 1
+
+
+def test_parser_ignores_other_arrays() -> None:
+    parser = IncrementalProductParser()
+
+    result = parser.feed('{"other": [{"title": "x"}], "products": [{"title": "y"}]}')
+
+    assert result == [{"title": "y"}]
+
+
+def test_parser_skips_malformed_objects() -> None:
+    parser = IncrementalProductParser()
+
+    result = parser.feed('{"products": [{"title": oops}, {"title": "ok"}]}')
+
+    assert result == [{"title": "ok"}]
@@ -0,0 +1,178 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.repositories.local_vector_index import LocalVectorIndex
+from src.services.local_vector_store import LocalVectorStoreService
+
+
+class FakeEmbeddings:
+    def embed_text(self, text: str):
+        return {"shoe": [1.0, 0.0, 0.0], "hat": [0.0, 1.0, 0.0]}.get(text, [0.0, 0.0, 1.0])
+
+    def embed_texts(self, texts):
+        return [self.embed_text(text) for text in texts]
+
+
+def build_index(**kwargs) -> LocalVectorIndex:
+    index = LocalVectorIndex(dimensions=3, **kwargs)
+    index.add_many(
+        ["a", "b", "c"],
+        np.array([[1.0, 0.1, 0.0], [0.9, 0.0, 0.4], [0.0, 1.0, 0.0]]),
+        [
+            {"_id": "a", "department": "shoes", "region": "us"},
+            {"_id": "b", "department": "shoes", "region": "eu"},
+            {"_id": "c", "department": "hats", "region": "us"},
+        ],
+    )
+    return index
+
+
+def test_search_ranks_by_cosine_similarity() -> None:
+    index = build_index()
+
+    results = index.search([1.0, 0.0, 0.0], top_k=2)
+
+    assert [doc["_id"] for _, doc in results] == ["a", "b"]
+    assert results[0][0] == pytest.approx(1 / np.sqrt(1.01), rel=1e-5)
+
+
+def test_search_applies_filters() -> None:
+    index = build_index()
+
+    results = index.search([1.0, 0.0, 0.0], top_k=5, filters={"department": "shoes", "region": "eu"})
+
+    assert [doc["_id"] for _, doc in results] == ["b"]
+    assert index.search([1.0, 0.0, 0.0], filters={"department": "toys"}) == []
+
+
+def test_replace_and_remove_documents() -> None:
+    index = build_index()
+
+    index.add("a", [0.0, 0.0, 1.0], {"_id": "a", "department": "shoes"})
+    assert index.search([0.0, 0.0, 1.0], top_k=1)[0][1]["_id"] == "a"
+    assert len(index) == 3
+
+    assert index.remove("a") is True
+    assert index.remove("a") is False
+    assert [doc["_id"] for _, doc in index.search([0.0, 0.0, 1.0], top_k=5)] == ["b", "c"]
+
+
+def test_hnsw_matches_exact_search() -> None:
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(600, 16)).astype(np.float32)
+    ids = [str(i) for i in range(600)]
+    docs = [{"_id": doc_id, "region": "us" if i % 2 else "eu"} for i, doc_id in enumerate(ids)]
+
+    exact = LocalVectorIndex(dimensions=16, hnsw_threshold=10**6)
+    exact.add_many(ids, vectors, docs)
+    approximate = LocalVectorIndex(dimensions=16, hnsw_threshold=200, ef_search=100)
+    # The graph builds in the background from the first batch and catches up on the second
+    approximate.add_many(ids[:300], vectors[:300], docs[:300])
+    approximate.add_many(ids[300:], vectors[300:], docs[300:])
+    approximate.create_vector_index(wait=True)
+    assert approximate._graph is not None
+    assert len(approximate._graph._links) == 600
+
+    recall = []
+    for query in rng.normal(size=(20, 16)):
+        expected = {doc["_id"] for _, doc in exact.search(query, top_k=10)}
+        found = {doc["_id"] for _, doc in approximate.search(query, top_k=10)}
+        recall.append(len(expected & found) / 10)
+        filtered = approximate.search(query, top_k=5, filters={"region": "us"})
+        assert all(doc["region"] == "us" for _, doc in filtered)
+
+    assert np.mean(recall) >= 0.95
+
+
+def test_hnsw_recall_on_clustered_embeddings() -> None:
+    # Clustered data with a sparse graph: linking only the nearest
+    # candidates strands whole clusters and scores about 0.3 recall
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(100, 16))
+    points = centers[rng.integers(0, 100, 2050)] + 0.5 * rng.normal(size=(2050, 16))
+    vectors = (points @ rng.normal(size=(16, 64)) + 0.3 * rng.normal(size=(2050, 64))).astype(np.float32)
+    ids = [str(i) for i in range(2000)]
+    index = LocalVectorIndex(dimensions=64, hnsw_threshold=10**6, m=4, ef_construction=20, ef_search=20)
+    index.add_many(ids, vectors[:2000], [{"_id": doc_id} for doc_id in ids])
+    expected = [{doc["_id"] for _, doc in index.search(query, top_k=10)} for query in vectors[2000:]]
+
+    index.hnsw_threshold = 1000
+    index.create_vector_index(wait=True)
+    recall = [
+        len(truth & {doc["_id"] for _, doc in index.search(query, top_k=10)}) / 10
+        for query, truth in zip(vectors[2000:], expected)
+    ]
+
+    assert np.mean(recall) >= 0.95
+
+
+def test_hnsw_search_during_insertions() -> None:
+    rng = np.random.default_rng(2)
+    vectors = rng.normal(size=(1100, 16)).astype(np.float32)
+    ids = [str(i) for i in range(1100)]
+    index = LocalVectorIndex(dimensions=16, hnsw_threshold=100, m=4, ef_construction=20)
+    index.add_many(ids[:200], vectors[:200], [{"_id": doc_id} for doc_id in ids[:200]])
+    index.create_vector_index(wait=True)
+    assert index._graph is not None
+
+    # Insertions grow the graph past the rows a running search has read,
+    # and reallocate the matrix once the first 1024 rows are used
+    errors = []
+    adding = threading.Event()
+
+    def search() -> None:
+        while adding.is_set():
+            try:
+                assert len(index.search(rng.normal(size=16), top_k=5)) == 5
+            except Exception as e:
+                errors.append(e)
+
+    adding.set()
+    searchers = [threading.Thread(target=search) for _ in range(4)]
+    for searcher in searchers:
+        searcher.start()
+    for row in range(200, 1100):
+        index.add(ids[row], vectors[row], {"_id": ids[row]})
+    adding.clear()
+    for searcher in searchers:
+        searcher.join()
+
+    assert errors == []
+    assert len(index._graph._links) == 1100
+
+
+def test_from_documents_strips_embeddings() -> None:
+    index = LocalVectorIndex.from_documents(
+        [{"_id": 1, "product_title": "shoe", "product_title_embedding": [1.0, 0.0, 0.0]}, {"_id": 2}],
+        dimensions=3,
+    )
+
+    assert len(index) == 1
+    assert index.search([1.0, 0.0, 0.0])[0][1] == {"_id": "1", "product_title": "shoe"}
+
+
+def test_local_vector_store_service() -> None:
+    service = LocalVectorStoreService(index=build_index(), embeddings_service=FakeEmbeddings())
+
+    results = service.search_similar("hat", top_k=1, region="us")
+    assert results[0]["document"]["_id"] == "c"
+    assert __import__("asyncio").run(service.asearch_similar("hat", top_k=1, region="us")) == results
+    assert set(results[0]) == {"similarityScore", "document"}
+
+    doc_id = service.insert_vector({"product_title": "other", "department": "misc"})
+    assert service.search_similar("other", top_k=1)[0]["document"]["_id"] == doc_id
+    assert service.delete_document(doc_id) is True
+    assert service.delete_document(doc_id) is False
+
+
+def test_local_vector_store_batch_search() -> None:
+    service = LocalVectorStoreService(index=build_index(), embeddings_service=FakeEmbeddings())
+
+    results = __import__("asyncio").run(service.asearch_batch([
+        {"query": "hat", "top_k": 1},
+        {"query": "shoe", "top_k": 1, "region": "eu"},
+    ]))
+
+    assert [[item["document"]["_id"] for item in result] for result in results] == [["c"], ["b"]]
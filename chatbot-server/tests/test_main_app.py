@@ -17,6 +17,7 @@ class FakeContainer:
     def __init__(self):
         self.vector_db_repo = FakeVectorRepo()
         self.vector_store = "vector-store"
+        self.ingestion_service = "ingestion-service"
 
     def get_chat_service(self):
         return "chat-service"
@@ -40,6 +41,7 @@ def test_lifespan_sets_app_state(monkeypatch) -> None:
         async with app.router.lifespan_context(app):
             assert app.state.chat_service == "chat-service"
             assert app.state.vector_store == "vector-store"
+            assert app.state.ingestion_service == "ingestion-service"
             assert container.vector_db_repo.initialized is True
 
     __import__("asyncio").run(_run())
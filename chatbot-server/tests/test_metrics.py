@@ -0,0 +1,17 @@
+from src.utils.metrics import MetricsRegistry
+
+
+def test_metrics_registry_tracks_counters_and_gauges() -> None:
+    registry = MetricsRegistry()
+
+    registry.increment("hits")
+    registry.increment("hits", 2)
+    registry.set_gauge("ratio", 0.5)
+
+    assert registry.get("hits") == 3
+    assert registry.get("ratio") == 0.5
+    assert registry.get("missing") == 0
+    assert registry.snapshot() == {"counters": {"hits": 3}, "gauges": {"ratio": 0.5}}
+
+    registry.reset()
+    assert registry.snapshot() == {"counters": {}, "gauges": {}}
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from src.utils.micro_batcher import MicroBatcher
+
+
+class FakeEmbedder:
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def __call__(self, texts, input_type):
+        with self._lock:
+            self.calls.append((list(texts), input_type))
+        if self.fail:
+            raise RuntimeError("rate limited")
+        return [[float(len(text)), 0.0] for text in texts]
+
+
+def test_concurrent_callers_share_one_batch() -> None:
+    embedder = FakeEmbedder()
+    batcher = MicroBatcher(embedder, max_wait_ms=50)
+    results = {}
+
+    def worker(text):
+        results[text] = batcher.embed([text], "search_query")[0]
+
+    threads = [threading.Thread(target=worker, args=(text,)) for text in ["a", "bb", "ccc", "bb"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert results == {"a": [1.0, 0.0], "bb": [2.0, 0.0], "ccc": [3.0, 0.0]}
+    assert len(embedder.calls) == 1
+    assert sorted(embedder.calls[0][0]) == ["a", "bb", "ccc"]
+
+
+def test_batches_are_split_by_size_and_input_type() -> None:
+    embedder = FakeEmbedder()
+    batcher = MicroBatcher(embedder, max_batch_size=2, max_wait_ms=20)
+
+    futures = [batcher.submit(text, "search_query") for text in ["a", "b", "c"]]
+    document = batcher.submit("a", "search_document")
+    assert [future.result() for future in futures] == [[1.0, 0.0]] * 3
+    assert document.result() == [1.0, 0.0]
+    batcher.close()
+
+    sizes = sorted((len(texts), input_type) for texts, input_type in embedder.calls)
+    assert sizes == [(1, "search_document"), (1, "search_query"), (2, "search_query")]
+
+
+def test_aembed_returns_vectors_in_order() -> None:
+    batcher = MicroBatcher(FakeEmbedder(), max_wait_ms=1)
+
+    result = __import__("asyncio").run(batcher.aembed(["ccc", "a"], "search_query"))
+    batcher.close()
+
+    assert result == [[3.0, 0.0], [1.0, 0.0]]
+
+
+def test_batch_errors_reach_every_caller() -> None:
+    batcher = MicroBatcher(FakeEmbedder(fail=True), max_wait_ms=1)
+
+    with pytest.raises(RuntimeError, match="rate limited"):
+        batcher.embed(["a", "b"], "search_query")
+    batcher.close()
+
+    with pytest.raises(RuntimeError):
+        batcher.submit("a", "search_query")
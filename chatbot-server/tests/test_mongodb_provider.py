@@ -32,3 +32,13 @@ def test_mongodb_provider_creates_uri_and_client(monkeypatch) -> None:
 
     assert db["name"] == "db"
     assert "mongodb+srv://" in provider._uri
+
+
+def test_mongodb_provider_creates_async_database(monkeypatch) -> None:
+    monkeypatch.setattr("src.adapters.vector.mongodb_provider.AsyncMongoClient", FakeMongoClient)
+
+    provider = MongoDBVectorProvider(username="user", password="pass", cluster="cluster", database="db")
+
+    db = provider.get_async_database()
+
+    assert db["name"] == "db"
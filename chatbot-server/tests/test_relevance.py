@@ -0,0 +1,57 @@
+from src.services.relevance import RelevanceClassifier
+
+
+def test_classifier_accepts_shopping_queries() -> None:
+    classifier = RelevanceClassifier()
+
+    assert classifier.classify("Best budget wireless earbuds?") is True
+    assert classifier.classify("laptop under $500") is True
+
+
+def test_classifier_rejects_off_domain_and_small_talk() -> None:
+    classifier = RelevanceClassifier()
+
+    assert classifier.classify("tell me a joke") is False
+    assert classifier.classify("hello!") is False
+    assert classifier.classify("   ") is False
+
+
+def test_classifier_defers_ambiguous_queries() -> None:
+    classifier = RelevanceClassifier()
+
+    assert classifier.classify("query") is None
+    assert classifier.classify("python code for a laptop store") is None
+
+
+def test_classifier_defers_intent_words_without_a_product() -> None:
+    classifier = RelevanceClassifier()
+
+    for query in [
+        "who is the best football player",
+        "what model are you",
+        "I want to die",
+        "find me a girlfriend",
+        "need help with my taxes",
+        "top 10 anime of all time",
+    ]:
+        assert classifier.classify(query) is not True, query
+
+    assert classifier.classify("best gaming chair") is True
+
+
+def test_classifier_defers_ambiguous_product_words() -> None:
+    classifier = RelevanceClassifier()
+
+    for query in [
+        "what's on tv tonight",
+        "how to get rid of a mouse",
+        "watch tv",
+        "keep an eye on the monitor",
+        "laptop",
+    ]:
+        assert classifier.classify(query) is None, query
+
+    assert classifier.classify("which smartwatch should I buy") is True
+    assert classifier.classify("cheap wireless mouse") is True
+    assert classifier.classify("laptop and keyboard") is True
+    assert classifier.classify("best laptop") is True
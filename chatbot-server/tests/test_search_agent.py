@@ -10,6 +10,13 @@ class FakeLLMClient:
     def generate(self, prompt: str, model: str) -> str:
         return self.response
 
+    async def agenerate(self, prompt: str, model: str) -> str:
+        return self.response
+
+    async def astream(self, prompt: str, model: str):
+        for start in range(0, len(self.response), 7):
+            yield self.response[start:start + 7]
+
 
 class FakeHybridSearch:
     def __init__(self, results):
@@ -30,6 +37,10 @@ class FakeSourceSearch:
         self.titles = titles
         return self.sources
 
+    async def afind_sources(self, titles):
+        self.titles = titles
+        return self.sources
+
 
 def test_analyze_query_node_splits_response() -> None:
     agent = SearchAgent(
@@ -39,11 +50,24 @@ def test_analyze_query_node_splits_response() -> None:
         source_search=FakeSourceSearch([]),
     )
 
-    result = agent.analyze_query_node({"user_query": "find"})
+    result = __import__("asyncio").run(agent.analyze_query_node({"user_query": "find"}))
 
     assert result["revised_query"] == ["q1", "q2"]
 
 
+def test_analyze_query_node_keeps_precomputed_queries() -> None:
+    agent = SearchAgent(
+        llm_model="model",
+        llm_client=FakeLLMClient("q1|q2"),
+        hybrid_search=FakeHybridSearch([]),
+        source_search=FakeSourceSearch([]),
+    )
+
+    result = __import__("asyncio").run(agent.analyze_query_node({"user_query": "find", "revised_query": ["x"]}))
+
+    assert result["revised_query"] == ["x"]
+
+
 def test_search_online_node_aggregates_results() -> None:
     agent = SearchAgent(
         llm_model="model",
@@ -65,11 +89,35 @@ def test_analyze_rank_node_uses_llm() -> None:
         source_search=FakeSourceSearch([]),
     )
 
-    result = agent.analyze_rank_node({"relevant_products": "p1", "user_query": "need"})
+    result = __import__("asyncio").run(agent.analyze_rank_node({"relevant_products": "p1", "user_query": "need"}))
 
     assert result == {"analyze_result": "ranked"}
 
 
+def test_analyze_rank_node_streams_products() -> None:
+    ranking = json.dumps({
+        "initial": {"message": "hi"},
+        "products": [{"title": "t1", "description": "d1"}, {"title": "t2", "description": "d2"}],
+        "final": {"message": "bye"},
+    })
+    agent = SearchAgent(
+        llm_model="model",
+        llm_client=FakeLLMClient(ranking),
+        hybrid_search=FakeHybridSearch([]),
+        source_search=FakeSourceSearch([]),
+    )
+    events = []
+
+    result = __import__("asyncio").run(
+        agent.analyze_rank_node({"relevant_products": "p1", "user_query": "need"}, writer=events.append)
+    )
+
+    assert result == {"analyze_result": ranking}
+    assert [event["data"]["title"] for event in events] == ["t1", "t2"]
+    assert [event["index"] for event in events] == [0, 1]
+    assert all(event["type"] == "product" for event in events)
+
+
 def test_search_source_node_adds_sources() -> None:
     agent = SearchAgent(
         llm_model="model",
@@ -88,7 +136,7 @@ def test_search_source_node_adds_sources() -> None:
         })
     }
 
-    result = agent.search_source_node(state)
+    result = __import__("asyncio").run(agent.search_source_node(state))
 
     product = result["result"]["products"][0]
     assert product["image"] == "img"
@@ -104,8 +152,62 @@ def test_call_client_rejects_non_string_prompt() -> None:
     )
 
     try:
-        agent.call_client(123)
+        __import__("asyncio").run(agent.call_client(123))
     except ValueError as exc:
         assert "Prompt must be a string" in str(exc)
     else:
         raise AssertionError("Expected ValueError")
+
+
+class SlowHybridSearch(FakeHybridSearch):
+    def __init__(self, delays):
+        super().__init__([])
+        self.delays = delays
+        self.active = 0
+        self.max_active = 0
+        self._lock = __import__("threading").Lock()
+
+    def search_products(self, query: str, max_local: int = 3, max_foreign: int = 2):
+        key = query.rsplit(": ", 1)[-1]
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.delays[key] == "fail":
+                raise RuntimeError("boom")
+            __import__("time").sleep(self.delays[key])
+            return [f"{key}-product"]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_search_online_node_runs_queries_concurrently_in_order() -> None:
+    hybrid = SlowHybridSearch({"a": 0.1, "b": 0.01, "c": 0.05})
+    agent = SearchAgent(
+        llm_model="model",
+        llm_client=FakeLLMClient(""),
+        hybrid_search=hybrid,
+        source_search=FakeSourceSearch([]),
+        search_concurrency=2,
+    )
+
+    result = __import__("asyncio").run(agent.search_online_node({"revised_query": ["a", "b", "c"]}))
+
+    assert result["relevant_products"] == "a-product b-product c-product"
+    assert hybrid.max_active == 2
+
+
+def test_search_online_node_degrades_on_failure_and_timeout() -> None:
+    hybrid = SlowHybridSearch({"ok": 0, "bad": "fail", "slow": 0.5})
+    agent = SearchAgent(
+        llm_model="model",
+        llm_client=FakeLLMClient(""),
+        hybrid_search=hybrid,
+        source_search=FakeSourceSearch([]),
+        search_timeout=0.1,
+    )
+
+    result = __import__("asyncio").run(agent.search_online_node({"revised_query": ["slow", "ok", "bad"]}))
+
+    assert result["relevant_products"] == "ok-product"
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from src.services.semantic_cache import SemanticCache
+from src.utils.metrics import metrics
+
+
+class FakeEmbeddings:
+    VECTORS = {
+        "cheap earbuds": [1.0, 0.0, 0.0],
+        "budget earbuds": [0.95, 0.31, 0.0],
+        "gaming laptop": [0.0, 0.0, 1.0],
+        "office chair": [0.0, 1.0, 0.0],
+    }
+
+    def embed_text(self, text: str, input_type: str = "search_document"):
+        assert input_type == "search_query"
+        return self.VECTORS[text]
+
+
+def test_semantic_cache_hits_similar_queries() -> None:
+    cache = SemanticCache(FakeEmbeddings(), threshold=0.9)
+    cache.store(cache.embed("cheap earbuds"), "earbuds-result")
+
+    assert cache.lookup(cache.embed("budget earbuds")) == "earbuds-result"
+    assert cache.lookup(cache.embed("gaming laptop")) is None
+
+
+def test_semantic_cache_reports_hit_rate_per_threshold() -> None:
+    metrics.reset()
+    cache = SemanticCache(FakeEmbeddings(), threshold=0.99, report_thresholds=(0.5, 0.9))
+    cache.store(cache.embed("cheap earbuds"), "earbuds-result")
+
+    cache.lookup(cache.embed("budget earbuds"))
+    cache.lookup(cache.embed("gaming laptop"))
+
+    assert cache.hit_rates() == {0.5: 0.5, 0.9: 0.5, 0.99: 0.0}
+    assert metrics.get("semantic_cache.hit_rate@0.90") == 0.5
+    assert metrics.get("semantic_cache.misses") == 2
+
+
+def test_semantic_cache_evicts_least_recently_used() -> None:
+    cache = SemanticCache(FakeEmbeddings(), threshold=0.99, maxsize=2)
+    cache.store(cache.embed("cheap earbuds"), "earbuds")
+    cache.store(cache.embed("gaming laptop"), "laptop")
+    cache.lookup(cache.embed("cheap earbuds"))
+
+    cache.store(cache.embed("office chair"), "chair")
+
+    assert len(cache) == 2
+    assert cache.lookup(cache.embed("gaming laptop")) is None
+    assert cache.lookup(cache.embed("cheap earbuds")) == "earbuds"
+
+
+def test_semantic_cache_expires_entries(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr("src.services.semantic_cache.time.monotonic", lambda: now[0])
+    cache = SemanticCache(FakeEmbeddings(), threshold=0.9, ttl=10)
+    cache.store(cache.embed("cheap earbuds"), "earbuds")
+
+    now[0] += 11
+
+    assert cache.lookup(cache.embed("cheap earbuds")) is None
+    assert len(cache) == 0
+
+
+def test_semantic_cache_resets_on_dimension_change() -> None:
+    cache = SemanticCache(FakeEmbeddings(), threshold=0.9)
+    cache.store(np.array([1.0, 0.0], dtype=np.float32), "old")
+
+    assert cache.lookup(cache.embed("cheap earbuds")) is None
+
+    cache.store(cache.embed("cheap earbuds"), "new")
+    assert cache.lookup(cache.embed("cheap earbuds")) == "new"
+    assert len(cache) == 1
+
+
+def test_semantic_cache_rejects_non_positive_size() -> None:
+    with pytest.raises(ValueError):
+        SemanticCache(FakeEmbeddings(), maxsize=0)
+
+
+def test_semantic_cache_requires_matching_numbers_and_comparators() -> None:
+    cache = SemanticCache(FakeEmbeddings(), threshold=0.9)
+    vector = cache.embed("gaming laptop")
+    cache.store(vector, "under-500", query="best gaming laptop under 500 dollars")
+
+    assert cache.lookup(vector, query="best gaming laptop under 1500 dollars") is None
+    assert cache.lookup(vector, query="best gaming laptop over 500 dollars") is None
+    assert cache.lookup(vector, query="top gaming laptop under 500 dollars") == "under-500"
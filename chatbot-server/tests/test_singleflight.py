@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.utils.metrics import metrics
+from src.utils.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_singleflight_coalesces_concurrent_calls() -> None:
+    metrics.reset()
+    group = SingleFlight("test.sf")
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        time.sleep(0.1)
+        return value * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(group.do("k", compute, 21))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 5
+    assert calls == [21]
+    assert metrics.get("test.sf.calls") == 5
+    assert metrics.get("test.sf.coalesced") == 4
+    assert metrics.get("test.sf.coalescing_ratio") == 0.8
+
+
+def test_singleflight_shares_errors_and_resets() -> None:
+    group = SingleFlight("test.sf")
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    errors = []
+
+    def follower():
+        started.wait()
+        try:
+            group.do("k", lambda: "unused")
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    with pytest.raises(RuntimeError):
+        group.do("k", fail)
+    thread.join()
+
+    assert len(errors) == 1
+    assert group.do("k", lambda: "fresh") == "fresh"
+
+
+async def _collect(iterator):
+    return [event async for event in iterator]
+
+
+def test_async_singleflight_fans_out_stream_events() -> None:
+    group = AsyncSingleFlight("test.asf")
+    runs = []
+
+    async def produce():
+        runs.append(1)
+        for event in ["a", "b", "c"]:
+            await asyncio.sleep(0.01)
+            yield event
+
+    async def main():
+        first = asyncio.create_task(_collect(group.stream("k", produce)))
+        await asyncio.sleep(0.015)
+        second = asyncio.create_task(_collect(group.stream("k", produce)))
+        return await first, await second
+
+    first, second = asyncio.run(main())
+
+    assert first == ["a", "b", "c"]
+    assert second == ["a", "b", "c"]
+    assert runs == [1]
+    assert group.coalesced == 1
+
+
+def test_async_singleflight_propagates_errors() -> None:
+    group = AsyncSingleFlight("test.asf")
+
+    async def produce():
+        yield "a"
+        raise RuntimeError("boom")
+
+    async def main():
+        events = []
+        with pytest.raises(RuntimeError):
+            async for event in group.stream("k", produce):
+                events.append(event)
+        return events
+
+    assert asyncio.run(main()) == ["a"]
+
+
+def test_async_singleflight_cancels_when_last_subscriber_leaves() -> None:
+    group = AsyncSingleFlight("test.asf")
+    closed = []
+
+    async def produce():
+        try:
+            yield "a"
+            await asyncio.sleep(10)
+            yield "b"
+        finally:
+            closed.append(True)
+
+    async def main():
+        stream = group.stream("k", produce)
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+
+    assert closed == [True]
+    assert group._streams == {}
+
+
+def test_async_singleflight_do_shares_result_and_errors() -> None:
+    metrics.reset()
+    group = AsyncSingleFlight("test.asf.do")
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        if value < 0:
+            raise ValueError("negative")
+        return value * 2
+
+    async def scenario():
+        results = await asyncio.gather(*(group.do("k", compute, 21) for _ in range(4)))
+        errors = await asyncio.gather(*(group.do("e", compute, -1) for _ in range(2)), return_exceptions=True)
+        again = await group.do("k", compute, 21)
+        return results, errors, again
+
+    results, errors, again = asyncio.run(scenario())
+
+    assert results == [42] * 4
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert again == 42
+    assert calls == [21, -1, 21]
+    assert metrics.get("test.asf.do.coalesced") == 4
+
+
+def test_async_singleflight_do_survives_cancelled_leader() -> None:
+    group = AsyncSingleFlight("test.asf.do")
+    calls = []
+    cancelled = []
+
+    async def compute():
+        calls.append(1)
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return "shared"
+
+    async def scenario():
+        leader = asyncio.create_task(group.do("k", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(group.do("k", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        result = await follower
+
+        # Cancelling the only caller cancels the computation
+        alone = asyncio.create_task(group.do("k", compute))
+        await asyncio.sleep(0.01)
+        alone.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await alone
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(scenario()) == "shared"
+    assert calls == [1, 1]
+    assert cancelled == [1]
+    assert group._calls == {}
@@ -1,3 +1,5 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from src.adapters.search.tavily_provider import (
@@ -37,9 +39,13 @@ class FakeCohereClient:
 class FakeTavilyHybridClient:
     def __init__(self, **kwargs):
         self.kwargs = kwargs
+        self.index = kwargs["index"]
+        self.embeddings_field = kwargs["embeddings_field"]
         self._results = []
+        self.searched = []
 
     def search(self, **kwargs):
+        self.searched.append((self.index, self.embeddings_field))
         return self._results
 
 
@@ -52,6 +58,25 @@ class FakeTavilyClient:
         return self._search
 
 
+class FakeAsyncTavilyClient:
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.active = 0
+        self.max_active = 0
+
+    async def search(self, query: str, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            title = query.rsplit(" ", 1)[-1]
+            if title == "fail":
+                raise RuntimeError("boom")
+            await __import__("asyncio").sleep(1 if title == "slow" else 0.01)
+            return {"images": [f"img-{title}"], "results": [{"url": f"https://example.com/{title}"}]}
+        finally:
+            self.active -= 1
+
+
 def test_tavily_hybrid_search_filters_empty_content(monkeypatch) -> None:
     monkeypatch.setattr("src.adapters.search.tavily_provider.cohere.Client", lambda api_key: FakeCohereClient())
     monkeypatch.setattr("src.adapters.search.tavily_provider.TavilyHybridClient", lambda **kwargs: FakeTavilyHybridClient(**kwargs))
@@ -73,6 +98,75 @@ def test_tavily_hybrid_search_filters_empty_content(monkeypatch) -> None:
     assert result == ["item-1", "item-2"]
 
 
+def test_tavily_hybrid_search_follows_active_index(monkeypatch) -> None:
+    monkeypatch.setattr("src.adapters.search.tavily_provider.cohere.Client", lambda api_key: FakeCohereClient())
+    monkeypatch.setattr("src.adapters.search.tavily_provider.TavilyHybridClient", lambda **kwargs: FakeTavilyHybridClient(**kwargs))
+    active = ["v1_index", "v1"]
+
+    provider = TavilyHybridSearchProvider(
+        api_key="key",
+        mongo_db=FakeMongoDB(),
+        cohere_api_key="cohere",
+        index_name="v1_index",
+        embedding_field="v1",
+        active_index=lambda: tuple(active),
+    )
+    assert (provider._client.kwargs["index"], provider._client.kwargs["embeddings_field"]) == ("v1_index", "v1")
+
+    provider.search_products("query")
+    active[:] = ["v2_index", "v2"]
+    provider.search_products("query")
+
+    assert provider._client.searched == [("v1_index", "v1")]
+    assert provider._clients[("v2_index", "v2")].searched == [("v2_index", "v2")]
+
+
+def test_tavily_hybrid_search_keeps_index_per_concurrent_search(monkeypatch) -> None:
+    monkeypatch.setattr("src.adapters.search.tavily_provider.cohere.Client", lambda api_key: FakeCohereClient())
+    monkeypatch.setattr("src.adapters.search.tavily_provider.TavilyHybridClient", lambda **kwargs: FakeTavilyHybridClient(**kwargs))
+    indexes = itertools.cycle([("v1_index", "v1"), ("v2_index", "v2")])
+
+    provider = TavilyHybridSearchProvider(
+        api_key="key",
+        mongo_db=FakeMongoDB(),
+        cohere_api_key="cohere",
+        index_name="v1_index",
+        embedding_field="v1",
+        active_index=lambda: next(indexes),
+    )
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(provider.search_products, ["query"] * 200))
+
+    assert set(provider._clients) == {("v1_index", "v1"), ("v2_index", "v2")}
+    for key, client in provider._clients.items():
+        assert set(client.searched) == {key}
+    assert sum(len(client.searched) for client in provider._clients.values()) == 200
+
+
+def test_tavily_hybrid_search_caches_embeddings(monkeypatch) -> None:
+    calls = []
+
+    class CountingCohereClient(FakeCohereClient):
+        def embed(self, model: str, texts: List[str], input_type: str):
+            calls.append((list(texts), input_type))
+
+            class Result:
+                embeddings = [[float(len(text)), 0.5] for text in texts]
+            return Result()
+
+    monkeypatch.setattr("src.adapters.search.tavily_provider.cohere.Client", lambda api_key: CountingCohereClient())
+    monkeypatch.setattr("src.adapters.search.tavily_provider.TavilyHybridClient", lambda **kwargs: FakeTavilyHybridClient(**kwargs))
+
+    provider = TavilyHybridSearchProvider(api_key="key", mongo_db=FakeMongoDB(), cohere_api_key="cohere")
+    embed = provider._client.kwargs["embedding_function"]
+
+    assert embed(["ab"], "search_query") == [[2.0, 0.5]]
+    assert embed(["ab", "abc"], "search_query") == [[2.0, 0.5], [3.0, 0.5]]
+    embed(["ab"], "search_document")
+
+    assert calls == [(["ab"], "search_query"), (["abc"], "search_query"), (["ab"], "search_document")]
+
+
 def test_tavily_source_search_returns_image_and_url(monkeypatch) -> None:
     fake_client = FakeTavilyClient(api_key="key")
     fake_client._search = {
@@ -86,3 +180,21 @@ def test_tavily_source_search_returns_image_and_url(monkeypatch) -> None:
     result = provider.find_sources(["title"])
 
     assert result == [{"image": "img-1", "url": "https://example.com"}]
+
+
+def test_tavily_source_search_resolves_titles_concurrently(monkeypatch) -> None:
+    fake_async_client = FakeAsyncTavilyClient(api_key="key")
+    monkeypatch.setattr("src.adapters.search.tavily_provider.TavilyClient", lambda api_key: FakeTavilyClient(api_key))
+    monkeypatch.setattr("src.adapters.search.tavily_provider.AsyncTavilyClient", lambda api_key: fake_async_client)
+
+    provider = TavilySourceSearchProvider(api_key="key", concurrency=2, timeout=0.2)
+
+    result = __import__("asyncio").run(provider.afind_sources(["a", "slow", "fail", "b"]))
+
+    assert result == [
+        {"image": "img-a", "url": "https://example.com/a"},
+        None,
+        None,
+        {"image": "img-b", "url": "https://example.com/b"},
+    ]
+    assert fake_async_client.max_active == 2
@@ -1,3 +1,4 @@
+import asyncio
 from types import SimpleNamespace
 
 from src.repositories.vector_db_repository import VectorDBRepository
@@ -8,6 +9,18 @@ class FakeCollection:
         self.created = False
         self.search_indexes = []
         self.created_model = None
+        self.updated = None
+        self.indexes = []
+        self.documents = {}
+
+    def create_index(self, keys, **kwargs):
+        self.indexes.append((keys, kwargs))
+
+    def find_one(self, query):
+        return self.documents.get(query["_id"])
+
+    def replace_one(self, query, document, upsert=False):
+        self.documents[query["_id"]] = {"_id": query["_id"], **document}
 
     def list_search_indexes(self, name=None):
         if name is None:
@@ -21,6 +34,9 @@ class FakeCollection:
         self.search_indexes.append({"name": name, "queryable": True})
         return name
 
+    def update_search_index(self, name, definition):
+        self.updated = (name, definition)
+
 
 class FakeMongoDB:
     def __init__(self):
@@ -48,6 +64,8 @@ def test_initialize_creates_collection_and_index(monkeypatch) -> None:
 
     collection = mongo_db.get_collection(repo.collection_name)
     assert collection.created_model is not None
+    assert collection.indexes[0][0] == "product_id"
+    assert collection.indexes[0][1]["unique"] is True
 
 
 def test_create_vector_index_skips_existing(monkeypatch) -> None:
@@ -61,3 +79,101 @@ def test_create_vector_index_skips_existing(monkeypatch) -> None:
     repo.create_vector_index()
 
     assert collection.created_model is None
+
+
+def test_get_async_collection() -> None:
+    async_db = FakeMongoDB()
+
+    assert VectorDBRepository(FakeMongoDB()).get_async_collection() is None
+    repo = VectorDBRepository(FakeMongoDB(), async_db=async_db)
+    assert repo.get_async_collection() is async_db.collections["embedded_picksmart"]
+
+
+def test_activate_index_switches_settings_for_new_repositories(monkeypatch) -> None:
+    mongo_db = FakeMongoDB()
+    VectorDBRepository(mongo_db).activate_index("v2_index", "embedding_v2", 1536)
+
+    repo = VectorDBRepository(mongo_db)
+    assert repo.embedding_field == "product_title_embedding"
+    monkeypatch.setattr(repo, "_wait_for_index", lambda collection, index_name: None)
+    repo.initialize()
+
+    assert (repo.index_name, repo.embedding_field, repo.num_dimensions) == ("v2_index", "embedding_v2", 1536)
+    collection = mongo_db.get_collection(repo.collection_name)
+    definition = collection.created_model.document
+    assert definition["name"] == "v2_index"
+    assert definition["definition"]["fields"][0]["path"] == "embedding_v2"
+    assert definition["definition"]["fields"][1:] == [
+        {"type": "filter", "path": "department"},
+        {"type": "filter", "path": "region"},
+    ]
+    collection.search_indexes = [{"name": "v2_index", "queryable": True}]
+    assert repo.index_ready("v2_index")
+    assert not repo.index_ready("missing")
+
+
+def test_create_vector_index_adds_missing_filter_fields(monkeypatch) -> None:
+    mongo_db = FakeMongoDB()
+    repo = VectorDBRepository(mongo_db)
+    collection = mongo_db.get_collection(repo.collection_name)
+    vector_field = {
+        "type": "vector", "path": "product_title_embedding", "numDimensions": 1024,
+        "similarity": "cosine", "quantization": "scalar",
+    }
+    collection.search_indexes = [{"name": repo.index_name, "latestDefinition": {"fields": [vector_field]}}]
+    monkeypatch.setattr(repo, "_wait_for_index", lambda collection, index_name: None)
+
+    repo.create_vector_index()
+
+    name, definition = collection.updated
+    assert name == repo.index_name
+    assert {"type": "filter", "path": "department"} in definition["fields"]
+    assert collection.created_model is None
+
+    collection.updated = None
+    collection.search_indexes[0]["latestDefinition"] = definition
+    repo.create_vector_index()
+    assert collection.updated is None
+
+
+def test_running_repository_follows_activation_elsewhere() -> None:
+    mongo_db = FakeMongoDB()
+    server = VectorDBRepository(mongo_db, refresh_interval=60)
+    assert server.refresh_active_index() == ("pick_smart_vector_index", "product_title_embedding")
+
+    VectorDBRepository(mongo_db).activate_index("v2_index", "embedding_v2", 1536)
+    assert server.refresh_active_index() == ("pick_smart_vector_index", "product_title_embedding")
+
+    server._loaded_at -= 60
+    assert server.refresh_active_index() == ("v2_index", "embedding_v2")
+    assert server.active_index() == ("v2_index", "embedding_v2")
+    assert server.num_dimensions == 1536
+
+
+def test_async_refresh_reads_through_async_database() -> None:
+    class FakeAsyncCollection:
+        def __init__(self, collection):
+            self.collection = collection
+
+        async def find_one(self, query):
+            return self.collection.find_one(query)
+
+    class BlockingMongoDB(FakeMongoDB):
+        def get_collection(self, name):
+            raise AssertionError("blocking read on the event loop")
+
+    mongo_db = FakeMongoDB()
+    async_db = SimpleNamespace(get_collection=lambda name: FakeAsyncCollection(mongo_db.get_collection(name)))
+    server = VectorDBRepository(BlockingMongoDB(), async_db=async_db, refresh_interval=60)
+    VectorDBRepository(mongo_db).activate_index("v2_index", "embedding_v2", 1536)
+
+    assert asyncio.run(server.arefresh_active_index()) == ("v2_index", "embedding_v2")
+    assert server.num_dimensions == 1536
+
+    # Within the interval the cached settings are returned without a read
+    VectorDBRepository(mongo_db).activate_index("v3_index", "embedding_v3", 1536)
+    assert asyncio.run(server.arefresh_active_index()) == ("v2_index", "embedding_v2")
+
+    # Without an async database the read runs in a worker thread
+    fallback = VectorDBRepository(mongo_db)
+    assert asyncio.run(fallback.arefresh_active_index()) == ("v3_index", "embedding_v3")
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+
+from src.repositories.local_vector_index import LocalVectorIndex
+from src.repositories.vector_snapshot import VectorSnapshotStore
+from src.services.local_vector_store import LocalVectorStoreService
+
+
+class FakeEmbeddings:
+    def embed_text(self, text: str):
+        return [1.0, 0.0] if text == "x" else [0.0, 1.0]
+
+
+def documents(suffix: str = ""):
+    return [
+        {"_id": 1, "product_title": f"x{suffix}", "department": "d", "product_title_embedding": [2.0, 0.0]},
+        {"_id": 2, "product_title": f"y{suffix}", "product_title_embedding": [0.0, 3.0]},
+        {"_id": 3, "product_title": "no embedding"},
+    ]
+
+
+def test_snapshot_round_trip_is_memory_mapped(tmp_path) -> None:
+    store = VectorSnapshotStore(str(tmp_path))
+    assert store.current() is None
+    assert store.load() is None
+
+    name = store.build(documents(), count=3, dimensions=2)
+    index = store.load()
+
+    assert store.current() == name
+    assert len(index) == 2
+    assert isinstance(index._vectors, np.memmap)
+    assert not index._vectors.flags.writeable
+    # Ids and filter values are mapped too, and documents are decoded on access
+    assert isinstance(index._ids, np.memmap)
+    assert isinstance(index._attributes["department"], np.memmap)
+    assert not isinstance(index._documents, list)
+    with open(os.path.join(tmp_path, name, "metadata.json"), encoding="utf-8") as f:
+        assert "documents" not in f.read()
+    score, document = index.search([1.0, 0.0], top_k=1, filters={"department": "d"})[0]
+    assert score == 1.0
+    assert document == {"_id": "1", "product_title": "x", "department": "d"}
+
+
+def test_added_documents_do_not_touch_the_snapshot(tmp_path) -> None:
+    store = VectorSnapshotStore(str(tmp_path))
+    store.build(documents(), count=3, dimensions=2)
+    index = store.load()
+
+    index.add("4", [1.0, 1.0], {"_id": "4"})
+    assert index.remove("2") is True
+
+    assert len(index) == 2
+    assert [doc["_id"] for _, doc in index.search([0.0, 1.0], top_k=5)] == ["4", "1"]
+    assert index.search([1.0, 0.0], filters={"department": "d"})[0][1]["_id"] == "1"
+    assert len(store.load()) == 2
+
+
+def test_rebuild_swaps_and_prunes_snapshots(tmp_path) -> None:
+    store = VectorSnapshotStore(str(tmp_path), keep=2)
+    first = store.build(documents("-1"), count=3, dimensions=2)
+    second = store.build(documents("-2"), count=3, dimensions=2)
+    third = store.build_from_index(store.load())
+
+    remaining = sorted(entry for entry in os.listdir(tmp_path) if entry.startswith("snapshot-"))
+    assert remaining == [second, third]
+    assert first not in remaining
+    assert store.load().search([0.0, 1.0], top_k=1)[0][1]["product_title"] == "y-2"
+
+
+def test_service_picks_up_new_snapshot(tmp_path) -> None:
+    store = VectorSnapshotStore(str(tmp_path))
+    store.build(documents("-old"), count=3, dimensions=2)
+    service = LocalVectorStoreService(store.load(), FakeEmbeddings(), snapshots=store, refresh_interval=0)
+
+    assert service.search_similar("x", top_k=1)[0]["document"]["product_title"] == "x-old"
+
+    store.build(documents("-new"), count=3, dimensions=2)
+
+    assert service.search_similar("x", top_k=1)[0]["document"]["product_title"] == "x-new"
+
+
+def test_service_without_snapshots_keeps_its_index() -> None:
+    index = LocalVectorIndex(dimensions=2)
+    service = LocalVectorStoreService(index, FakeEmbeddings(), refresh_interval=0)
+
+    service.search_similar("x")
+
+    assert service.index is index
@@ -4,15 +4,30 @@ from src.services.vector_store import VectorStoreService
 
 
 class FakeEmbeddings:
+    def __init__(self):
+        self.batches = []
+
     def embed_text(self, text: str):
         return [0.1, 0.2]
 
+    def embed_texts(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(text)), 0.2] for text in texts]
+
 
 class FakeCollection:
     def __init__(self):
         self.pipeline = None
         self.inserted = []
         self.deleted = []
+        self.counts = []
+
+    def estimated_document_count(self):
+        return 1000
+
+    def count_documents(self, query):
+        self.counts.append(query)
+        return 0 if query.get("department") == {"$eq": "none"} else 50
 
     def aggregate(self, pipeline):
         self.pipeline = pipeline
@@ -28,12 +43,58 @@ class FakeCollection:
 
 
 class FakeRepo:
-    def __init__(self, collection):
+    index_name = "pick_smart_vector_index"
+    embedding_field = "product_title_embedding"
+
+    def __init__(self, collection, async_collection=None):
         self.collection = collection
+        self.async_collection = async_collection
+        self.refreshes = []
+
+    def active_index(self):
+        return self.index_name, self.embedding_field
+
+    def refresh_active_index(self):
+        self.refreshes.append("sync")
+        return self.active_index()
+
+    async def arefresh_active_index(self):
+        self.refreshes.append("async")
+        return self.active_index()
 
     def get_collection(self):
         return self.collection
 
+    def get_async_collection(self):
+        return self.async_collection
+
+
+class FakeAsyncCursor:
+    def __init__(self, results):
+        self.results = results
+
+    async def to_list(self, length=None):
+        return self.results
+
+
+class FakeAsyncCollection:
+    def __init__(self, fail: bool = False):
+        self.pipelines = []
+        self.fail = fail
+
+    async def estimated_document_count(self):
+        return 1000
+
+    async def count_documents(self, query):
+        return 100
+
+    async def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        await __import__("asyncio").sleep(0.05)
+        if self.fail:
+            raise RuntimeError("boom")
+        return FakeAsyncCursor([{"similarityScore": 0.8, "document": {"id": 2}}])
+
 
 class ErrorCollection(FakeCollection):
     def aggregate(self, pipeline):
@@ -47,8 +108,49 @@ def test_search_similar_builds_pipeline() -> None:
     results = service.search_similar(query="shoe", top_k=2, department="d1", region="r1")
 
     assert results == [{"similarityScore": 0.9, "document": {"id": 1}}]
-    assert collection.pipeline is not None
-    assert collection.pipeline[-1]["$match"] == {"department": "d1", "region": "r1"}
+    search = collection.pipeline[0]["$vectorSearch"]
+    assert search["index"] == "pick_smart_vector_index"
+    assert search["path"] == "product_title_embedding"
+    assert search["filter"] == {"department": {"$eq": "d1"}, "region": {"$eq": "r1"}}
+    assert search["limit"] == 2
+    assert search["numCandidates"] == 400
+    assert collection.pipeline[1]["$project"]["similarityScore"] == {"$meta": "vectorSearchScore"}
+    assert all("$match" not in stage for stage in collection.pipeline)
+
+
+def test_search_similar_caches_selectivity_and_skips_empty_filters() -> None:
+    collection = FakeCollection()
+    service = VectorStoreService(vector_db_repo=FakeRepo(collection), embeddings_service=FakeEmbeddings())
+
+    service.search_similar(query="shoe", department="d1")
+    service.search_similar(query="hat", department="d1")
+    assert collection.counts == [{"department": {"$eq": "d1"}}]
+
+    collection.pipeline = None
+    assert service.search_similar(query="shoe", department="none") == []
+    assert collection.pipeline is None
+
+    service.search_similar(query="shoe", top_k=5)
+    assert collection.pipeline[0]["$vectorSearch"]["numCandidates"] == 50
+    assert "filter" not in collection.pipeline[0]["$vectorSearch"]
+
+
+def test_search_modes() -> None:
+    collection = FakeCollection()
+    service = VectorStoreService(
+        vector_db_repo=FakeRepo(collection), embeddings_service=FakeEmbeddings(), num_candidates_multiplier=3
+    )
+
+    service.search_similar(query="shoe", top_k=4)
+    assert collection.pipeline[0]["$vectorSearch"]["numCandidates"] == 12
+
+    service.search_vector([0.1, 0.2], top_k=4, exact=True)
+    assert collection.pipeline[0]["$vectorSearch"]["exact"] is True
+    assert "numCandidates" not in collection.pipeline[0]["$vectorSearch"]
+
+    exact = VectorStoreService(vector_db_repo=FakeRepo(collection), embeddings_service=FakeEmbeddings(), exact=True)
+    exact.search_similar(query="hat")
+    assert collection.pipeline[0]["$vectorSearch"]["exact"] is True
 
 
 def test_insert_vector_returns_id() -> None:
@@ -79,3 +181,105 @@ def test_search_similar_handles_error() -> None:
     results = service.search_similar(query="shoe")
 
     assert results == []
+
+
+def test_search_similar_coalesces_concurrent_identical_searches() -> None:
+    import threading
+    import time
+
+    class SlowCollection(FakeCollection):
+        def __init__(self):
+            super().__init__()
+            self.calls = 0
+
+        def aggregate(self, pipeline):
+            self.calls += 1
+            time.sleep(0.1)
+            return super().aggregate(pipeline)
+
+    collection = SlowCollection()
+    service = VectorStoreService(vector_db_repo=FakeRepo(collection), embeddings_service=FakeEmbeddings())
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.search_similar("shoe"))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert collection.calls == 1
+    assert len(results) == 3
+
+
+def test_asearch_similar_uses_async_collection_and_coalesces() -> None:
+    import asyncio
+
+    async_collection = FakeAsyncCollection()
+    repo = FakeRepo(FakeCollection(), async_collection)
+    service = VectorStoreService(vector_db_repo=repo, embeddings_service=FakeEmbeddings())
+
+    async def scenario():
+        return await asyncio.gather(
+            service.asearch_similar("shoe", top_k=3, region="r1"),
+            service.asearch_similar("shoe", top_k=3, region="r1"),
+            service.asearch_similar("hat", top_k=3),
+        )
+
+    results = asyncio.run(scenario())
+
+    assert results[0] == [{"similarityScore": 0.8, "document": {"id": 2}}]
+    assert results[0] == results[1] == results[2]
+    assert len(async_collection.pipelines) == 2
+    search = async_collection.pipelines[0][0]["$vectorSearch"]
+    assert search["filter"] == {"region": {"$eq": "r1"}}
+    assert search["numCandidates"] == 300
+    # The active index is refreshed without blocking the event loop
+    assert repo.refreshes == ["async", "async"]
+
+
+def test_asearch_similar_falls_back_and_handles_errors() -> None:
+    import asyncio
+
+    collection = FakeCollection()
+    service = VectorStoreService(vector_db_repo=FakeRepo(collection), embeddings_service=FakeEmbeddings())
+    assert asyncio.run(service.asearch_similar("shoe")) == [{"similarityScore": 0.9, "document": {"id": 1}}]
+    assert collection.pipeline is not None
+
+    failing = VectorStoreService(
+        vector_db_repo=FakeRepo(FakeCollection(), FakeAsyncCollection(fail=True)),
+        embeddings_service=FakeEmbeddings(),
+    )
+    assert asyncio.run(failing.asearch_similar("shoe")) == []
+
+
+def test_asearch_batch_embeds_once_and_keeps_order() -> None:
+    import asyncio
+
+    async_collection = FakeAsyncCollection()
+    embeddings = FakeEmbeddings()
+    repo = FakeRepo(FakeCollection(), async_collection)
+    service = VectorStoreService(vector_db_repo=repo, embeddings_service=embeddings)
+    searches = [
+        {"query": "shoe", "top_k": 2},
+        {"query": "hat", "top_k": 1, "department": "d1"},
+        {"query": "shoe", "top_k": 2, "region": "r1"},
+    ]
+
+    results = asyncio.run(service.asearch_batch(searches))
+
+    assert len(results) == 3
+    assert embeddings.batches == [["shoe", "hat"]]
+    pipelines = async_collection.pipelines
+    assert [p[0]["$vectorSearch"]["queryVector"][0] for p in pipelines] == [4.0, 3.0, 4.0]
+    assert pipelines[1][0]["$vectorSearch"]["filter"] == {"department": {"$eq": "d1"}}
+    assert repo.refreshes == ["async"]
+
+
+def test_asearch_batch_falls_back_to_sync_collection() -> None:
+    import asyncio
+
+    service = VectorStoreService(vector_db_repo=FakeRepo(ErrorCollection()), embeddings_service=FakeEmbeddings())
+    assert asyncio.run(service.asearch_batch([{"query": "shoe"}])) == [[]]
+
+    service = VectorStoreService(vector_db_repo=FakeRepo(FakeCollection()), embeddings_service=FakeEmbeddings())
+    assert asyncio.run(service.asearch_batch([{"query": "shoe"}])) == [[{"similarityScore": 0.9, "document": {"id": 1}}]]
@@ -0,0 +1,54 @@
+import time
+
+from src.services.vector_tuning import NumCandidatesTuner
+
+
+class FakeEmbeddings:
+    def embed_texts(self, texts):
+        return [[float(index)] for index, _ in enumerate(texts)]
+
+
+class FakeVectorStore:
+    def __init__(self, slow_from=None):
+        self.embeddings = FakeEmbeddings()
+        self.slow_from = slow_from
+        self.calls = []
+
+    def search_vector(self, query_embedding, top_k=5, num_candidates=None, exact=None):
+        self.calls.append((num_candidates, exact))
+        if exact:
+            found = top_k
+        else:
+            # Approximate search finds one more true neighbour per top_k candidates
+            found = min(top_k, num_candidates // top_k)
+            if self.slow_from and num_candidates >= self.slow_from:
+                time.sleep(0.02)
+        misses = [{"document": {"_id": f"other-{i}"}} for i in range(top_k - found)]
+        return [{"document": {"_id": i}} for i in range(found)] + misses
+
+
+def test_tuner_picks_smallest_setting_meeting_recall() -> None:
+    store = FakeVectorStore()
+    tuner = NumCandidatesTuner(store, top_k=4, target_recall=0.75, p95_budget_ms=1000)
+
+    result = tuner.tune(["shoe", "hat"])
+
+    assert result["met"] is True
+    assert result["num_candidates"] == 16
+    assert result["num_candidates_multiplier"] == 4
+    assert [trial["num_candidates"] for trial in result["trials"]] == [4, 8, 16]
+    assert result["trials"][0]["recall"] == 0.25
+    assert store.calls[:2] == [(None, True), (None, True)]
+
+
+def test_tuner_stops_when_latency_budget_is_exceeded() -> None:
+    tuner = NumCandidatesTuner(
+        FakeVectorStore(slow_from=8), top_k=4, target_recall=1.0, p95_budget_ms=10, candidates=[2, 8, 16, 20000]
+    )
+
+    assert tuner.candidates == [4, 8, 16, 10000]
+    result = tuner.tune(["shoe"])
+
+    assert result["met"] is False
+    assert result["num_candidates"] is None
+    assert [trial["num_candidates"] for trial in result["trials"]] == [4, 8]